@@ -7,6 +7,7 @@ from pandera.typing.common import DataFrameBase
 
 from utilities.api.gsheets_api import GsheetsHelper
 from utilities.api.todoist_api import TodoistHelper
+from utilities.api.todoist_batch import TodoistBatch
 
 
 class PlanExporter:
@@ -17,7 +18,8 @@ class PlanExporter:
         self.plan = plan
 
     def export_to_gsheets(self, gsheets_helper: GsheetsHelper):
-        gsheets_helper.write_worksheet(
+        # plans of successive weeks share most cells
+        gsheets_helper.write_diff(
             df=self.plan,
             workbook_name=self.app_config.gsheets.workbook,
             worksheet_name=self.app_config.gsheets.worksheet.plan,
@@ -34,6 +36,8 @@ class PlanExporter:
             )
 
     def export_to_todoist(self, todoist_helper: TodoistHelper):
+        # sent in order & in as few requests as allowed
+        todoist_batch = TodoistBatch(todoist_helper=todoist_helper)
         for (
             week,
             day,
@@ -59,7 +63,7 @@ class PlanExporter:
                         for _, row in values.iterrows()
                     ]
                 )
-            task = todoist_helper.add_task_to_project(
+            task_kwargs = dict(
                 task=task,
                 due_string=f"in {day} days",
                 project=self.app_config.todoist.project,
@@ -68,8 +72,7 @@ class PlanExporter:
                 priority=priority,
                 label_list=[self.app_config.todoist.task_label],
             )
-
+            todoist_batch.add_task(**task_kwargs)
             if self.app_config.debug:
-                task_dict = task.__dict__
-                task_dict["due"] = task_dict["due"].__dict__
-                print(json.dumps(task_dict, indent=4))
+                print(json.dumps(task_kwargs, indent=4))
+        todoist_batch.flush()
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import List
+from typing import Dict, List
 
 import numpy as np
 import pandas as pd
@@ -184,15 +184,20 @@ class WorkoutPlanner:
             }
         )
 
-    def _load_time_plan(
+    def _load_worksheet_map(
         self, workbook: WorkBook
-    ) -> DataFrameBase[TimePlanSchema]:
-        weekly = workbook.get_worksheet(
-            worksheet_name=self.app_config.gsheets.worksheet.weekly,
-        )
-        sleep = workbook.get_worksheet(
-            worksheet_name=self.app_config.gsheets.worksheet.sleep,
+    ) -> Dict[str, pd.DataFrame]:
+        # all worksheets are read in one request
+        worksheet = self.app_config.gsheets.worksheet
+        return workbook.get_worksheets(
+            [worksheet.weekly, worksheet.sleep, worksheet.sets, worksheet.plan]
         )
+
+    def _load_time_plan(
+        self, worksheet_map: Dict[str, pd.DataFrame]
+    ) -> DataFrameBase[TimePlanSchema]:
+        weekly = worksheet_map[self.app_config.gsheets.worksheet.weekly]
+        sleep = worksheet_map[self.app_config.gsheets.worksheet.sleep]
         plan_template = pd.concat([weekly, sleep])
 
         # pandera does not replace "" by default, only None
@@ -200,22 +205,24 @@ class WorkoutPlanner:
         plan_template["active"] = plan_template["active"].replace("", None)
         return TimePlanSchema.validate(plan_template)
 
-    def _load_sets(self, workbook: WorkBook) -> DataFrameBase[SetSchema]:
-        sets = workbook.get_worksheet(
-            worksheet_name=self.app_config.gsheets.worksheet.sets,
-        )
+    def _load_sets(
+        self, worksheet_map: Dict[str, pd.DataFrame]
+    ) -> DataFrameBase[SetSchema]:
+        sets = worksheet_map[self.app_config.gsheets.worksheet.sets]
         return SetSchema.validate(sets)
 
-    def _load_weekly_plan(self, workbook: WorkBook) -> pd.DataFrame:
-        time_plan = self._load_time_plan(workbook)
-        sets = self._load_sets(workbook)
+    def _load_weekly_plan(
+        self, worksheet_map: Dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        time_plan = self._load_time_plan(worksheet_map)
+        sets = self._load_sets(worksheet_map)
         weekly_plan = pd.merge(left=time_plan, right=sets, on="key", how="left")
         return weekly_plan.sort_values(by=["day", "time_of_day", "order"])
 
-    def _load_last_plan(self, workbook: WorkBook) -> DataFrameBase[WorkoutPlan]:
-        df = workbook.get_worksheet(
-            worksheet_name=self.app_config.gsheets.worksheet.plan,
-        )
+    def _load_last_plan(
+        self, worksheet_map: Dict[str, pd.DataFrame]
+    ) -> DataFrameBase[WorkoutPlan]:
+        df = worksheet_map[self.app_config.gsheets.worksheet.plan]
         return WorkoutPlan.validate(df)
 
     def create_workout_plan(
@@ -224,8 +231,9 @@ class WorkoutPlanner:
         workbook = gsheets_helper.get_workbook(
             workbook_name=self.app_config.gsheets.workbook,
         )
-        weekly_plan = self._load_weekly_plan(workbook=workbook)
-        last_plan = self._load_last_plan(workbook=workbook)
+        worksheet_map = self._load_worksheet_map(workbook=workbook)
+        weekly_plan = self._load_weekly_plan(worksheet_map=worksheet_map)
+        last_plan = self._load_last_plan(worksheet_map=worksheet_map)
 
         all_skip_ids = list(last_plan.item_id.values)
         in_month_skip_ids = list()
@@ -39,4 +39,5 @@ class TestLoadLastPlan:
         workbook = gsheets_helper.get_workbook(
             workbook_name=workout_planner.app_config.gsheets.workbook,
         )
-        workout_planner._load_weekly_plan(workbook=workbook)
+        worksheet_map = workout_planner._load_worksheet_map(workbook=workbook)
+        workout_planner._load_weekly_plan(worksheet_map=worksheet_map)
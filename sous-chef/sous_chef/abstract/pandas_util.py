@@ -1,3 +1,4 @@
+import hashlib
 from typing import Dict, Set
 
 import pandas as pd
@@ -49,3 +50,9 @@ def get_dict_from_columns(
     df: pd.DataFrame, key_col: str, value_col: str
 ) -> Dict:
     return {key: value for key, value in df[[key_col, value_col]].values}
+
+
+def get_dataframe_hash(df: pd.DataFrame) -> str:
+    hash_obj = hashlib.sha256(str(list(df.columns)).encode())
+    hash_obj.update(pd.util.hash_pandas_object(df, index=False).values)
+    return hash_obj.hexdigest()
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -8,6 +9,9 @@ from structlog import get_logger
 
 FILE_LOGGER = get_logger(__name__)
 
+# a row, with its columns as attributes; subclasses may give a named tuple
+SearchResult = Union[pd.Series, Tuple]
+
 
 @dataclass
 class DirectSearchError(Exception):
@@ -58,7 +62,7 @@ class DataframeSearchable:
             return self.dataframe[mask].iloc[0]
         raise DirectSearchError(field=field, search_term=search_term)
 
-    def retrieve_match(self, field: str, search_term: str) -> pd.Series:
+    def retrieve_match(self, field: str, search_term: str) -> SearchResult:
         for retrieval_method in [
             self.retrieve_direct_match,
             self._retrieve_fuzzy_fallback,
@@ -71,6 +75,23 @@ class DataframeSearchable:
                 pass
 
     def _retrieve_fuzzy_fallback(self, field: str, search_term: str):
+        best_match_search_term, best_match_quality = self._get_fuzzy_best_match(
+            field, search_term
+        )
+        self._check_fuzzy_match_quality(
+            field=field,
+            search_term=search_term,
+            best_match_search_term=best_match_search_term,
+            best_match_quality=best_match_quality,
+        )
+
+        field_values = self.dataframe[field].apply(self._purify_string).values
+        mask_result = field_values == best_match_search_term
+        return self.dataframe[mask_result].iloc[0]
+
+    def _get_fuzzy_best_match(
+        self, field: str, search_term: str
+    ) -> Tuple[str, float]:
         field_values = self.dataframe[field].apply(self._purify_string).values
         limit_number_results = self.config.fuzzy_match.limit_number_results
 
@@ -80,7 +101,15 @@ class DataframeSearchable:
             scorer=fuzz.ratio,
             limit=limit_number_results,
         )[0]
-
+        return best_match_search_term, best_match_quality
+
+    def _check_fuzzy_match_quality(
+        self,
+        field: str,
+        search_term: str,
+        best_match_search_term: str,
+        best_match_quality: float,
+    ):
         min_threshold_to_accept = self.config.fuzzy_match.min_thresh_to_accept
         if best_match_quality < min_threshold_to_accept:
             raise FuzzySearchError(
@@ -101,9 +130,6 @@ class DataframeSearchable:
                 threshold=min_thresh_ok_match,
             )
 
-        mask_result = field_values == best_match_search_term
-        return self.dataframe[mask_result].iloc[0]
-
     @staticmethod
     def _purify_string(search_term: str):
         return search_term.strip().casefold()
@@ -1,3 +1,6 @@
+import pandas as pd
+
+
 def convert_number_to_str(number, precision=2):
     """
     Returns string of given number with defined amount of significant digits.
@@ -8,3 +11,18 @@ def convert_number_to_str(number, precision=2):
     if isinstance(number, int):
         return f"{number}"
     return "{:g}".format(float("{:.{p}g}".format(number, p=precision)))
+
+
+def convert_number_series_to_str(number: pd.Series, precision=2) -> pd.Series:
+    """
+    Returns strings of given numbers, formatting each distinct number once.
+    :param number: numbers to print nicely (int/float)
+    :param precision: significant digits to be included
+    :return: formatted strings
+    """
+    number_str_map = {
+        value: convert_number_to_str(value, precision=precision)
+        # as python numbers, so integers are not rounded like floats
+        for value in number.unique().tolist()
+    }
+    return number.map(number_str_map)
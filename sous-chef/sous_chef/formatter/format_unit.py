@@ -1,5 +1,8 @@
 from dataclasses import dataclass
+from functools import lru_cache
 
+import numpy as np
+import pandas as pd
 from pint import DimensionalityError, Quantity, UndefinedUnitError, Unit
 from sous_chef.formatter.units import (
     allowed_unit_list,
@@ -23,6 +26,26 @@ class UnitExtractionError(Exception):
         return f"{self.message} text={self.text}"
 
 
+@dataclass(frozen=True)
+class UnitLabel:
+    singular: str
+    plural: str
+
+
+@lru_cache(maxsize=None)
+def get_unit_label(pint_unit: Unit) -> UnitLabel:
+    # rendering a unit is slow, but only a few units are ever used
+    if pint_unit == unit_registry.dimensionless:
+        return UnitLabel(singular="", plural="")
+
+    if pint_unit in not_abbreviated:
+        # TODO more robust way to do? e.g. inflection or define
+        return UnitLabel(singular=str(pint_unit), plural=f"{pint_unit}s")
+
+    abbreviated = "{:~}".format(pint_unit)
+    return UnitLabel(singular=abbreviated, plural=abbreviated)
+
+
 @dataclass
 class UnitFormatter:
     @staticmethod
@@ -36,19 +59,35 @@ class UnitFormatter:
         return converted_quantity, converted_value.units
 
     @staticmethod
-    def get_unit_str(quantity: float, pint_unit: Unit) -> str:
-        if pint_unit == unit_registry.dimensionless:
-            return ""
+    def get_conversion_factor(
+        pint_unit: Unit, desired_pint_unit: Unit
+    ) -> float:
+        # pint converts multiplicative units as quantity * factor
+        return (1 * pint_unit).to(desired_pint_unit).magnitude
 
-        if pint_unit in not_abbreviated:
-            # TODO more robust way to do? e.g. inflection or define
-            if quantity > 1:
-                return f"{pint_unit}s"
-
-            if pint_unit in not_abbreviated:
-                return str(pint_unit)
+    @staticmethod
+    def get_unit_str(quantity: float, pint_unit: Unit) -> str:
+        unit_label = get_unit_label(pint_unit)
+        if quantity > 1:
+            return unit_label.plural
+        return unit_label.singular
 
-        return "{:~}".format(pint_unit)
+    @staticmethod
+    def get_unit_str_series(
+        quantity: pd.Series, pint_unit: pd.Series
+    ) -> pd.Series:
+        # missing units are rendered as an empty string
+        label_map = {
+            unit: get_unit_label(unit) for unit in pint_unit.dropna().unique()
+        }
+        singular = pint_unit.map(
+            {unit: label.singular for unit, label in label_map.items()}
+        )
+        plural = pint_unit.map(
+            {unit: label.plural for unit, label in label_map.items()}
+        )
+        unit_str = np.where(quantity > 1, plural, singular)
+        return pd.Series(unit_str, index=pint_unit.index).fillna("")
 
     @staticmethod
     def get_pint_unit(text_unit: str) -> Unit:
@@ -1,6 +1,5 @@
 from dataclasses import dataclass
 
-import pandas as pd
 import regex
 from omegaconf import DictConfig
 from pint import Unit
@@ -11,7 +10,7 @@ from sous_chef.formatter.ingredient.format_referenced_recipe import (
     ReferencedRecipe,
     ReferencedRecipeLine,
 )
-from sous_chef.pantry_list.read_pantry_list import PantryList
+from sous_chef.pantry_list.read_pantry_list import PantryEntry, PantryList
 from structlog import get_logger
 
 from utilities.extended_enum import ExtendedEnum
@@ -32,7 +31,7 @@ class Ingredient:
     barcode: str = None
     recipe_uuid: str = None
 
-    def set_pantry_info(self, pantry_item: pd.Series):
+    def set_pantry_info(self, pantry_item: PantryEntry):
         self.item = pantry_item.true_ingredient
         self.group = pantry_item.group
         self.item_plural = pantry_item.item_plural
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, replace
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from omegaconf import DictConfig
+from joblib import Parallel, delayed
+from omegaconf import DictConfig, OmegaConf
 from pint import Unit
 from sous_chef.abstract.handle_exception import BaseWithExceptionHandling
 from sous_chef.formatter.format_unit import UnitFormatter
@@ -13,6 +15,14 @@ from sous_chef.formatter.ingredient.format_ingredient import (
 from sous_chef.formatter.ingredient.format_line_abstract import (
     MapLineErrorToException,
 )
+from sous_chef.formatter.ingredient.format_referenced_recipe import (
+    ReferencedRecipe,
+)
+from sous_chef.formatter.ingredient.ingredient_store import (
+    IngredientStore,
+    LineType,
+    ParsedLine,
+)
 from sous_chef.formatter.units import unit_registry
 from sous_chef.recipe_book.read_recipe_book import RecipeBook
 from sous_chef.recipe_book.recipe_util import (
@@ -62,28 +72,100 @@ class MapIngredientFieldErrorToException(ExtendedEnum):
     pass
 
 
+ParsedIngredientField = Tuple[List[RecipeSchema], List[Ingredient], List[str]]
+LineKey = Tuple[str, bool]
+
+
 @dataclass
 class IngredientField(BaseWithExceptionHandling):
     config: DictConfig
     ingredient_formatter: IngredientFormatter
     recipe_book: RecipeBook
-    ingredient_list: List = None
-    referenced_recipe_list: List = None
+    ingredient_store: IngredientStore = None
 
     def __post_init__(self):
         self.set_tuple_log_and_skip_exception_from_config(
             config_errors=self.config.errors,
             exception_mapper=MapIngredientFieldErrorToException,
         )
+        if self.ingredient_store is None and (
+            self.config.ingredient_store.is_active
+        ):
+            self.ingredient_store = IngredientStore()
 
     def parse_ingredient_field(
         self, recipe: RecipeSchema
-    ) -> Tuple[List[RecipeSchema], List[Ingredient], List]:
-        self.referenced_recipe_list = []
-        self.ingredient_list = []
-        self.record_exception = []
+    ) -> ParsedIngredientField:
+        return self.parse_ingredient_fields([recipe])[0]
+
+    def parse_ingredient_fields(
+        self, recipe_list: List[RecipeSchema]
+    ) -> List[ParsedIngredientField]:
+        # stateless, so can be shared; returned in order of given recipes
+        parsed_line_lists = self._get_parsed_line_lists(recipe_list)
+        return [
+            self._resolve_parsed_line_list(
+                source_recipe_title=recipe.title,
+                parsed_line_list=parsed_line_list,
+            )
+            for recipe, parsed_line_list in zip(recipe_list, parsed_line_lists)
+        ]
+
+    def parse_ingredient_lines(self, ingredients: str) -> List[ParsedLine]:
+        # only depends on the text, formatter & pantry, so can be stored
+        parsed_line_list = []
+        for line_index, line, is_in_optional_group in self._get_line_list(
+            ingredients
+        ):
+            parsed_line = self._parse_line(
+                line_index=line_index,
+                line=line,
+                is_in_optional_group=is_in_optional_group,
+            )
+            if parsed_line is not None:
+                parsed_line_list.append(parsed_line)
+        return parsed_line_list
+
+    def get_parsed_line_list(
+        self, recipe_uuid: str, ingredients: str
+    ) -> List[ParsedLine]:
+        if self.ingredient_store is None:
+            return self.parse_ingredient_lines(ingredients)
+
+        return self.ingredient_store.get_parsed_line_list(
+            **self._get_store_key(recipe_uuid, ingredients),
+            parse_lines=self.parse_ingredient_lines,
+        )
+
+    def save_fuzzy_match_memo(self):
+        self.ingredient_formatter.pantry_list.save_fuzzy_match_memo()
+
+    def is_parsed_line_list_stored(
+        self, recipe_uuid: str, ingredients: str
+    ) -> bool:
+        if self.ingredient_store is None:
+            return False
+        return self.ingredient_store.is_stored(
+            **self._get_store_key(recipe_uuid, ingredients)
+        )
+
+    def _get_store_key(self, recipe_uuid: str, ingredients: str) -> Dict:
+        return {
+            "recipe_uuid": recipe_uuid,
+            "ingredients": ingredients,
+            "pantry_version": self.ingredient_formatter.pantry_list.version,
+            "parser_config": {
+                "errors": OmegaConf.to_container(self.config.errors),
+                "format": OmegaConf.to_container(
+                    self.ingredient_formatter.config
+                ),
+            },
+        }
+
+    def _get_line_list(self, ingredients: str) -> List[Tuple[int, str, bool]]:
+        line_list = []
         is_in_optional_group = False
-        for line in recipe.ingredients.split("\n"):
+        for line_index, line in enumerate(ingredients.split("\n")):
             stripped_line = self.ingredient_formatter.strip_line(line)
 
             if stripped_line is None:
@@ -95,24 +177,155 @@ class IngredientField(BaseWithExceptionHandling):
                     self.ingredient_formatter.is_optional_group(stripped_line)
                 )
                 continue
-            elif stripped_line.startswith("#"):
-                self._format_referenced_recipe(
-                    source_recipe_title=recipe.title, line=stripped_line
+            line_list.append((line_index, stripped_line, is_in_optional_group))
+        return line_list
+
+    def _get_parsed_line_lists(
+        self, recipe_list: List[RecipeSchema]
+    ) -> List[List[ParsedLine]]:
+        parsed_line_lists = [None] * len(recipe_list)
+        unparsed_line_lists = {}
+        for recipe_index, recipe in enumerate(recipe_list):
+            if self.is_parsed_line_list_stored(recipe.uuid, recipe.ingredients):
+                parsed_line_lists[recipe_index] = self.get_parsed_line_list(
+                    recipe_uuid=recipe.uuid, ingredients=recipe.ingredients
                 )
             else:
-                self._format_ingredient(stripped_line, is_in_optional_group)
+                unparsed_line_lists[recipe_index] = self._get_line_list(
+                    recipe.ingredients
+                )
 
-        return (
-            self.referenced_recipe_list,
-            self.ingredient_list,
-            self.record_exception,
+        # identical lines (e.g. "1 onion") are parsed & pantry-resolved once
+        parsed_line_by_key = self._parse_distinct_lines(
+            unparsed_line_lists.values()
+        )
+        for recipe_index, line_list in unparsed_line_lists.items():
+            parsed_line_list = [
+                replace(parsed_line_by_key[(line, optional)], line_index=index)
+                for index, line, optional in line_list
+                if parsed_line_by_key[(line, optional)] is not None
+            ]
+            recipe = recipe_list[recipe_index]
+            parsed_line_lists[recipe_index] = self._store_parsed_line_list(
+                recipe=recipe, parsed_line_list=parsed_line_list
+            )
+        return parsed_line_lists
+
+    def _parse_distinct_lines(
+        self, line_lists: Iterable[List[Tuple[int, str, bool]]]
+    ) -> Dict[LineKey, Optional[ParsedLine]]:
+        line_key_list = list(
+            dict.fromkeys(
+                (line, is_in_optional_group)
+                for line_list in line_lists
+                for _, line, is_in_optional_group in line_list
+            )
+        )
+        FILE_LOGGER.info(
+            "[ingredient field]",
+            action="parse distinct lines",
+            num_lines=len(line_key_list),
         )
 
-    @BaseWithExceptionHandling.ExceptionHandler.handle_exception
-    def _format_referenced_recipe(self, source_recipe_title: str, line: str):
-        needed_ref_recipe = self.ingredient_formatter.format_referenced_recipe(
-            line
+        config_parallel = self.config.parallel
+        if config_parallel.n_jobs == 1 or (
+            len(line_key_list) <= config_parallel.batch_size
+        ):
+            return dict(
+                zip(line_key_list, self._parse_line_keys(line_key_list))
+            )
+
+        # recipe book holds pint quantities & is not needed to parse lines;
+        # batches are returned in order, so the merge is deterministic
+        line_parser = replace(self, recipe_book=None)
+        parsed_line_batches = Parallel(n_jobs=config_parallel.n_jobs)(
+            delayed(line_parser._parse_line_keys)(line_key_batch)
+            for line_key_batch in self._get_line_key_batches(line_key_list)
         )
+        return dict(zip(line_key_list, chain(*parsed_line_batches)))
+
+    def _get_line_key_batches(
+        self, line_key_list: List[LineKey]
+    ) -> List[List[LineKey]]:
+        batch_size = self.config.parallel.batch_size
+        line_key_batches = []
+        for start in range(0, len(line_key_list), batch_size):
+            end = start + batch_size
+            line_key_batches.append(line_key_list[start:end])
+        return line_key_batches
+
+    def _parse_line_keys(
+        self, line_key_list: List[LineKey]
+    ) -> List[Optional[ParsedLine]]:
+        parsed_line_list = [
+            self._parse_line(
+                line_index=0, line=line, is_in_optional_group=optional
+            )
+            for line, optional in line_key_list
+        ]
+        # once per batch, as it may run in a worker process
+        self.save_fuzzy_match_memo()
+        return parsed_line_list
+
+    def _resolve_parsed_line_list(
+        self, source_recipe_title: str, parsed_line_list: List[ParsedLine]
+    ) -> ParsedIngredientField:
+        referenced_recipe_list = []
+        ingredient_list = []
+        error_list = []
+        for parsed_line in parsed_line_list:
+            if parsed_line.line_type == LineType.error:
+                error_list.append(parsed_line.error)
+            elif parsed_line.line_type == LineType.referenced_recipe:
+                try:
+                    referenced_recipe_list.append(
+                        self._get_referenced_recipe(
+                            source_recipe_title=source_recipe_title,
+                            needed_ref_recipe=parsed_line.referenced_recipe,
+                        )
+                    )
+                except self.tuple_log_exception as exception:
+                    error_list.append(str(exception))
+                except self.tuple_skip_exception:
+                    pass
+            else:
+                ingredient_list.append(parsed_line.ingredient)
+        return referenced_recipe_list, ingredient_list, error_list
+
+    def _store_parsed_line_list(
+        self, recipe: RecipeSchema, parsed_line_list: List[ParsedLine]
+    ) -> List[ParsedLine]:
+        if self.ingredient_store is None:
+            return parsed_line_list
+        return self.ingredient_store.get_parsed_line_list(
+            **self._get_store_key(recipe.uuid, recipe.ingredients),
+            parse_lines=lambda _: parsed_line_list,
+        )
+
+    def _parse_line(
+        self, line_index: int, line: str, is_in_optional_group: bool
+    ) -> Optional[ParsedLine]:
+        # errors are kept with the line (instead of record_exception),
+        # so that they are stored & replayed with the parsed ingredients
+        parsed_line = ParsedLine(line_index=line_index, line=line)
+        try:
+            if line.startswith("#"):
+                parsed_line.referenced_recipe = (
+                    self.ingredient_formatter.format_referenced_recipe(line)
+                )
+            else:
+                parsed_line.ingredient = self._format_ingredient_line(
+                    line, is_in_optional_group
+                )
+        except self.tuple_log_exception as exception:
+            parsed_line.error = str(exception)
+        except self.tuple_skip_exception:
+            return None
+        return parsed_line
+
+    def _get_referenced_recipe(
+        self, source_recipe_title: str, needed_ref_recipe: ReferencedRecipe
+    ) -> RecipeSchema:
         ref_recipe = self.recipe_book.get_recipe_by_title(
             needed_ref_recipe.title
         )
@@ -120,35 +333,32 @@ class IngredientField(BaseWithExceptionHandling):
         if needed_ref_recipe.pint_unit != unit_registry.dimensionless:
             if (
                 ref_recipe.quantity.units.dimensionality
-                == needed_ref_recipe.pint_unit.dimensionality
+                != needed_ref_recipe.pint_unit.dimensionality
             ):
-                (
-                    needed_ref_quantity,
-                    needed_ref_units,
-                ) = UnitFormatter.convert_to_desired_unit(
-                    needed_ref_recipe.quantity,
-                    needed_ref_recipe.pint_unit,
-                    ref_recipe.quantity.units,
-                )
-                factor_dimensionless = (
-                    needed_ref_quantity * needed_ref_units / ref_recipe.quantity
+                raise ReferencedRecipeDimensionalityError(
+                    source_recipe_title=source_recipe_title,
+                    source_needed_unit=needed_ref_recipe.pint_unit,
+                    referenced_recipe_title=ref_recipe.title,
+                    referenced_recipe_unit=ref_recipe.quantity.units,
                 )
-
-                ref_recipe.factor *= factor_dimensionless.magnitude
-                ref_recipe.amount = needed_ref_recipe.amount
-                self.referenced_recipe_list.append(ref_recipe)
-                return
-            raise ReferencedRecipeDimensionalityError(
-                source_recipe_title=source_recipe_title,
-                source_needed_unit=needed_ref_recipe.pint_unit,
-                referenced_recipe_title=ref_recipe.title,
-                referenced_recipe_unit=ref_recipe.quantity.units,
+            (
+                needed_ref_quantity,
+                needed_ref_units,
+            ) = UnitFormatter.convert_to_desired_unit(
+                needed_ref_recipe.quantity,
+                needed_ref_recipe.pint_unit,
+                ref_recipe.quantity.units,
             )
+            factor_dimensionless = (
+                needed_ref_quantity * needed_ref_units / ref_recipe.quantity
+            )
+            ref_recipe.factor *= factor_dimensionless.magnitude
+        else:
+            # case without units should just be multiplication
+            ref_recipe.factor *= needed_ref_recipe.quantity
 
-        # case without units should just be multiplication
-        ref_recipe.factor *= needed_ref_recipe.quantity
         ref_recipe.amount = needed_ref_recipe.amount
-        self.referenced_recipe_list.append(ref_recipe)
+        return ref_recipe
 
     def _format_ingredient_line(self, line: str, is_in_optional_group: bool):
         ingredient = self.ingredient_formatter.format_ingredient_line(
@@ -157,8 +367,3 @@ class IngredientField(BaseWithExceptionHandling):
         if not ingredient.is_optional:
             setattr(ingredient, "is_optional", is_in_optional_group)
         return ingredient
-
-    @BaseWithExceptionHandling.ExceptionHandler.handle_exception
-    def _format_ingredient(self, line: str, is_in_optional_group: bool):
-        ingredient = self._format_ingredient_line(line, is_in_optional_group)
-        self.ingredient_list.append(ingredient)
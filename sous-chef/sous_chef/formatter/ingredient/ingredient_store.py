@@ -0,0 +1,196 @@
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+from joblib import Memory
+from joblib.memory import MemorizedFunc
+from sous_chef.formatter.ingredient.format_ingredient import Ingredient
+from sous_chef.formatter.ingredient.format_referenced_recipe import (
+    ReferencedRecipe,
+)
+from sous_chef.formatter.units import unit_registry
+from structlog import get_logger
+
+from utilities.extended_enum import ExtendedEnum
+
+FILE_LOGGER = get_logger(__name__)
+
+# initialize disk cache
+ABS_FILE_PATH = Path(__file__).absolute().parent
+CACHE_DIR = ABS_FILE_PATH / "diskcache"
+
+INGREDIENT_FIELDS = [
+    "factor",
+    "is_optional",
+    "group",
+    "item_plural",
+    "store",
+    "barcode",
+    "recipe_uuid",
+]
+PARSED_LINE_COLUMNS = [
+    "line_index",
+    "line",
+    "line_type",
+    "quantity",
+    "unit",
+    "item",
+    *INGREDIENT_FIELDS,
+    "amount",
+    "error",
+]
+
+
+class LineType(ExtendedEnum):
+    ingredient = "ingredient"
+    referenced_recipe = "referenced_recipe"
+    error = "error"
+
+
+@dataclass
+class ParsedLine:
+    line_index: int
+    line: str
+    ingredient: Ingredient = None
+    referenced_recipe: ReferencedRecipe = None
+    error: str = None
+
+    @property
+    def line_type(self) -> LineType:
+        if self.error is not None:
+            return LineType.error
+        if self.referenced_recipe is not None:
+            return LineType.referenced_recipe
+        return LineType.ingredient
+
+
+def get_text_hash(text: str) -> str:
+    return hashlib.sha256(str(text).encode()).hexdigest()
+
+
+def convert_parsed_line_list_to_df(
+    parsed_line_list: List[ParsedLine],
+) -> pd.DataFrame:
+    # pint units cannot be pickled in cache, so these are stored as strings
+    rows = []
+    for parsed_line in parsed_line_list:
+        row = {
+            "line_index": parsed_line.line_index,
+            "line": parsed_line.line,
+            "line_type": parsed_line.line_type.value,
+        }
+        if parsed_line.line_type == LineType.error:
+            row["error"] = parsed_line.error
+        elif parsed_line.line_type == LineType.referenced_recipe:
+            referenced_recipe = parsed_line.referenced_recipe
+            row["quantity"] = referenced_recipe.quantity
+            row["unit"] = str(referenced_recipe.pint_unit)
+            row["item"] = referenced_recipe.title
+            row["amount"] = referenced_recipe.amount
+        else:
+            ingredient = parsed_line.ingredient
+            row["quantity"] = ingredient.quantity
+            row["unit"] = str(ingredient.pint_unit)
+            row["item"] = ingredient.item
+            for ingredient_field in INGREDIENT_FIELDS:
+                row[ingredient_field] = getattr(ingredient, ingredient_field)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=PARSED_LINE_COLUMNS)
+
+
+def convert_df_to_parsed_line_list(
+    parsed_line_df: pd.DataFrame,
+) -> List[ParsedLine]:
+    parsed_line_df = parsed_line_df.astype(object)
+    parsed_line_df = parsed_line_df.where(parsed_line_df.notna(), None)
+
+    parsed_line_list = []
+    for row in parsed_line_df.itertuples(index=False):
+        parsed_line = ParsedLine(line_index=row.line_index, line=row.line)
+        line_type = LineType(row.line_type)
+        if line_type == LineType.error:
+            parsed_line.error = row.error
+        elif line_type == LineType.referenced_recipe:
+            parsed_line.referenced_recipe = ReferencedRecipe(
+                quantity=row.quantity,
+                pint_unit=unit_registry.Unit(row.unit),
+                title=row.item,
+                amount=row.amount,
+            )
+        else:
+            parsed_line.ingredient = Ingredient(
+                quantity=row.quantity,
+                pint_unit=unit_registry.Unit(row.unit),
+                item=row.item,
+                **{
+                    ingredient_field: getattr(row, ingredient_field)
+                    for ingredient_field in INGREDIENT_FIELDS
+                },
+            )
+        parsed_line_list.append(parsed_line)
+    return parsed_line_list
+
+
+def _parse_ingredient_field(
+    recipe_uuid: str,
+    ingredient_hash: str,
+    pantry_version: str,
+    parser_config: Dict,
+    ingredients: str,
+    parse_lines: Callable[[str], List[ParsedLine]],
+) -> pd.DataFrame:
+    FILE_LOGGER.info(
+        "[ingredient store]",
+        action="parse ingredient field",
+        recipe_uuid=recipe_uuid,
+    )
+    return convert_parsed_line_list_to_df(parse_lines(ingredients))
+
+
+@dataclass
+class IngredientStore:
+    cache_dir: Path = CACHE_DIR
+    _cached_parse: MemorizedFunc = field(init=False, repr=False)
+
+    def __post_init__(self):
+        cache = Memory(self.cache_dir, verbose=0)
+        # entries keyed by recipe uuid, ingredient text, pantry & parser config
+        self._cached_parse = cache.cache(
+            _parse_ingredient_field, ignore=["ingredients", "parse_lines"]
+        )
+
+    def get_parsed_line_list(
+        self,
+        recipe_uuid: str,
+        ingredients: str,
+        pantry_version: str,
+        parser_config: Dict,
+        parse_lines: Callable[[str], List[ParsedLine]],
+    ) -> List[ParsedLine]:
+        parsed_line_df = self._cached_parse(
+            recipe_uuid=recipe_uuid,
+            ingredient_hash=get_text_hash(ingredients),
+            pantry_version=pantry_version,
+            parser_config=parser_config,
+            ingredients=ingredients,
+            parse_lines=parse_lines,
+        )
+        return convert_df_to_parsed_line_list(parsed_line_df)
+
+    def is_stored(
+        self,
+        recipe_uuid: str,
+        ingredients: str,
+        pantry_version: str,
+        parser_config: Dict,
+    ) -> bool:
+        return self._cached_parse.check_call_in_cache(
+            recipe_uuid=recipe_uuid,
+            ingredient_hash=get_text_hash(ingredients),
+            pantry_version=pantry_version,
+            parser_config=parser_config,
+            ingredients=ingredients,
+            parse_lines=None,
+        )
@@ -0,0 +1,195 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+import pandas as pd
+from omegaconf import DictConfig, OmegaConf
+from sous_chef.date.get_due_date import MealTime, Weekday
+from sous_chef.recipe_book.recipe_util import RecipeSchema
+from structlog import get_logger
+
+from utilities.extended_enum import ExtendedEnum
+from utilities.validate_choice import YesNoChoices
+
+HOME_PATH = str(Path.home())
+FILE_LOGGER = get_logger(__name__)
+
+
+class MakeChoice(ExtendedEnum):
+    partial = "p"
+    whole = "w"
+    defrost = "d"
+    skip = "s"
+
+
+class DecisionKey(ExtendedEnum):
+    make = "make"
+    separately_schedule = "separately_schedule"
+    weekday = "weekday"
+    meal_time = "meal_time"
+
+
+# decision key -> enum its decisions are read as & their allowed values
+DECISION_CHOICE_MAP: Dict[str, Tuple[Type[ExtendedEnum], List[str]]] = {
+    DecisionKey.make.value: (MakeChoice, MakeChoice.value_list()),
+    DecisionKey.separately_schedule.value: (
+        YesNoChoices,
+        YesNoChoices.value_list(),
+    ),
+    DecisionKey.weekday.value: (Weekday, Weekday.name_list()),
+    DecisionKey.meal_time.value: (MealTime, MealTime.name_list()),
+}
+
+
+@dataclass
+class DecisionValueError(Exception):
+    title: str
+    key: str
+    decision: str
+    source: str
+    message: str = "[decision value error]"
+
+    def __post_init__(self):
+        super().__init__(self.message)
+
+    def __str__(self):
+        allowed_list = DECISION_CHOICE_MAP[self.key][1]
+        return (
+            f"{self.message}: {self.key}={self.decision} for "
+            f"title={self.title} in {self.source} not in {allowed_list}"
+        )
+
+
+@dataclass
+class ReferencedRecipeDecisionPolicy:
+    config: DictConfig
+    # referenced recipe title -> decision key -> decision
+    decisions: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    path: Optional[Path] = None
+
+    def __post_init__(self):
+        # fail before any recipe is processed, not when first decided
+        for index, rule in enumerate(self.config.rules):
+            title = rule.get("title") or f"rules[{index}]"
+            for key, decision in rule.decision.items():
+                self._validate_decision(title, key, decision, source="rule")
+        if self.config.file_path:
+            self.path = Path(HOME_PATH, self.config.file_path)
+            self.decisions = self._load_decisions()
+
+    def get_decision(
+        self,
+        recipe: RecipeSchema,
+        decision_key: DecisionKey,
+        ask: Callable[[], str],
+        is_interactive: bool = True,
+    ) -> str:
+        # decision file, then first matching rule, then ask
+        recipe_decisions = self.decisions.get(recipe.title, {})
+        if (decision := recipe_decisions.get(decision_key.value)) is not None:
+            source = "decision file"
+        elif (
+            decision := self._get_rule_decision(recipe, decision_key)
+        ) is None:
+            decision = ask()
+            if (
+                is_interactive
+                and self.config.record_interactive
+                and self.path is not None
+            ):
+                self._record_decision(recipe.title, decision_key, decision)
+            return decision
+        else:
+            source = "rule"
+
+        FILE_LOGGER.info(
+            "[referenced recipe decision]",
+            source=source,
+            recipe=recipe.title,
+            key=decision_key.value,
+            decision=decision,
+        )
+        return self._format_decision(decision)
+
+    @staticmethod
+    def _format_decision(decision) -> str:
+        # yaml reads yes/no as booleans
+        if isinstance(decision, bool):
+            return (YesNoChoices.yes if decision else YesNoChoices.no).value
+        return str(decision)
+
+    def _get_rule_decision(
+        self, recipe: RecipeSchema, decision_key: DecisionKey
+    ):
+        for rule in self.config.rules:
+            if decision_key.value not in rule.decision:
+                continue
+            if self._is_rule_matched(recipe, rule):
+                return rule.decision[decision_key.value]
+        return None
+
+    @staticmethod
+    def _is_rule_matched(recipe: RecipeSchema, rule: DictConfig) -> bool:
+        if rule.get("title") is not None and rule.title != recipe.title:
+            return False
+
+        time_total = recipe.time_total
+        if pd.isnull(time_total):
+            # unknown time only matches rules without time limits
+            return (
+                rule.get("min_time_total_minutes") is None
+                and rule.get("max_time_total_minutes") is None
+            )
+        time_total_minutes = time_total.total_seconds() / 60
+        if (minimum := rule.get("min_time_total_minutes")) is not None:
+            if time_total_minutes <= minimum:
+                return False
+        if (maximum := rule.get("max_time_total_minutes")) is not None:
+            if time_total_minutes >= maximum:
+                return False
+        return True
+
+    def _load_decisions(self) -> Dict[str, Dict[str, str]]:
+        if not self.path.exists():
+            return {}
+        if self.path.suffix == ".json":
+            with open(self.path, "r") as f:
+                decisions = json.load(f)
+        else:
+            decisions = OmegaConf.to_container(OmegaConf.load(self.path))
+
+        for title, recipe_decisions in decisions.items():
+            for key, decision in recipe_decisions.items():
+                self._validate_decision(
+                    title, key, decision, source=str(self.path)
+                )
+        return decisions
+
+    def _validate_decision(
+        self, title: str, key: str, decision, source: str
+    ) -> None:
+        # unknown keys are never asked for, so are left as they are
+        if key not in DECISION_CHOICE_MAP:
+            return
+        choice_enum, _ = DECISION_CHOICE_MAP[key]
+        try:
+            choice_enum(self._format_decision(decision))
+        except ValueError:
+            raise DecisionValueError(
+                title=title, key=key, decision=decision, source=source
+            )
+
+    def _record_decision(
+        self, title: str, decision_key: DecisionKey, decision: str
+    ):
+        self.decisions.setdefault(title, {})[decision_key.value] = decision
+        # saved per decision, so an interrupted run still keeps answers
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f"{self.path.suffix}.tmp")
+        if self.path.suffix == ".json":
+            with open(tmp_path, "w") as f:
+                json.dump(self.decisions, f, indent=2, sort_keys=True)
+        else:
+            OmegaConf.save(OmegaConf.create(self.decisions), tmp_path)
+        tmp_path.replace(self.path)
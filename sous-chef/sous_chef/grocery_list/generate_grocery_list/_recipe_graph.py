@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from sous_chef.formatter.ingredient.get_ingredient_field import (
+    IngredientField,
+    ParsedIngredientField,
+)
+from sous_chef.recipe_book.recipe_util import RecipeSchema
+from structlog import get_logger
+
+FILE_LOGGER = get_logger(__name__)
+
+
+@dataclass
+class ReferencedRecipeCycleError(Exception):
+    recipe_path: Tuple[str, ...]
+    message: str = "[referenced recipe cycle]"
+
+    def __post_init__(self):
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.message} path={' -> '.join(self.recipe_path)}"
+
+
+@dataclass
+class RecipeGraph:
+    ingredient_field: IngredientField
+    # referenced recipes are found by title, so titles are the nodes
+    nodes: Dict[str, ParsedIngredientField] = field(default_factory=dict)
+    _checked_nodes: Set[str] = field(default_factory=set, repr=False)
+
+    def add_recipes(self, recipe_list: List[RecipeSchema]):
+        # parse the referenced-recipe closure level by level, so each
+        # recipe is parsed once, even when referenced by several recipes
+        new_recipe_list = recipe_list
+        while new_recipe_list:
+            new_recipes = {}
+            for recipe in new_recipe_list:
+                if recipe.title not in self.nodes:
+                    new_recipes.setdefault(recipe.title, recipe)
+            if not new_recipes:
+                break
+            parsed_ingredient_fields = (
+                self.ingredient_field.parse_ingredient_fields(
+                    list(new_recipes.values())
+                )
+            )
+            self.nodes.update(zip(new_recipes.keys(), parsed_ingredient_fields))
+            new_recipe_list = [
+                referenced_recipe
+                for referenced_recipe_list, _, _ in parsed_ingredient_fields
+                for referenced_recipe in referenced_recipe_list
+            ]
+
+        for recipe in recipe_list:
+            self._remove_cycles(recipe.title)
+
+    def get_parsed_ingredient_field(
+        self, recipe: RecipeSchema
+    ) -> ParsedIngredientField:
+        if recipe.title not in self.nodes:
+            self.add_recipes([recipe])
+        return self.nodes[recipe.title]
+
+    def _remove_cycles(self, root_title: str):
+        # depth-first; an edge back to a recipe on the current path would
+        # make the expansion loop forever, so it is dropped & reported
+        if root_title in self._checked_nodes:
+            return
+
+        path = [root_title]
+        stack = [iter(self._get_referenced_titles(root_title))]
+        while stack:
+            title = next(stack[-1], None)
+            if title is None:
+                self._checked_nodes.add(path.pop())
+                stack.pop()
+            elif title in path:
+                cycle_start = path.index(title)
+                self._remove_edge(
+                    ReferencedRecipeCycleError(
+                        recipe_path=(*path[cycle_start:], title)
+                    )
+                )
+            elif title not in self._checked_nodes:
+                path.append(title)
+                stack.append(iter(self._get_referenced_titles(title)))
+
+    def _get_referenced_titles(self, title: str) -> List[str]:
+        referenced_recipe_list, _, _ = self.nodes[title]
+        return list(
+            dict.fromkeys(recipe.title for recipe in referenced_recipe_list)
+        )
+
+    def _remove_edge(self, error: ReferencedRecipeCycleError):
+        source_title, referenced_title = error.recipe_path[-2:]
+        FILE_LOGGER.warning(
+            "[recipe graph]",
+            action="drop referenced recipe",
+            recipe=source_title,
+            referenced_recipe=referenced_title,
+            error=str(error),
+        )
+        referenced_recipe_list, ingredient_list, error_list = self.nodes[
+            source_title
+        ]
+        self.nodes[source_title] = (
+            [
+                recipe
+                for recipe in referenced_recipe_list
+                if recipe.title != referenced_title
+            ],
+            ingredient_list,
+            [*error_list, str(error)],
+        )
@@ -0,0 +1,139 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional
+
+from structlog import get_logger
+from todoist_api_python.models import Task
+
+from utilities.api.base_classes.todoist import AbstractTodoistHelper
+from utilities.api.todoist_batch import TodoistBatch
+
+FILE_LOGGER = get_logger(__name__)
+
+SYNC_KEY_PREFIX = "[sync key] "
+
+
+def get_sync_key(description: Optional[str]) -> Optional[str]:
+    if not description:
+        return None
+    last_line = description.splitlines()[-1]
+    if last_line.startswith(SYNC_KEY_PREFIX):
+        return last_line.removeprefix(SYNC_KEY_PREFIX)
+    return None
+
+
+@dataclass
+class GroceryTask:
+    # item, unit & shopping date; the week is given by its label
+    sync_key: str
+    task: str
+    due_date: date
+    label_list: List[str]
+    barcode: str
+    section: str
+    section_id: str
+    priority: int
+
+    @property
+    def description(self) -> str:
+        return f"{self.barcode}\n{SYNC_KEY_PREFIX}{self.sync_key}"
+
+
+def add_grocery_task(
+    todoist_batch: TodoistBatch, grocery_task: GroceryTask, project_id: str
+):
+    todoist_batch.add_task(
+        task=grocery_task.task,
+        due_date=grocery_task.due_date,
+        label_list=grocery_task.label_list,
+        description=grocery_task.description,
+        project_id=project_id,
+        section=grocery_task.section,
+        section_id=grocery_task.section_id,
+        priority=grocery_task.priority,
+    )
+
+
+@dataclass
+class TodoistGrocerySync:
+    todoist_helper: AbstractTodoistHelper
+    project_name: str
+    week_label: str
+
+    def sync(self, grocery_task_list: List[GroceryTask]) -> Dict[str, int]:
+        # tasks are fetched once & only differences are sent to todoist
+        existing_task_map = self._get_existing_task_map()
+        project_id = self.todoist_helper.get_project_id(self.project_name)
+        todoist_batch = TodoistBatch(todoist_helper=self.todoist_helper)
+
+        count = {
+            "added": 0,
+            "moved": 0,
+            "updated": 0,
+            "deleted": 0,
+            "unchanged": 0,
+        }
+        for grocery_task in grocery_task_list:
+            existing_task = None
+            if existing_task_list := existing_task_map.get(
+                grocery_task.sync_key
+            ):
+                existing_task = existing_task_list.pop(0)
+
+            if existing_task is None:
+                add_grocery_task(todoist_batch, grocery_task, project_id)
+                count["added"] += 1
+                continue
+
+            # todoist cannot move tasks between sections via update
+            is_moved = existing_task.section_id != grocery_task.section_id
+            if is_moved:
+                todoist_batch.move_task(
+                    task_id=existing_task.id,
+                    section_id=grocery_task.section_id,
+                )
+                count["moved"] += 1
+
+            if self._is_changed(existing_task, grocery_task):
+                todoist_batch.update_task(
+                    task_id=existing_task.id,
+                    task=grocery_task.task,
+                    label_list=grocery_task.label_list,
+                    description=grocery_task.description,
+                    priority=grocery_task.priority,
+                )
+                count["updated"] += 1
+            elif not is_moved:
+                count["unchanged"] += 1
+
+        for existing_task_list in existing_task_map.values():
+            for existing_task in existing_task_list:
+                todoist_batch.delete_task(task_id=existing_task.id)
+                count["deleted"] += 1
+        todoist_batch.flush()
+
+        FILE_LOGGER.info(
+            "[todoist sync]",
+            project=self.project_name,
+            week_label=self.week_label,
+            **count,
+        )
+        return count
+
+    def _get_existing_task_map(self) -> Dict[Optional[str], List[Task]]:
+        existing_task_map = defaultdict(list)
+        for task in self.todoist_helper.get_tasks_in_project(
+            self.project_name, only_with_label=self.week_label
+        ):
+            existing_task_map[get_sync_key(task.description)].append(task)
+        return existing_task_map
+
+    def _is_changed(self, existing_task: Task, grocery_task: GroceryTask):
+        label_list = self.todoist_helper.get_label_list(grocery_task.label_list)
+        return (
+            existing_task.content != grocery_task.task
+            or existing_task.description != grocery_task.description
+            or existing_task.priority != grocery_task.priority
+            or sorted(existing_task.labels) != sorted(label_list)
+        )
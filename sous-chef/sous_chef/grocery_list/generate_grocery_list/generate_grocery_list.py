@@ -1,16 +1,33 @@
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from itertools import chain
-from typing import List, Tuple, Type
+from typing import Callable, Dict, List, Optional, Tuple, Type
 
+import numpy as np
 import pandas as pd
 from omegaconf import DictConfig
 from pint import Unit
 from sous_chef.date.get_due_date import DueDatetimeFormatter, MealTime, Weekday
-from sous_chef.formatter.format_str import convert_number_to_str
+from sous_chef.formatter.format_str import convert_number_series_to_str
 from sous_chef.formatter.format_unit import UnitFormatter, unit_registry
 from sous_chef.formatter.ingredient.format_ingredient import Ingredient
-from sous_chef.formatter.ingredient.get_ingredient_field import IngredientField
+from sous_chef.formatter.ingredient.get_ingredient_field import (
+    IngredientField,
+    ParsedIngredientField,
+)
+from sous_chef.grocery_list.generate_grocery_list._decision_policy import (
+    DecisionKey,
+    MakeChoice,
+    ReferencedRecipeDecisionPolicy,
+)
+from sous_chef.grocery_list.generate_grocery_list._recipe_graph import (
+    RecipeGraph,
+)
+from sous_chef.grocery_list.generate_grocery_list._todoist_sync import (
+    GroceryTask,
+    TodoistGrocerySync,
+    add_grocery_task,
+)
 from sous_chef.menu.create_menu._output_for_grocery_list import (
     MenuIngredient,
     MenuRecipe,
@@ -20,6 +37,7 @@ from structlog import get_logger
 from termcolor import cprint
 
 from utilities.api.todoist_api import TodoistHelper
+from utilities.api.todoist_batch import TodoistBatch
 from utilities.validate_choice import YesNoChoices
 
 # TODO method to mark ingredients that can only be bought the day before
@@ -39,6 +57,89 @@ class GroceryListIncompleteError(Exception):
         return f"{self.message} {self.custom_message}"
 
 
+GROCERY_LIST_RAW_COLUMNS = [
+    "quantity",
+    "pint_unit",
+    "item",
+    "is_optional",
+    "food_group",
+    "item_plural",
+    "store",
+    "barcode",
+    "from_recipe",
+    "for_day",
+]
+
+
+GROCERY_LIST_COLUMNS = [
+    "pint_unit",
+    "item",
+    "is_optional",
+    "quantity",
+    "food_group",
+    "item_plural",
+    "store",
+    "barcode",
+    "from_recipe",
+    "for_day",
+    "for_day_str",
+    "shopping_date",
+]
+
+
+def _get_sorted_unique_per_group(
+    group_index: np.ndarray, values: pd.Series
+) -> List[List]:
+    # categories are sorted, so unique (group, code) pairs are sorted values
+    categorical = pd.Categorical(values)
+    pair = np.unique(np.stack([group_index, categorical.codes]), axis=1)
+    num_group = group_index.max() + 1 if len(group_index) > 0 else 0
+    boundary = np.searchsorted(pair[0], np.arange(1, num_group))
+    sorted_values = categorical.categories.to_numpy()[pair[1]]
+    return [group.tolist() for group in np.split(sorted_values, boundary)][
+        :num_group
+    ]
+
+
+def _get_sorted_union(list_series: pd.Series) -> List:
+    return sorted(set(chain.from_iterable(list_series)))
+
+
+@dataclass
+class PreparationTask:
+    task: str
+    due_date: datetime
+    from_recipe: List[str]
+    for_day_str: List[str]
+
+
+PREPARATION_TASK_COLUMNS = ["task", "due_date", "from_recipe", "for_day_str"]
+
+
+@dataclass
+class GroceryListRawAccumulator:
+    # append-only columns, as concatenating row-wise dataframes is quadratic
+    columns: Dict[str, List] = field(
+        default_factory=lambda: {
+            column: [] for column in GROCERY_LIST_RAW_COLUMNS
+        }
+    )
+
+    def __len__(self):
+        return len(self.columns["item"])
+
+    def append(self, **entry):
+        for column in GROCERY_LIST_RAW_COLUMNS:
+            self.columns[column].append(entry[column])
+
+    def extend(self, other: "GroceryListRawAccumulator"):
+        for column in GROCERY_LIST_RAW_COLUMNS:
+            self.columns[column].extend(other.columns[column])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, columns=GROCERY_LIST_RAW_COLUMNS)
+
+
 @dataclass
 class GroceryList:
     config: DictConfig
@@ -46,15 +147,23 @@ class GroceryList:
     unit_formatter: UnitFormatter
     ingredient_field: IngredientField
     # TODO do properly? pass everything inside methods? only set final list?
+    # may be shared, so several weeks parse each recipe once
+    recipe_graph: RecipeGraph = None
     queue_menu_recipe: List[MenuRecipe] = None
-    queue_preparation: pd.DataFrame = None
+    preparation_task_list: List[PreparationTask] = field(default_factory=list)
     grocery_list_raw: pd.DataFrame = None
+    grocery_list_raw_accumulator: GroceryListRawAccumulator = field(
+        default_factory=GroceryListRawAccumulator
+    )
     grocery_list: pd.DataFrame = None
+    # entries converted from canned beans, whose preparation is planned
+    dried_bean: pd.DataFrame = None
     primary_shopping_date: date = None
     secondary_shopping_date: date = None
     second_shopping_day_group: Tuple = ()
     has_errors: bool = False
     app_week_label: str = field(init=False)
+    decision_policy: ReferencedRecipeDecisionPolicy = field(init=False)
 
     def __post_init__(self):
         self.primary_shopping_date = (
@@ -80,6 +189,26 @@ class GroceryList:
 
         calendar_week = self.due_date_formatter.get_calendar_week()
         self.app_week_label = f"app-week-{calendar_week}"
+        self.decision_policy = ReferencedRecipeDecisionPolicy(
+            self.config.referenced_recipe_decision
+        )
+        if self.recipe_graph is None:
+            self.recipe_graph = RecipeGraph(
+                ingredient_field=self.ingredient_field
+            )
+
+    @property
+    def queue_preparation(self) -> Optional[pd.DataFrame]:
+        # tasks are only collected, so materialized once when needed
+        if len(self.preparation_task_list) == 0:
+            return None
+        return pd.DataFrame(
+            [
+                [getattr(task, column) for column in PREPARATION_TASK_COLUMNS]
+                for task in self.preparation_task_list
+            ],
+            columns=PREPARATION_TASK_COLUMNS,
+        )
 
     def get_grocery_list_from_menu(
         self,
@@ -96,6 +225,23 @@ class GroceryList:
 
         return self.grocery_list
 
+    def get_combined_grocery_list(
+        self, grocery_list_list: List["GroceryList"]
+    ) -> pd.DataFrame:
+        # entries of all lists are bought on this list's shopping dates
+        for grocery_list in grocery_list_list:
+            self.grocery_list_raw_accumulator.extend(
+                grocery_list.grocery_list_raw_accumulator
+            )
+            self.has_errors |= grocery_list.has_errors
+        # beans as converted per week, so what its preparation tasks cook
+        self._aggregate_grocery_list(
+            dried_bean_list=[
+                grocery_list.dried_bean for grocery_list in grocery_list_list
+            ]
+        )
+        return self.grocery_list
+
     def upload_grocery_list_to_todoist(self, todoist_helper: TodoistHelper):
         if self.has_errors:
             raise GroceryListIncompleteError(
@@ -104,72 +250,56 @@ class GroceryList:
 
         # TODO what should be in todoist (e.g. dry mode & messages?)
         project_name = self.config.todoist.project_name
-        if self.config.todoist.remove_existing_task:
-            todoist_helper.delete_all_items_in_project(
-                project_name, only_with_label=self.app_week_label
-            )
-
-        for aisle_group, group in self.grocery_list.groupby(
-            "aisle_group", as_index=False
+        grocery_task_list = self._get_grocery_task_list(todoist_helper)
+        if self.config.todoist.incremental_sync:
+            TodoistGrocerySync(
+                todoist_helper=todoist_helper,
+                project_name=project_name,
+                week_label=self.app_week_label,
+            ).sync(grocery_task_list)
+            return
+
+        # a re-run after an interruption only sends what is missing
+        with todoist_helper.resumable_upload(
+            f"{project_name}-{self.app_week_label}"
         ):
-            section_name = aisle_group
-            if aisle_group in self.config.store_to_specialty_list:
-                section_name = "Specialty"
-            if aisle_group in self.config.todoist.skip_group:
-                FILE_LOGGER.warning(
-                    "[skip group]",
-                    action="do not add to todoist",
-                    section=section_name,
-                    aisle_group=aisle_group,
-                    ingredient_list=group["item"].values,
+            if self.config.todoist.remove_existing_task:
+                todoist_helper.delete_all_items_in_project(
+                    project_name, only_with_label=self.app_week_label
                 )
-                continue
 
             project_id = todoist_helper.get_project_id(project_name)
-            section_id = todoist_helper.get_section_id(
-                project_id=project_id, section_name=section_name
-            )
-
-            # TODO CODE-197 add barcode (and later item name in description)
-            for _, entry in group.iterrows():
-                todoist_helper.add_task_to_project(
-                    task=self._format_ingredient_str(entry),
-                    due_date=entry["shopping_date"],
-                    label_list=entry["from_recipe"]
-                    + entry["for_day_str"]
-                    + [self.app_week_label],
-                    description=str(entry["barcode"]),
-                    project=project_name,
-                    project_id=project_id,
-                    section=section_name,
-                    section_id=section_id,
-                    priority=(
-                        2
-                        if entry["shopping_date"] != self.primary_shopping_date
-                        else 1
-                    ),
-                )
+            with TodoistBatch(todoist_helper=todoist_helper) as todoist_batch:
+                for grocery_task in grocery_task_list:
+                    add_grocery_task(todoist_batch, grocery_task, project_id)
 
     def send_preparation_to_todoist(self, todoist_helper: TodoistHelper):
         # TODO separate service? need freezer check for defrosts
         project_name = self.config.preparation.project_name
-        if self.config.todoist.remove_existing_prep_task:
-            todoist_helper.delete_all_items_in_project(
-                project_name, only_with_label=self.app_week_label
-            )
+        with todoist_helper.resumable_upload(
+            f"{project_name}-{self.app_week_label}"
+        ):
+            if self.config.todoist.remove_existing_prep_task:
+                todoist_helper.delete_all_items_in_project(
+                    project_name, only_with_label=self.app_week_label
+                )
 
-        if self.queue_preparation is not None:
-            for _, row in self.queue_preparation.iterrows():
-                todoist_helper.add_task_to_project(
-                    task=row.task,
-                    project=project_name,
-                    label_list=list(
-                        chain.from_iterable([row.from_recipe, row.for_day_str])
+            project_id = todoist_helper.get_project_id(project_name)
+            with TodoistBatch(todoist_helper=todoist_helper) as todoist_batch:
+                for task in self.preparation_task_list:
+                    todoist_batch.add_task(
+                        task=task.task,
+                        project=project_name,
+                        project_id=project_id,
+                        label_list=list(
+                            chain.from_iterable(
+                                [task.from_recipe, task.for_day_str]
+                            )
+                        )
+                        + ["prep", self.app_week_label],
+                        due_date=task.due_date,
+                        priority=self.config.preparation.task_priority,
                     )
-                    + ["prep", self.app_week_label],
-                    due_date=row.due_date,
-                    priority=self.config.preparation.task_priority,
-                )
 
     def _add_to_grocery_list_raw(
         self,
@@ -184,31 +314,17 @@ class GroceryList:
         from_recipe: str,
         for_day: datetime,
     ):
-        if self.grocery_list_raw is None:
-            self.grocery_list_raw = pd.DataFrame()
-
-        new_entry = pd.DataFrame(
-            {
-                "quantity": quantity,
-                "pint_unit": pint_unit,
-                "item": item,
-                "is_optional": is_optional,
-                "food_group": food_group,
-                "item_plural": item_plural,
-                "store": store,
-                "barcode": barcode,
-                "from_recipe": from_recipe,
-                "for_day": for_day,
-                "for_day_str": for_day.strftime("%a"),
-                "shopping_date": self._get_shopping_day(
-                    for_day=for_day, food_group=food_group
-                ),
-            },
-            index=[0],
-        )
-
-        self.grocery_list_raw = pd.concat(
-            [self.grocery_list_raw, new_entry], ignore_index=True
+        self.grocery_list_raw_accumulator.append(
+            quantity=quantity,
+            pint_unit=pint_unit,
+            item=item,
+            is_optional=is_optional,
+            food_group=food_group,
+            item_plural=item_plural,
+            store=store,
+            barcode=barcode,
+            from_recipe=from_recipe,
+            for_day=for_day,
         )
 
     def _add_bulk_manual_ingredient_to_grocery_list(
@@ -246,20 +362,14 @@ class GroceryList:
         from_recipe: List[str],
         for_day_str: List[str],
     ):
-        preparation_task = pd.DataFrame(
-            {
-                "task": [task],
-                "due_date": [due_date],
-                "from_recipe": [from_recipe],
-                "for_day_str": [for_day_str],
-            }
-        )
-        if self.queue_preparation is None:
-            self.queue_preparation = preparation_task
-        else:
-            self.queue_preparation = pd.concat(
-                [self.queue_preparation, preparation_task]
+        self.preparation_task_list.append(
+            PreparationTask(
+                task=task,
+                due_date=due_date,
+                from_recipe=from_recipe,
+                for_day_str=for_day_str,
             )
+        )
 
     def _add_referenced_recipe_to_queue(
         self, menu_recipe: MenuRecipe, recipe_list: List[RecipeSchema]
@@ -268,10 +378,10 @@ class GroceryList:
 
         def _check_make_defrost_skip(text: str) -> str:
             if debug_mode:
-                return "p"
+                return MakeChoice.partial.value
 
             response = None
-            while response not in ["p", "w", "d", "s"]:
+            while response not in MakeChoice.value_list():
                 response = input(
                     f"\n{text} [p]artial, [w]hole, [d]efrost, [s]kip: "
                 ).lower()
@@ -285,7 +395,7 @@ class GroceryList:
                 f"{lprint[il]} [{il}]" for il in range(len(lprint))
             )
 
-        def _get_schedule_day_hour_minute() -> datetime:
+        def _ask_weekday() -> str:
             day = None
             weekday_indices = Weekday.indices()
             while (
@@ -297,7 +407,9 @@ class GroceryList:
                     input(f"\nWeekday ({_print_week_day_enum(Weekday)}): ")
                     or "-1"
                 )
+            return Weekday.get_by_index(int(day)).name
 
+        def _ask_meal_time() -> str:
             meal_time = None
             meal_times = MealTime.name_list("lower")
             while (
@@ -312,11 +424,24 @@ class GroceryList:
                     )
                     or "4"
                 )
-            meal_time = meal_times[int(meal_time)]
+            return meal_times[int(meal_time)]
 
+        def _get_schedule_day_hour_minute() -> datetime:
+            weekday = _get_decision(DecisionKey.weekday, _ask_weekday)
+            meal_time = _get_decision(DecisionKey.meal_time, _ask_meal_time)
             return self.due_date_formatter.get_due_datetime_with_time(
-                weekday=Weekday.get_by_index(int(day)).name,
-                time=MealTime[meal_time].value,
+                weekday=Weekday(weekday).name,
+                time=MealTime(meal_time).value,
+            )
+
+        def _get_decision(
+            decision_key: DecisionKey, ask: Callable[[], str]
+        ) -> str:
+            return self.decision_policy.get_decision(
+                recipe,
+                decision_key=decision_key,
+                ask=ask,
+                is_interactive=not debug_mode,
             )
 
         def _give_referenced_recipe_details():
@@ -335,20 +460,28 @@ class GroceryList:
 
             if self.config.run_mode.check_referenced_recipe:
                 _give_referenced_recipe_details()
-                sub_recipe_response = _check_make_defrost_skip(
-                    f"Make '{recipe.title}'?"
+                sub_recipe_response = MakeChoice(
+                    _get_decision(
+                        DecisionKey.make,
+                        lambda: _check_make_defrost_skip(
+                            f"Make '{recipe.title}'?"
+                        ),
+                    )
                 )
-                if sub_recipe_response == "d":
+                if sub_recipe_response == MakeChoice.defrost:
                     self._add_preparation_task_to_queue(
                         f"[DEFROST] {recipe.amount}",
                         due_date=menu_recipe.for_day - timedelta(days=1),
                         from_recipe=[from_recipe],
                         for_day_str=[menu_recipe.for_day.strftime("%a")],
                     )
-                elif sub_recipe_response in ["p", "w"]:
+                elif sub_recipe_response in [
+                    MakeChoice.partial,
+                    MakeChoice.whole,
+                ]:
                     eat_factor = menu_recipe.eat_factor * recipe.factor
                     freeze_factor = menu_recipe.freeze_factor * recipe.factor
-                    if sub_recipe_response == "w":
+                    if sub_recipe_response == MakeChoice.whole:
                         eat_factor = recipe.factor
                         freeze_factor = 1 - recipe.factor
 
@@ -373,20 +506,26 @@ class GroceryList:
                         recipe.time_total is None
                         or recipe.time_total > timedelta(minutes=15)
                     ):
-                        change_schedule = YesNoChoices.ask_yes_no(
-                            "...separately schedule?", debug_mode=debug_mode
+                        change_schedule = YesNoChoices(
+                            _get_decision(
+                                DecisionKey.separately_schedule,
+                                lambda: YesNoChoices.ask_yes_no(
+                                    "...separately schedule?",
+                                    debug_mode=debug_mode,
+                                ).value,
+                            )
                         )
 
                         if change_schedule == YesNoChoices.yes:
                             schedule_datetime = _get_schedule_day_hour_minute()
                             if schedule_datetime > menu_recipe.for_day:
                                 schedule_datetime -= timedelta(days=7)
-                            if sub_recipe_response != "w":
+                            if sub_recipe_response != MakeChoice.whole:
                                 prep_item = recipe.amount
 
                     if (
                         change_schedule == YesNoChoices.yes
-                        or sub_recipe_response == "w"
+                        or sub_recipe_response == MakeChoice.whole
                     ):
                         self._add_preparation_task_to_queue(
                             f"[PREP] {prep_item}",
@@ -397,200 +536,449 @@ class GroceryList:
                             ],
                         )
 
-    def _aggregate_grocery_list(self):
-        # do not drop nas, as some items are dimensionless (None)
-        if self.grocery_list is None:
-            self.grocery_list = pd.DataFrame()
-
+    def _aggregate_grocery_list(
+        self, dried_bean_list: List[Optional[pd.DataFrame]] = None
+    ):
+        self._materialize_grocery_list_raw()
         # TODO add for_day option
-        self.grocery_list_raw["dimension"] = (
-            self.grocery_list_raw.pint_unit.apply(
-                lambda x: str(x.dimensionality)
-            )
+        self.grocery_list_raw["dimension"] = self._get_dimension(
+            self.grocery_list_raw.pint_unit
         )
 
         # TODO fix pantry list to not do lidl for meats (real group instead)
-        grouped = self.grocery_list_raw.groupby(
-            ["item", "dimension", "shopping_date"], dropna=False
+        grocery_list_raw = self._get_grocery_list_raw_in_same_pint_unit(
+            self.grocery_list_raw
+        )
+        self.grocery_list = self._aggregate_grocery_list_raw(
+            grocery_list_raw, dried_bean_list=dried_bean_list
         )
-        for name, group in grouped:
-            # if more than 1 unit, use largest
-            if group.pint_unit.nunique() > 1:
-                group = self._get_group_in_same_pint_unit(group)
-            agg_group = self._aggregate_group_to_grocery_list(group)
-            self.grocery_list = pd.concat(
-                [self.grocery_list, agg_group], ignore_index=True
-            )
 
         # get aisle/store
-        self.grocery_list["aisle_group"] = self.grocery_list.food_group.apply(
-            self._transform_food_to_aisle_group
+        self.grocery_list["aisle_group"] = self._transform_food_to_aisle_group(
+            self.grocery_list.food_group
         )
 
         # replace aisle group to store name when not default store
-        self.grocery_list["aisle_group"] = self.grocery_list.apply(
-            self._override_aisle_group_when_not_default_store, axis=1
+        self.grocery_list["aisle_group"] = (
+            self._override_aisle_group_when_not_default_store(self.grocery_list)
         )
 
-        # reset index and set in class
-        self.grocery_list = self.grocery_list.reset_index(drop=True)
-
-    def _aggregate_group_to_grocery_list(
-        self, group: pd.DataFrame
+    def _aggregate_grocery_list_raw(
+        self,
+        grocery_list_raw: pd.DataFrame,
+        dried_bean_list: List[Optional[pd.DataFrame]] = None,
     ) -> pd.DataFrame:
-        groupby_columns = ["pint_unit", "item", "is_optional"]
+        # units are already the same per item & dimension, so not a key;
         # set dropna to false, as item may not have unit
-        agg = (
-            group.groupby(groupby_columns, as_index=False, dropna=False)
+        grouped = grocery_list_raw.groupby(
+            ["item", "dimension", "shopping_date", "is_optional"],
+            sort=True,
+            dropna=False,
+        )
+        group_index = grouped.ngroup().to_numpy()
+        agg = grouped.agg(
+            pint_unit=("pint_unit", "first"),
+            quantity=("quantity", "sum"),
+            food_group=("food_group", "first"),
+            item_plural=("item_plural", "first"),
+            store=("store", "first"),
+            barcode=("barcode", "first"),
+            for_day=("for_day", "min"),
+        ).reset_index()
+        agg["from_recipe"] = _get_sorted_unique_per_group(
+            group_index, grocery_list_raw.from_recipe
+        )
+        agg["for_day_str"] = _get_sorted_unique_per_group(
+            group_index, grocery_list_raw.for_day_str
+        )
+        agg = agg[GROCERY_LIST_COLUMNS].astype({"barcode": str})
+        if self.config.ingredient_replacement.can_to_dried_bean.is_active:
+            if dried_bean_list is None:
+                agg = self._override_can_to_dried_bean(agg)
+            else:
+                agg = self._replace_can_with_dried_bean(agg, dried_bean_list)
+        return agg
+
+    def _replace_can_with_dried_bean(
+        self,
+        grocery_list: pd.DataFrame,
+        dried_bean_list: List[Optional[pd.DataFrame]],
+    ) -> pd.DataFrame:
+        grocery_list = grocery_list[~self._get_can_bean_mask(grocery_list)]
+        dried_bean_list = [
+            dried_bean
+            for dried_bean in dried_bean_list
+            if dried_bean is not None and not dried_bean.empty
+        ]
+        if len(dried_bean_list) == 0:
+            return grocery_list.reset_index(drop=True)
+
+        dried_bean = pd.concat(dried_bean_list, ignore_index=True)
+        dried_bean["shopping_date"] = self._get_shopping_date(
+            for_day=dried_bean.for_day, food_group=dried_bean.food_group
+        )
+        # already in grams, so only summed
+        dried_bean = (
+            dried_bean.groupby(
+                ["item", "shopping_date", "is_optional"], sort=True
+            )
             .agg(
+                pint_unit=("pint_unit", "first"),
                 quantity=("quantity", "sum"),
                 food_group=("food_group", "first"),
                 item_plural=("item_plural", "first"),
                 store=("store", "first"),
                 barcode=("barcode", "first"),
-                from_recipe=("from_recipe", lambda x: sorted(list(set(x)))),
+                from_recipe=("from_recipe", _get_sorted_union),
                 for_day=("for_day", "min"),
-                for_day_str=("for_day_str", lambda x: sorted(list(set(x)))),
-                shopping_date=("shopping_date", "first"),
+                for_day_str=("for_day_str", _get_sorted_union),
             )
-            .astype({"barcode": str})
+            .reset_index()
+        )
+        return pd.concat(
+            [grocery_list, dried_bean[GROCERY_LIST_COLUMNS]],
+            ignore_index=True,
         )
-        if self.config.ingredient_replacement.can_to_dried_bean.is_active:
-            agg = agg.apply(self._override_can_to_dried_bean, axis=1)
-        return agg
 
-    def _format_bean_prep_task_str(
-        self, row: pd.Series, freeze_quantity: int
-    ) -> str:
-        ingredient_str = self._format_ingredient_str(row)
+    def _format_bean_prep_task_str_column(
+        self, ingredient_str: pd.Series, freeze_quantity: int
+    ) -> pd.Series:
         unit_str = self.unit_formatter.get_unit_str(
             freeze_quantity, unit_registry.can
         )
         return (
-            f"[BEAN PREP] {ingredient_str} "
-            f"(freeze: {freeze_quantity} {unit_str})"
+            "[BEAN PREP] "
+            + ingredient_str
+            + f" (freeze: {freeze_quantity} {unit_str})"
         )
 
-    def _format_bean_soak_task_str(self, row: pd.Series) -> str:
-        ingredient_str = self._format_ingredient_str(row)
-        return f"[BEAN SOAK] {ingredient_str}"
-
-    def _format_ingredient_str(self, entry: pd.Series) -> str:
-        item = entry["item"]
-        if entry["quantity"] > 1 or not pd.isnull(entry["pint_unit"]):
-            item = entry["item_plural"]
-        if (
-            "aisle_group" in entry.keys()
-            and entry["aisle_group"] in self.config.store_to_specialty_list
+    @staticmethod
+    def _format_bean_soak_task_str_column(
+        ingredient_str: pd.Series,
+    ) -> pd.Series:
+        return "[BEAN SOAK] " + ingredient_str
+
+    def _get_grocery_task_list(
+        self, todoist_helper: TodoistHelper
+    ) -> List[GroceryTask]:
+        project_id = todoist_helper.get_project_id(
+            self.config.todoist.project_name
+        )
+        grocery_list = self.grocery_list.assign(
+            ingredient_str=self._format_ingredient_str_column(self.grocery_list)
+        )
+        grocery_task_list = []
+        for aisle_group, group in grocery_list.groupby(
+            "aisle_group", as_index=False
         ):
-            item = f"[{entry['aisle_group']}] {item}"
+            section_name = aisle_group
+            if aisle_group in self.config.store_to_specialty_list:
+                section_name = "Specialty"
+            if aisle_group in self.config.todoist.skip_group:
+                FILE_LOGGER.warning(
+                    "[skip group]",
+                    action="do not add to todoist",
+                    section=section_name,
+                    aisle_group=aisle_group,
+                    ingredient_list=group["item"].values,
+                )
+                continue
+
+            section_id = todoist_helper.get_section_id(
+                project_id=project_id, section_name=section_name
+            )
 
-        ingredient_str = "{item}, {quantity}".format(
-            item=item, quantity=convert_number_to_str(entry.quantity)
+            # TODO CODE-197 add barcode (and later item name in description)
+            for _, entry in group.iterrows():
+                grocery_task_list.append(
+                    GroceryTask(
+                        sync_key=self._get_sync_key(entry),
+                        task=entry["ingredient_str"],
+                        due_date=entry["shopping_date"],
+                        label_list=entry["from_recipe"]
+                        + entry["for_day_str"]
+                        + [self.app_week_label],
+                        barcode=str(entry["barcode"]),
+                        section=section_name,
+                        section_id=section_id,
+                        priority=(
+                            2
+                            if entry["shopping_date"]
+                            != self.primary_shopping_date
+                            else 1
+                        ),
+                    )
+                )
+        return grocery_task_list
+
+    @staticmethod
+    def _get_sync_key(entry: pd.Series) -> str:
+        item = entry["item"]
+        if entry["is_optional"]:
+            item += " (optional)"
+        return "|".join(
+            [
+                item,
+                str(entry["pint_unit"]),
+                f"{entry['shopping_date']:%Y-%m-%d}",
+            ]
         )
 
-        if not pd.isnull(entry.pint_unit):
-            unit_str = self.unit_formatter.get_unit_str(
-                entry["quantity"], entry["pint_unit"]
+    def _format_ingredient_str(self, entry: pd.Series) -> str:
+        return self._format_ingredient_str_column(entry.to_frame().T).iloc[0]
+
+    def _format_ingredient_str_column(
+        self, grocery_list: pd.DataFrame
+    ) -> pd.Series:
+        # display strings of the whole list, so sinks reuse a single column
+        quantity = grocery_list["quantity"]
+        pint_unit = grocery_list["pint_unit"]
+        has_unit = pint_unit.notna()
+
+        item = grocery_list["item"].where(
+            (quantity <= 1) & ~has_unit, grocery_list["item_plural"]
+        )
+        if "aisle_group" in grocery_list.columns:
+            aisle_group = grocery_list["aisle_group"]
+            is_specialty = aisle_group.isin(
+                list(self.config.store_to_specialty_list)
             )
-            ingredient_str += f" {unit_str}"
+            item = item.where(~is_specialty, "[" + aisle_group + "] " + item)
+
+        ingredient_str = item + ", " + convert_number_series_to_str(quantity)
+        ingredient_str = ingredient_str.where(
+            ~has_unit,
+            ingredient_str
+            + " "
+            + self.unit_formatter.get_unit_str_series(quantity, pint_unit),
+        )
+        return ingredient_str.where(
+            ~grocery_list["is_optional"].astype(bool),
+            ingredient_str + " (optional)",
+        )
 
-        if entry.is_optional:
-            ingredient_str += " (optional)"
+    @staticmethod
+    def _get_dimension(pint_unit: pd.Series) -> pd.Series:
+        dimension_map = {
+            unit: str(unit.dimensionality) for unit in pint_unit.unique()
+        }
+        return pint_unit.map(dimension_map).astype(object)
 
-        return ingredient_str
+    def _get_grocery_list_raw_in_same_pint_unit(
+        self, grocery_list_raw: pd.DataFrame
+    ) -> pd.DataFrame:
+        grocery_list_raw = grocery_list_raw.copy()
+        group_key = grocery_list_raw.groupby(
+            ["item", "dimension", "shopping_date"], dropna=False
+        ).ngroup()
+
+        unit_code, unit_list = pd.factorize(grocery_list_raw.pint_unit)
+        unit_code = pd.Series(unit_code, index=grocery_list_raw.index)
+        root_magnitude = np.array(
+            [(1 * unit).to_root_units().magnitude for unit in unit_list]
+        )[unit_code]
+
+        # if more than 1 unit, use largest; on ties, the first unit seen
+        is_largest = (
+            root_magnitude
+            == pd.Series(root_magnitude)
+            .groupby(group_key.to_numpy())
+            .transform("max")
+            .to_numpy()
+        )
+        largest_code = (
+            unit_code.where(is_largest)
+            .groupby(group_key)
+            .transform("first")
+            .astype(int)
+        )
+        mask_convert = (
+            unit_code.groupby(group_key).transform("nunique") > 1
+        ).to_numpy()
+        if not mask_convert.any():
+            return grocery_list_raw
+
+        conversion_pair = pd.DataFrame(
+            {"unit": unit_code, "largest": largest_code}
+        )[mask_convert]
+        factor_map = {
+            (unit, largest): self.unit_formatter.get_conversion_factor(
+                unit_list[unit], unit_list[largest]
+            )
+            for unit, largest in conversion_pair.drop_duplicates().itertuples(
+                index=False
+            )
+        }
+        factor = [
+            factor_map[pair]
+            for pair in conversion_pair.itertuples(index=False, name=None)
+        ]
+        # python round, as numpy rounds halves differently
+        quantity = grocery_list_raw.quantity[mask_convert].to_numpy(dtype=float)
+        grocery_list_raw.loc[mask_convert, "quantity"] = [
+            round(value, 2) for value in (quantity * factor).tolist()
+        ]
+        grocery_list_raw.loc[mask_convert, "pint_unit"] = unit_list[
+            largest_code[mask_convert]
+        ]
+        return grocery_list_raw
 
-    def _get_group_in_same_pint_unit(self, group: pd.DataFrame) -> pd.DataFrame:
-        largest_unit = max(group.pint_unit.unique())
-        group["quantity"], group["pint_unit"] = zip(
-            *group.apply(
-                lambda row: self.unit_formatter.convert_to_desired_unit(
-                    row.quantity, row.pint_unit, largest_unit
-                ),
-                axis=1,
+    def _get_shopping_date(
+        self, for_day: pd.Series, food_group: pd.Series
+    ) -> pd.Series:
+        shopping_date = pd.Series(
+            self.primary_shopping_date, index=for_day.index, dtype=object
+        )
+        if self.secondary_shopping_date:
+            mask_after_day = for_day.dt.date >= self.secondary_shopping_date
+            # food group may be none, particularly if pantry item not found
+            mask_group = (
+                food_group.astype("string")
+                .str.casefold()
+                .isin(list(self.second_shopping_day_group))
+            )
+            shopping_date[mask_after_day & mask_group] = (
+                self.secondary_shopping_date
             )
+        return shopping_date
+
+    def _materialize_grocery_list_raw(self):
+        grocery_list_raw = self.grocery_list_raw_accumulator.to_dataframe()
+        grocery_list_raw["for_day"] = pd.to_datetime(grocery_list_raw.for_day)
+        grocery_list_raw["for_day_str"] = grocery_list_raw.for_day.dt.strftime(
+            "%a"
         )
-        return group
+        grocery_list_raw["shopping_date"] = self._get_shopping_date(
+            for_day=grocery_list_raw.for_day,
+            food_group=grocery_list_raw.food_group,
+        )
+        self.grocery_list_raw = grocery_list_raw
 
-    def _get_shopping_day(self, for_day: datetime, food_group: str) -> date:
-        if (
-            self.secondary_shopping_date
-            and (for_day.date() >= self.secondary_shopping_date)
-            and (food_group.casefold() in self.second_shopping_day_group)
+    def _override_can_to_dried_bean(
+        self, grocery_list: pd.DataFrame
+    ) -> pd.DataFrame:
+        config_bean_prep = self.config.bean_prep
+        config_bean = self.config.ingredient_replacement.can_to_dried_bean
+        mask_bean = self._get_can_bean_mask(grocery_list)
+        self.dried_bean = None
+        if not mask_bean.any():
+            return grocery_list
+
+        grocery_list = grocery_list.copy()
+        bean = grocery_list[mask_bean]
+        cans = bean["quantity"] + config_bean.number_can_to_freeze
+        grocery_list.loc[mask_bean, "item"] = "dried " + bean["item"]
+        grocery_list.loc[mask_bean, "item_plural"] = (
+            "dried " + bean["item_plural"]
+        )
+        grocery_list.loc[mask_bean, "food_group"] = "Beans"
+        grocery_list.loc[mask_bean, "pint_unit"] = pd.Series(
+            [unit_registry.gram] * len(bean), index=bean.index, dtype=object
+        )
+        grocery_list.loc[mask_bean, "quantity"] = cans * config_bean.g_per_can
+
+        # bean soaking & cooking tasks, per bean in order of the list
+        dried_bean = grocery_list[mask_bean]
+        ingredient_str = self._format_ingredient_str_column(dried_bean)
+        soak_task = self._format_bean_soak_task_str_column(ingredient_str)
+        prep_task = self._format_bean_prep_task_str_column(
+            ingredient_str, config_bean.number_can_to_freeze
+        )
+        prep_date = bean["for_day"] - timedelta(days=config_bean_prep.prep_day)
+        soak_date = prep_date - timedelta(
+            hours=config_bean_prep.soak_before_hours
+        )
+        for_day_str = bean["for_day"].dt.strftime("%a")
+        for (
+            soak,
+            prep,
+            soak_due_date,
+            prep_due_date,
+            from_recipe,
+            day,
+        ) in zip(
+            soak_task,
+            prep_task,
+            soak_date,
+            prep_date,
+            dried_bean["from_recipe"],
+            for_day_str,
         ):
-            return self.secondary_shopping_date
-        return self.primary_shopping_date
+            self.preparation_task_list.extend(
+                [
+                    PreparationTask(
+                        task=soak,
+                        due_date=self._get_bean_prep_due_date(soak_due_date),
+                        from_recipe=from_recipe,
+                        for_day_str=[day],
+                    ),
+                    PreparationTask(
+                        task=prep,
+                        due_date=self._get_bean_prep_due_date(prep_due_date),
+                        from_recipe=from_recipe,
+                        for_day_str=[day],
+                    ),
+                ]
+            )
+        self.dried_bean = dried_bean
+        return grocery_list
 
-    def _override_can_to_dried_bean(self, row: pd.Series) -> pd.Series:
-        config_bean_prep = self.config.bean_prep
+    def _get_can_bean_mask(self, grocery_list: pd.DataFrame) -> pd.Series:
         config_bean = self.config.ingredient_replacement.can_to_dried_bean
         # TODO better in ingredient formatter with prep-tag? similar cases?
-        if row["item"] not in config_bean.bean_list:
-            return row
-        if row["pint_unit"] != unit_registry.can:
-            return row
-
-        cans = row["quantity"] + config_bean.number_can_to_freeze
-        row["item"] = f"dried {row['item']}"
-        row["item_plural"] = f"dried {row['item_plural']}"
-        row["food_group"] = "Beans"
-        row["pint_unit"] = unit_registry.gram
-        row["quantity"] = cans * config_bean.g_per_can
-
-        # bean soaking task
-        self._add_preparation_task_to_queue(
-            task=self._format_bean_soak_task_str(row),
-            due_date=self.due_date_formatter.replace_time_with_meal_time(
-                due_date=row.for_day
-                - timedelta(days=config_bean_prep.prep_day)
-                - timedelta(hours=config_bean_prep.soak_before_hours),
-                meal_time=config_bean_prep.prep_meal,
-            ),
-            from_recipe=row.from_recipe,
-            for_day_str=[row.for_day.strftime("%a")],
-        )
-
-        # bean cooking task
-        self._add_preparation_task_to_queue(
-            task=self._format_bean_prep_task_str(
-                row, config_bean.number_can_to_freeze
-            ),
-            due_date=self.due_date_formatter.replace_time_with_meal_time(
-                due_date=row.for_day
-                - timedelta(days=config_bean_prep.prep_day),
-                meal_time=config_bean_prep.prep_meal,
-            ),
-            from_recipe=row.from_recipe,
-            for_day_str=[row.for_day.strftime("%a")],
-        )
-        return row
-
-    def _override_aisle_group_when_not_default_store(self, row):
+        return grocery_list["item"].isin(
+            list(config_bean.bean_list)
+        ) & grocery_list["pint_unit"].isin([unit_registry.can])
+
+    def _get_bean_prep_due_date(self, due_date: datetime) -> datetime:
+        return self.due_date_formatter.replace_time_with_meal_time(
+            due_date=due_date, meal_time=self.config.bean_prep.prep_meal
+        )
+
+    def _override_aisle_group_when_not_default_store(
+        self, grocery_list: pd.DataFrame
+    ) -> pd.Series:
         # if pantry item not found, store not set
-        if row.store:
-            if row.store.casefold() != self.config.default_store.casefold():
-                return row.store
-        return row.aisle_group
+        store = grocery_list.store.astype("string")
+        mask_other_store = (
+            (store != "")
+            & (store.str.casefold() != self.config.default_store.casefold())
+        ).fillna(False)
+        return grocery_list.aisle_group.where(
+            ~mask_other_store, grocery_list.store
+        )
 
     def _process_recipe_queue(self):
-        while len(self.queue_menu_recipe) > 0:
-            current_recipe = self.queue_menu_recipe[0]
+        # each recipe in the referenced-recipe closure is parsed once;
+        # the queue only expands recipes with their scaling factors
+        self.recipe_graph.add_recipes(
+            [menu_recipe.recipe for menu_recipe in self.queue_menu_recipe]
+        )
+        # referenced recipes are appended while iterating, so index instead
+        # of popping from the front
+        queue_index = 0
+        while queue_index < len(self.queue_menu_recipe):
+            menu_recipe = self.queue_menu_recipe[queue_index]
+            queue_index += 1
             FILE_LOGGER.info(
                 "[grocery list]",
                 action="processing",
-                recipe=current_recipe.recipe.title,
+                recipe=menu_recipe.recipe.title,
+            )
+            self._process_parsed_ingredient_field(
+                menu_recipe,
+                self.recipe_graph.get_parsed_ingredient_field(
+                    menu_recipe.recipe
+                ),
             )
-            self._parse_ingredient_from_recipe(current_recipe)
-            self.queue_menu_recipe = self.queue_menu_recipe[1:]
+        self.queue_menu_recipe = []
 
-    def _parse_ingredient_from_recipe(self, menu_recipe: MenuRecipe):
-        (
-            recipe_list,
-            ingredient_list,
-            error_list,
-        ) = self.ingredient_field.parse_ingredient_field(
-            recipe=menu_recipe.recipe
-        )
+    def _process_parsed_ingredient_field(
+        self,
+        menu_recipe: MenuRecipe,
+        parsed_ingredient_field: ParsedIngredientField,
+    ):
+        recipe_list, ingredient_list, error_list = parsed_ingredient_field
         self._add_referenced_recipe_to_queue(menu_recipe, recipe_list)
         self._process_ingredient_list(menu_recipe, ingredient_list)
         # TO DO somehow get back to a google drive doc
@@ -617,9 +1005,15 @@ class GroceryList:
                 for_day=menu_recipe.for_day,
             )
 
-    def _transform_food_to_aisle_group(self, food_group: str):
-        aisle_map = self.config.food_group_to_aisle_map
+    def _transform_food_to_aisle_group(
+        self, food_group: pd.Series
+    ) -> pd.Series:
+        aisle_map = dict(self.config.food_group_to_aisle_map)
         # food_group may be none, particularly if pantry item not found
-        if food_group and food_group.casefold() in aisle_map:
-            return aisle_map[food_group.casefold()]
-        return "Unknown"
+        return (
+            food_group.astype("string")
+            .str.casefold()
+            .map(aisle_map)
+            .fillna("Unknown")
+            .astype(object)
+        )
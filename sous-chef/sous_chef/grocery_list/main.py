@@ -1,28 +1,26 @@
+from typing import Dict, List, Optional
+
 import hydra
 import pandas as pd
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 from sous_chef.date.get_due_date import DueDatetimeFormatter
-from sous_chef.formatter.format_unit import UnitFormatter
-from sous_chef.formatter.ingredient.format_ingredient import IngredientFormatter
-from sous_chef.formatter.ingredient.get_ingredient_field import IngredientField
+from sous_chef.grocery_list.generate_grocery_list._recipe_graph import (
+    RecipeGraph,
+)
 from sous_chef.grocery_list.generate_grocery_list.generate_grocery_list import (
     GroceryList,
 )
 from sous_chef.menu.create_menu.create_menu import Menu
-from sous_chef.pantry_list.read_pantry_list import PantryList
-from sous_chef.recipe_book.read_recipe_book import RecipeBook
 from sous_chef.rtk.read_write_rtk import RtkService
+from sous_chef.session.service_session import ServiceSession
 from structlog import get_logger
 
-from utilities.api.gsheets_api import GsheetsHelper
-from utilities.api.todoist_api import TodoistHelper
-
 LOGGER = get_logger(__name__)
 
 
 def run_grocery_list(config: DictConfig) -> pd.DataFrame:
     if config.grocery_list.run_mode.only_clean_todoist_mode:
-        todoist_helper = TodoistHelper(config.api.todoist)
+        todoist_helper = ServiceSession(config).get_todoist_helper()
         LOGGER.info(
             "Deleting previous tasks in project {}".format(
                 config.grocery_list.todoist.project_name
@@ -31,50 +29,106 @@ def run_grocery_list(config: DictConfig) -> pd.DataFrame:
         todoist_helper.delete_all_items_in_project(
             config.grocery_list.todoist.project_name
         )
+    elif config.grocery_list.multi_week.week_offsets:
+        _, combined_grocery_list = run_multi_week_grocery_list(config)
+        return combined_grocery_list
     else:
-        # unzip latest recipe versions
-        rtk_service = RtkService(config.rtk)
-        rtk_service.unzip()
-
-        gsheets_helper = GsheetsHelper(config.api.gsheets)
-        unit_formatter = UnitFormatter()
-        recipe_book = RecipeBook(config.recipe_book)
-        ingredient_formatter = _get_ingredient_formatter(
-            config, gsheets_helper, unit_formatter
+        grocery_list = _get_grocery_list_for_weeks(
+            config, week_offset_list=[None]
+        )[0]
+        return grocery_list.grocery_list
+
+
+def run_multi_week_grocery_list(
+    config: DictConfig,
+) -> (Dict[int, pd.DataFrame], pd.DataFrame):
+    week_offset_list = list(config.grocery_list.multi_week.week_offsets)
+    # only the combined list is uploaded, as the weeks are shopped together
+    grocery_list_list = _get_grocery_list_for_weeks(
+        config, week_offset_list, with_grocery_upload=False
+    )
+
+    # bought together on the shopping dates of the first week
+    first_grocery_list = grocery_list_list[0]
+    combined_grocery = GroceryList(
+        config.grocery_list,
+        due_date_formatter=first_grocery_list.due_date_formatter,
+        ingredient_field=first_grocery_list.ingredient_field,
+        unit_formatter=first_grocery_list.unit_formatter,
+    )
+    combined_grocery_list = combined_grocery.get_combined_grocery_list(
+        grocery_list_list
+    )
+    if config.grocery_list.run_mode.with_todoist:
+        combined_grocery.upload_grocery_list_to_todoist(
+            ServiceSession(config).get_todoist_helper()
         )
-        ingredient_field = IngredientField(
-            config.formatter.get_ingredient_field,
-            ingredient_formatter=ingredient_formatter,
-            recipe_book=recipe_book,
+
+    weekly_grocery_list = {
+        week_offset: grocery_list.grocery_list
+        for week_offset, grocery_list in zip(
+            week_offset_list, grocery_list_list
         )
+    }
+    return weekly_grocery_list, combined_grocery_list
+
+
+def _get_grocery_list_for_weeks(
+    config: DictConfig,
+    week_offset_list: List[Optional[int]],
+    with_grocery_upload: bool = True,
+) -> List[GroceryList]:
+    # unzip latest recipe versions
+    rtk_service = RtkService(config.rtk)
+    rtk_service.unzip()
+
+    # loaded once & shared by the menu and grocery list of every week
+    session = ServiceSession(config)
+    ingredient_field = session.get_ingredient_field()
+    recipe_graph = RecipeGraph(ingredient_field=ingredient_field)
+    menu = Menu(config=config, session=session)
+    todoist_helper = None
+    if config.grocery_list.run_mode.with_todoist:
+        todoist_helper = session.get_todoist_helper()
 
-        due_date_formatter = DueDatetimeFormatter(config=config.date.due_date)
+    grocery_list_list = []
+    for week_offset in week_offset_list:
+        config_due_date = config.date.due_date
+        worksheet = None
+        if week_offset is not None:
+            LOGGER.info("[grocery list]", week_offset=week_offset)
+            config_due_date = OmegaConf.merge(
+                config_due_date, {"week_offset": week_offset}
+            )
+            worksheet = config.grocery_list.multi_week.final_menu_worksheet
+            worksheet = worksheet.format(week_offset=week_offset)
 
         # get menu for grocery list
-        menu = Menu(config=config)
         (
             menu_ingredient_list,
             menu_recipe_list,
-        ) = menu.get_menu_for_grocery_list()
+        ) = menu.get_menu_for_grocery_list(worksheet=worksheet)
 
         # get grocery list
         grocery_list = GroceryList(
             config.grocery_list,
-            due_date_formatter=due_date_formatter,
+            due_date_formatter=DueDatetimeFormatter(config=config_due_date),
             ingredient_field=ingredient_field,
-            unit_formatter=unit_formatter,
+            unit_formatter=session.get_unit_formatter(),
+            recipe_graph=recipe_graph,
         )
-        final_grocery_list = grocery_list.get_grocery_list_from_menu(
+        grocery_list.get_grocery_list_from_menu(
             menu_ingredient_list, menu_recipe_list
         )
 
         # send grocery list to desired output
         # TODO add functionality to choose which helper/function
-        if config.grocery_list.run_mode.with_todoist:
-            todoist_helper = TodoistHelper(config.api.todoist)
-            grocery_list.upload_grocery_list_to_todoist(todoist_helper)
+        if todoist_helper is not None:
+            if with_grocery_upload:
+                grocery_list.upload_grocery_list_to_todoist(todoist_helper)
             grocery_list.send_preparation_to_todoist(todoist_helper)
-        return final_grocery_list
+        grocery_list_list.append(grocery_list)
+    return grocery_list_list
 
 
 @hydra.main(
@@ -84,18 +138,5 @@ def main(config: DictConfig) -> None:
     run_grocery_list(config=config)
 
 
-def _get_ingredient_formatter(
-    config: DictConfig,
-    gsheets_helper: GsheetsHelper,
-    unit_formatter: UnitFormatter,
-):
-    pantry_list = PantryList(config.pantry_list, gsheets_helper=gsheets_helper)
-    return IngredientFormatter(
-        config.formatter.format_ingredient,
-        unit_formatter=unit_formatter,
-        pantry_list=pantry_list,
-    )
-
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+from joblib import Parallel, delayed
+from omegaconf import DictConfig
+from sous_chef.formatter.ingredient.get_ingredient_field import IngredientField
+from sous_chef.formatter.ingredient.ingredient_store import (
+    PARSED_LINE_COLUMNS,
+    LineType,
+    convert_parsed_line_list_to_df,
+)
+from structlog import get_logger
+
+HOME_PATH = str(Path.home())
+FILE_LOGGER = get_logger(__name__)
+
+RECIPE_COLUMNS = ["uuid", "title"]
+INGREDIENT_TABLE_COLUMNS = [*RECIPE_COLUMNS, *PARSED_LINE_COLUMNS]
+ERROR_REPORT_COLUMNS = [*RECIPE_COLUMNS, "line_index", "line", "error"]
+
+
+def _concat_tables(table_list: List[pd.DataFrame]) -> pd.DataFrame:
+    table_list = [table for table in table_list if not table.empty]
+    if len(table_list) == 0:
+        return pd.DataFrame(columns=INGREDIENT_TABLE_COLUMNS)
+    return pd.concat(table_list, ignore_index=True)
+
+
+def _parse_recipe_batch(
+    ingredient_field: IngredientField, recipe_df: pd.DataFrame
+) -> pd.DataFrame:
+    table_list = []
+    for recipe in recipe_df.itertuples(index=False):
+        parsed_line_df = convert_parsed_line_list_to_df(
+            ingredient_field.get_parsed_line_list(
+                recipe_uuid=recipe.uuid, ingredients=recipe.ingredients
+            )
+        )
+        parsed_line_df.insert(0, "title", recipe.title)
+        parsed_line_df.insert(0, "uuid", recipe.uuid)
+        table_list.append(parsed_line_df)
+    # once per batch, as it may run in a worker process
+    ingredient_field.save_fuzzy_match_memo()
+    return _concat_tables(table_list)
+
+
+@dataclass
+class IngredientTable:
+    config: DictConfig
+    ingredient_field: IngredientField
+    path: Path = None
+
+    def __post_init__(self):
+        self.path = Path(HOME_PATH, self.config.path)
+
+    def create_ingredient_table(
+        self, recipe_book_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        recipe_df = recipe_book_df[[*RECIPE_COLUMNS, "ingredients"]]
+        recipe_df = recipe_df[recipe_df.ingredients.notna()]
+
+        # stored recipes are only loaded, so not worth sending to a process
+        mask_stored = [
+            self.ingredient_field.is_parsed_line_list_stored(
+                recipe_uuid=recipe.uuid, ingredients=recipe.ingredients
+            )
+            for recipe in recipe_df.itertuples(index=False)
+        ]
+        mask_stored = pd.Series(mask_stored, index=recipe_df.index, dtype=bool)
+        FILE_LOGGER.info(
+            "[create ingredient table]",
+            num_recipes=recipe_df.shape[0],
+            num_to_parse=(~mask_stored).sum(),
+        )
+
+        # recipe book holds pint quantities & is not needed to parse lines
+        line_parser = replace(self.ingredient_field, recipe_book=None)
+        table_list = [_parse_recipe_batch(line_parser, recipe_df[mask_stored])]
+        table_list += Parallel(n_jobs=self.config.n_jobs)(
+            delayed(_parse_recipe_batch)(line_parser, recipe_batch)
+            for recipe_batch in self._get_recipe_batches(
+                recipe_df[~mask_stored]
+            )
+        )
+        return (
+            _concat_tables(table_list)
+            .sort_values(["title", "uuid", "line_index"])
+            .reset_index(drop=True)
+        )
+
+    @staticmethod
+    def get_error_report(ingredient_table: pd.DataFrame) -> pd.DataFrame:
+        mask_error = ingredient_table.line_type == LineType.error.value
+        return ingredient_table[mask_error][ERROR_REPORT_COLUMNS].reset_index(
+            drop=True
+        )
+
+    def save_ingredient_table(self, ingredient_table: pd.DataFrame):
+        error_report = self.get_error_report(ingredient_table)
+        FILE_LOGGER.info(
+            "[save ingredient table]",
+            path=self.path,
+            num_lines=ingredient_table.shape[0],
+            num_errors=error_report.shape[0],
+        )
+        self.path.mkdir(parents=True, exist_ok=True)
+        ingredient_table.to_csv(
+            self.path / self.config.file_ingredient_table, index=False
+        )
+        error_report.to_csv(
+            self.path / self.config.file_error_report, index=False
+        )
+
+    def save_fuzzy_match_report(self, fuzzy_match_report: pd.DataFrame):
+        FILE_LOGGER.info(
+            "[save fuzzy match report]",
+            path=self.path,
+            num_queries=fuzzy_match_report.shape[0],
+        )
+        self.path.mkdir(parents=True, exist_ok=True)
+        fuzzy_match_report.to_csv(
+            self.path / self.config.file_fuzzy_match_report, index=False
+        )
+
+    def _get_recipe_batches(self, recipe_df: pd.DataFrame) -> List:
+        batch_size = self.config.batch_size
+        recipe_batches = []
+        for start in range(0, recipe_df.shape[0], batch_size):
+            end = start + batch_size
+            recipe_batches.append(recipe_df.iloc[start:end])
+        return recipe_batches
@@ -0,0 +1,43 @@
+import hydra
+import pandas as pd
+from omegaconf import DictConfig
+from sous_chef.ingredient_table.create_ingredient_table import IngredientTable
+from sous_chef.rtk.read_write_rtk import RtkService
+from sous_chef.session.service_session import ServiceSession
+from structlog import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+def run_ingredient_table(config: DictConfig) -> pd.DataFrame:
+    # unzip latest recipe versions
+    rtk_service = RtkService(config.rtk)
+    rtk_service.unzip()
+
+    session = ServiceSession(config)
+    recipe_book = session.get_recipe_book()
+    pantry_list = session.get_pantry_list()
+    ingredient_field = session.get_ingredient_field()
+
+    ingredient_table = IngredientTable(
+        config.ingredient_table, ingredient_field=ingredient_field
+    )
+    table = ingredient_table.create_ingredient_table(recipe_book.dataframe)
+    ingredient_table.save_ingredient_table(table)
+    ingredient_table.save_fuzzy_match_report(
+        pantry_list.get_fuzzy_match_report()
+    )
+    return table
+
+
+@hydra.main(
+    config_path="../../config",
+    config_name="ingredient_table",
+    version_base=None,
+)
+def main(config: DictConfig) -> None:
+    run_ingredient_table(config=config)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from sous_chef.date.get_due_date import DueDatetimeFormatter
 from sous_chef.menu.create_menu.models import TmpMenuSchema, Type, YesNo
 
 from utilities.api.todoist_api import TodoistHelper
+from utilities.api.todoist_batch import TodoistBatch
 
 
 class MenuForTodoist:
@@ -30,14 +31,24 @@ class MenuForTodoist:
         self.app_week_label = f"app-week-{self.calendar_week}"
         # external service
         self.project_id = todoist_helper.get_project_id(self.project_name)
+        self.todoist_batch: TodoistBatch = None
 
     def upload_menu_to_todoist(self) -> None:
+        # a re-run after an interruption only sends what is missing
+        with self.todoist_helper.resumable_upload(
+            f"{self.project_name}-{self.app_week_label}"
+        ):
+            self._upload_menu_to_todoist()
+
+    def _upload_menu_to_todoist(self) -> None:
         if self.remove_existing_task:
             self.todoist_helper.delete_all_items_in_project(
                 self.project_name,
                 only_with_label=self.app_week_label,
             )
 
+        # sent in a few requests; children refer to the parent's temp id
+        self.todoist_batch = TodoistBatch(todoist_helper=self.todoist_helper)
         edit_task_id = self._add_task(
             task_name=f"edit recipes from week #{self.calendar_week}",
             task_due_date=self.due_date_formatter.get_anchor_date()
@@ -68,6 +79,7 @@ class MenuForTodoist:
                     task_name=f"[DEFROST] {task}",
                     task_due_date=row.cook_datetime - timedelta(days=1),
                 )
+        self.todoist_batch.flush()
 
     def _add_task(
         self,
@@ -75,7 +87,7 @@ class MenuForTodoist:
         task_due_date: Union[date, datetime] = None,
         parent_id: str = None,
     ) -> str:
-        task_object = self.todoist_helper.add_task_to_project(
+        return self.todoist_batch.add_task(
             task=task_name,
             project=self.project_name,
             project_id=self.project_id,
@@ -84,7 +96,6 @@ class MenuForTodoist:
             parent_id=parent_id,
             label_list=[self.app_week_label],
         )
-        return task_object.id
 
     @staticmethod
     def _format_task_name(row: pd.Series) -> str:
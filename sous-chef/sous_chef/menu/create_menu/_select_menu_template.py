@@ -81,9 +81,12 @@ class MenuTemplates:
             workbook_name=self.config.workbook
         )
 
+        worksheet_map = workbook.get_worksheets(
+            list(self.config.sheet_to_mealtime.keys())
+        )
         all_menus = pd.DataFrame()
         for sheet, meal_time in self.config.sheet_to_mealtime.items():
-            sheet_pd = workbook.get_worksheet(worksheet_name=sheet)
+            sheet_pd = worksheet_map[sheet]
             sheet_pd["meal_time"] = meal_time
             all_menus = pd.concat([all_menus, sheet_pd])
 
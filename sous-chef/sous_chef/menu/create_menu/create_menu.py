@@ -6,8 +6,6 @@ import pandas as pd
 from omegaconf import DictConfig
 from pandera.typing.common import DataFrameBase
 from sous_chef.date.get_due_date import DueDatetimeFormatter
-from sous_chef.formatter.format_unit import UnitFormatter
-from sous_chef.formatter.ingredient.format_ingredient import IngredientFormatter
 from sous_chef.menu.create_menu._export_to_todoist import MenuForTodoist
 from sous_chef.menu.create_menu._fill_menu_template import MenuTemplateFiller
 from sous_chef.menu.create_menu._output_for_grocery_list import (
@@ -22,21 +20,23 @@ from sous_chef.menu.create_menu.models import (
     validate_menu_schema,
 )
 from sous_chef.menu.record_menu_history import MenuHistorian
-from sous_chef.pantry_list.read_pantry_list import PantryList
-from sous_chef.recipe_book.read_recipe_book import RecipeBook
+from sous_chef.session.service_session import ServiceSession
 from structlog import get_logger
 
 from utilities.api.gsheets_api import GsheetsHelper
-from utilities.api.todoist_api import TodoistHelper
 
 ABS_FILE_PATH = Path(__file__).absolute().parent
 FILE_LOGGER = get_logger(__name__)
 
 
 class Menu:
-    def __init__(self, config: DictConfig):
+    def __init__(self, config: DictConfig, session: ServiceSession = None):
         self.config = config
         self.menu_config = config.menu.create_menu
+        # shared with other pipelines, so services are loaded once
+        self.session = session
+        if self.session is None:
+            self.session = ServiceSession(config)
 
     def _get_menu_recipe_processor(
         self,
@@ -46,7 +46,7 @@ class Menu:
     ) -> MenuRecipeProcessor:
         menu_recipe_processor = MenuRecipeProcessor(
             menu_config=self.menu_config,
-            recipe_book=RecipeBook(self.config.recipe_book),
+            recipe_book=self.session.get_recipe_book(),
         )
 
         menu_historian = MenuHistorian(
@@ -70,7 +70,7 @@ class Menu:
         due_date_formatter = DueDatetimeFormatter(
             config=self.config.date.due_date
         )
-        gsheets_helper = GsheetsHelper(self.config.api.gsheets)
+        gsheets_helper = self.session.get_gsheets_helper()
 
         # load and use menu templates
         menu_templates = MenuTemplates(
@@ -83,13 +83,7 @@ class Menu:
         # set up key service for filling menu template
         menu_template_filler = MenuTemplateFiller(
             menu_config=self.config.menu.create_menu,
-            ingredient_formatter=IngredientFormatter(
-                config=self.config.formatter.format_ingredient,
-                unit_formatter=UnitFormatter(),
-                pantry_list=PantryList(
-                    self.config.pantry_list, gsheets_helper=gsheets_helper
-                ),
-            ),
+            ingredient_formatter=self.session.get_ingredient_formatter(),
             menu_recipe_processor=self._get_menu_recipe_processor(
                 due_date_formatter=due_date_formatter,
                 gsheets_helper=gsheets_helper,
@@ -106,6 +100,16 @@ class Menu:
             workbook_name=self.menu_config.final_menu.workbook,
             worksheet_name=self.menu_config.final_menu.worksheet,
         )
+        # kept per week, so menus of several weeks can be shopped at once
+        week_worksheet = self.menu_config.final_menu.get("week_worksheet")
+        if week_worksheet is not None:
+            gsheets_helper.write_worksheet(
+                df=final_menu_df,
+                workbook_name=self.menu_config.final_menu.workbook,
+                worksheet_name=week_worksheet.format(
+                    week_offset=self.config.date.due_date.week_offset
+                ),
+            )
         return final_menu_df
 
     def finalize_menu_to_external_services(
@@ -114,7 +118,7 @@ class Menu:
         due_date_formatter = DueDatetimeFormatter(
             config=self.config.date.due_date
         )
-        gsheets_helper = GsheetsHelper(self.config.api.gsheets)
+        gsheets_helper = self.session.get_gsheets_helper()
         menu_historian = MenuHistorian(
             config=self.config.menu.record_menu_history,
             current_menu_start_date=due_date_formatter.get_anchor_datetime()
@@ -130,37 +134,31 @@ class Menu:
                 config=self.menu_config.todoist,
                 final_menu_df=final_menu_df,
                 due_date_formatter=due_date_formatter,
-                todoist_helper=TodoistHelper(self.config.api.todoist),
+                todoist_helper=self.session.get_todoist_helper(),
             )
             menu_for_todoist.upload_menu_to_todoist()
         return final_menu_df
 
     def get_menu_for_grocery_list(
-        self,
+        self, worksheet: str = None
     ) -> (List[MenuIngredient], List[MenuRecipe]):
-        recipe_book = RecipeBook(self.config.recipe_book)
-        gsheets_helper = GsheetsHelper(self.config.api.gsheets)
-        ingredient_formatter = IngredientFormatter(
-            config=self.config.formatter.format_ingredient,
-            unit_formatter=UnitFormatter(),
-            pantry_list=PantryList(
-                config=self.config.pantry_list, gsheets_helper=gsheets_helper
-            ),
+        final_menu_df = self.load_final_menu(
+            gsheets_helper=self.session.get_gsheets_helper(),
+            worksheet=worksheet,
         )
-
-        final_menu_df = self.load_final_menu(gsheets_helper=gsheets_helper)
         menu_for_grocery_list = MenuForGroceryList(
             config_errors=self.menu_config.errors,
             final_menu_df=final_menu_df,
-            ingredient_formatter=ingredient_formatter,
-            recipe_book=recipe_book,
+            ingredient_formatter=self.session.get_ingredient_formatter(),
+            recipe_book=self.session.get_recipe_book(),
         )
         return menu_for_grocery_list.get_menu_for_grocery_list()
 
     def load_final_menu(
-        self, gsheets_helper: GsheetsHelper
+        self, gsheets_helper: GsheetsHelper, worksheet: str = None
     ) -> DataFrameBase[TmpMenuSchema]:
-        worksheet = self.menu_config.final_menu.worksheet
+        if worksheet is None:
+            worksheet = self.menu_config.final_menu.worksheet
         workbook = gsheets_helper.get_workbook(
             self.menu_config.final_menu.workbook
         )
@@ -88,7 +88,8 @@ class MenuHistorian:
         self.dataframe = MenuHistory.validate(self.dataframe)
 
         save_loc = self.config.save_loc
-        self.gsheets_helper.write_worksheet(
+        # only new or re-run entries are sent, not the whole history
+        self.gsheets_helper.write_diff(
             df=self.dataframe,
             workbook_name=save_loc.workbook,
             worksheet_name=save_loc.worksheet,
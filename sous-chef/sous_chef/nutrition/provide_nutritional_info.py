@@ -171,7 +171,7 @@ class Nutritionist:
                     ]
                 )
 
-        gsheets_helper.write_worksheet(
+        gsheets_helper.write_diff(
             df=write_df,
             workbook_name=self.config.workbook_name,
             worksheet_name=self.config.sheet_name,
@@ -1,8 +1,17 @@
-from dataclasses import dataclass
+import fcntl
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+from uuid import uuid4
 
+import joblib
 import pandas as pd
+from joblib import Memory
 from omegaconf import DictConfig
 from pandas import DataFrame
+from sous_chef.abstract.pandas_util import get_dataframe_hash
 from sous_chef.abstract.search_dataframe import DataframeSearchable
 from structlog import get_logger
 
@@ -10,6 +19,123 @@ from utilities.api.gsheets_api import GsheetsHelper
 
 FILE_LOGGER = get_logger(__name__)
 
+# initialize disk cache
+ABS_FILE_PATH = Path(__file__).absolute().parent
+CACHE_DIR = ABS_FILE_PATH / "diskcache"
+
+PantryEntry = namedtuple(
+    "PantryEntry",
+    [
+        "ingredient",
+        "true_ingredient",
+        "label",
+        "group",
+        "item_plural",
+        "store",
+        "barcode",
+        "recipe_uuid",
+        "replace_factor",
+        "replace_unit",
+    ],
+)
+
+
+@dataclass
+class FuzzyMatch:
+    best_match: str
+    quality: float
+    hits: int = 0
+
+
+@dataclass
+class FuzzyMatchMemo:
+    version: str
+    memo_path: Path = CACHE_DIR / "fuzzy_match_memo.pkl"
+    memo: Dict[str, FuzzyMatch] = field(default_factory=dict)
+    # hits since the last save, which are added to the saved ones
+    _hit_counter: Counter = field(default_factory=Counter, repr=False)
+
+    def __post_init__(self):
+        self.memo = self._read_memo()
+
+    def __getstate__(self):
+        # copies, e.g. in worker processes, only save their own hits
+        state = self.__dict__.copy()
+        state["_hit_counter"] = Counter()
+        return state
+
+    def get_fuzzy_match(
+        self, query: str, find_best_match: Callable[[], Tuple[str, float]]
+    ) -> FuzzyMatch:
+        fuzzy_match = self.memo.get(query)
+        if fuzzy_match is None:
+            fuzzy_match = FuzzyMatch(*find_best_match())
+            self.memo[query] = fuzzy_match
+        fuzzy_match.hits += 1
+        self._hit_counter[query] += 1
+        return fuzzy_match
+
+    def save(self):
+        """
+        Merges new matches & hits into the saved memo, which other processes
+        (e.g. parallel parsing) may have changed since it was read.
+        """
+        if not self._hit_counter:
+            return
+        with self._lock_memo():
+            memo = self._read_memo()
+            for query, hits in self._hit_counter.items():
+                fuzzy_match = memo.setdefault(
+                    query, replace(self.memo[query], hits=0)
+                )
+                fuzzy_match.hits += hits
+            self._write_memo(memo)
+        self.memo = memo
+        self._hit_counter.clear()
+
+    def get_report(self) -> pd.DataFrame:
+        self.save()
+        # other processes, e.g. bulk parsing, may have saved new matches
+        self.memo = self._read_memo()
+        report = pd.DataFrame(
+            [
+                {"query": query, **asdict(fuzzy_match)}
+                for query, fuzzy_match in self.memo.items()
+            ],
+            columns=["query", "best_match", "quality", "hits"],
+        )
+        return report.sort_values(
+            ["hits", "quality"], ascending=False, ignore_index=True
+        )
+
+    @contextmanager
+    def _lock_memo(self):
+        self.memo_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.memo_path.with_suffix(".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_memo(self) -> Dict[str, FuzzyMatch]:
+        if not self.memo_path.exists():
+            return {}
+        saved_memo = joblib.load(self.memo_path)
+        if saved_memo["version"] != self.version:
+            FILE_LOGGER.info(
+                "[fuzzy match memo]", action="invalidated by pantry change"
+            )
+            return {}
+        return saved_memo["memo"]
+
+    def _write_memo(self, memo: Dict[str, FuzzyMatch]):
+        self.memo_path.parent.mkdir(parents=True, exist_ok=True)
+        # replace whole file, so parallel runs never read a partial memo
+        tmp_path = self.memo_path.with_suffix(f".{uuid4().hex}.tmp")
+        joblib.dump({"version": self.version, "memo": memo}, tmp_path)
+        tmp_path.replace(self.memo_path)
+
 
 @dataclass
 class InnerJoinError(Exception):
@@ -32,9 +158,62 @@ class PantryList(DataframeSearchable):
     def __init__(self, config: DictConfig, gsheets_helper: GsheetsHelper):
         super().__init__(config)
         self.workbook = gsheets_helper.get_workbook(self.config.workbook_name)
+        self.worksheet_map = self._retrieve_worksheet_map()
         self.basic_pantry_list = self._retrieve_basic_pantry_list()
         self.replacement_pantry_list = self._retrieve_replacement_pantry_list()
         self.dataframe = self._load_complex_pantry_list_for_search()
+        # changes when any pantry entry changes, e.g. to invalidate caches
+        self.version = get_dataframe_hash(self.dataframe)
+        self.pantry_lookup = load_pantry_lookup(
+            version=self.version, dataframe=self.dataframe
+        )
+        self.fuzzy_match_memo = FuzzyMatchMemo(version=self.version)
+
+    def __getstate__(self):
+        # workbook holds an api client, which cannot be sent to other processes
+        state = self.__dict__.copy()
+        state["workbook"] = None
+        state["worksheet_map"] = None
+        return state
+
+    def retrieve_match(self, field: str, search_term: str) -> PantryEntry:
+        if field != "ingredient":
+            pantry_item = super().retrieve_match(field, search_term)
+            return PantryEntry._make(pantry_item.reindex(PantryEntry._fields))
+
+        # all known surface forms are resolved, so only typos need a search
+        query = self._purify_string(search_term)
+        if (pantry_entry := self.pantry_lookup.get(query)) is not None:
+            return pantry_entry
+
+        # typos recur with unchanged recipes, so searches are memoized
+        fuzzy_match = self.fuzzy_match_memo.get_fuzzy_match(
+            query=query,
+            find_best_match=lambda: self._get_fuzzy_best_match(
+                field, search_term
+            ),
+        )
+        self._check_fuzzy_match_quality(
+            field=field,
+            search_term=search_term,
+            best_match_search_term=fuzzy_match.best_match,
+            best_match_quality=fuzzy_match.quality,
+        )
+        return self.pantry_lookup[fuzzy_match.best_match]
+
+    def save_fuzzy_match_memo(self):
+        self.fuzzy_match_memo.save()
+
+    def get_fuzzy_match_report(self) -> pd.DataFrame:
+        # most frequent accepted matches are candidates for misspelled sheet
+        report = self.fuzzy_match_memo.get_report()
+        report["true_ingredient"] = report.best_match.map(
+            lambda best_match: self.pantry_lookup[best_match].true_ingredient
+        )
+        report["is_accepted"] = (
+            report.quality >= self.config.fuzzy_match.min_thresh_to_accept
+        )
+        return report
 
     @staticmethod
     def _check_join(df_name: str, shape_before: int, shape_new: int):
@@ -63,11 +242,12 @@ class PantryList(DataframeSearchable):
         return basic_list
 
     @staticmethod
-    def _get_pluralized_form(plural_ending: str, ingredient: str):
-        if plural_ending in ["ies", "ves"]:
-            return ingredient[:-1] + plural_ending
-        else:
-            return ingredient + plural_ending
+    def _get_pluralized_form(
+        plural_ending: pd.Series, ingredient: pd.Series
+    ) -> pd.Series:
+        mask_replace_last_letter = plural_ending.isin(["ies", "ves"])
+        stem = ingredient.where(~mask_replace_last_letter, ingredient.str[:-1])
+        return stem + plural_ending
 
     def _get_replacement_pantry_list(self):
         singular_list = self.replacement_pantry_list.copy(deep=True)
@@ -113,31 +293,43 @@ class PantryList(DataframeSearchable):
             ignore_index=True,
         )
 
-    def _retrieve_basic_pantry_list(self) -> DataFrame:
-        dataframe = self.workbook.get_worksheet(
-            worksheet_name=self.config.ingredient_sheet_name,
-            numerize=False,
+    def _retrieve_worksheet_map(self) -> Dict[str, DataFrame]:
+        # all worksheets are read in one request
+        return self.workbook.get_worksheets(
+            [
+                self.config.ingredient_sheet_name,
+                self.config.bad_sheet_name,
+                self.config.misspelling_sheet_name,
+                self.config.replacement_sheet_name,
+            ],
+            numerize={
+                self.config.bad_sheet_name: True,
+                self.config.replacement_sheet_name: True,
+            },
         )
+
+    def _get_worksheet(self, worksheet_name: str) -> DataFrame:
+        return self.worksheet_map[worksheet_name].copy()
+
+    def _retrieve_basic_pantry_list(self) -> DataFrame:
+        dataframe = self._get_worksheet(self.config.ingredient_sheet_name)
         dataframe["ingredient"] = dataframe.ingredient.str.strip()
-        dataframe["item_plural"] = dataframe.apply(
-            lambda x: self._get_pluralized_form(x.plural_ending, x.ingredient),
-            axis=1,
+        dataframe["item_plural"] = self._get_pluralized_form(
+            dataframe.plural_ending, dataframe.ingredient
         )
         return dataframe
 
     def _retrieve_bad_pantry_list(self) -> DataFrame:
-        bad_list = self.workbook.get_worksheet(
-            worksheet_name=self.config.bad_sheet_name,
-            numerize=True,
-        )[["ingredient"]]
+        bad_list = self._get_worksheet(self.config.bad_sheet_name)[
+            ["ingredient"]
+        ]
         bad_list["plural_ending"] = ""
         bad_list["label"] = "bad_ingredient"
         return bad_list
 
     def _retrieve_misspelled_pantry_list(self) -> DataFrame:
-        misspelled_list = self.workbook.get_worksheet(
-            worksheet_name=self.config.misspelling_sheet_name,
-            numerize=False,
+        misspelled_list = self._get_worksheet(
+            self.config.misspelling_sheet_name
         )
 
         mask_and_replaced = misspelled_list.replacement_ingredient != ""
@@ -208,14 +400,35 @@ class PantryList(DataframeSearchable):
         return misspelled_list.drop(columns=["misspelled_ingredient", "_merge"])
 
     def _retrieve_replacement_pantry_list(self) -> DataFrame:
-        dataframe = self.workbook.get_worksheet(
-            worksheet_name=self.config.replacement_sheet_name,
-            numerize=True,
-        )
-        dataframe["item_plural"] = dataframe.apply(
-            lambda x: self._get_pluralized_form(
-                x.plural_ending, x.replacement_ingredient
-            ),
-            axis=1,
+        dataframe = self._get_worksheet(self.config.replacement_sheet_name)
+        dataframe["item_plural"] = self._get_pluralized_form(
+            dataframe.plural_ending, dataframe.replacement_ingredient
         )
         return dataframe
+
+
+def load_pantry_lookup(
+    version: str, dataframe: pd.DataFrame
+) -> Dict[str, PantryEntry]:
+    cache = Memory(CACHE_DIR, verbose=0)
+
+    @cache.cache(ignore=["dataframe"])
+    def _get_pantry_lookup(
+        version: str, dataframe: pd.DataFrame
+    ) -> Dict[str, PantryEntry]:
+        FILE_LOGGER.info("[pantry lookup]", action="build", version=version)
+        pantry_df = dataframe.reindex(columns=PantryEntry._fields)
+        # like the direct search, the first entry wins for the same term
+        search_terms = pantry_df.ingredient.str.strip().str.casefold()
+        mask_first = search_terms.notna() & ~search_terms.duplicated()
+        return dict(
+            zip(
+                search_terms[mask_first],
+                map(
+                    PantryEntry._make,
+                    pantry_df[mask_first].itertuples(index=False),
+                ),
+            )
+        )
+
+    return _get_pantry_lookup(version=version, dataframe=dataframe)
@@ -0,0 +1,132 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+from omegaconf import DictConfig, OmegaConf
+from sous_chef.formatter.format_unit import UnitFormatter
+from sous_chef.formatter.ingredient.format_ingredient import IngredientFormatter
+from sous_chef.formatter.ingredient.get_ingredient_field import IngredientField
+from sous_chef.pantry_list.read_pantry_list import PantryList
+from sous_chef.recipe_book.read_recipe_book import RecipeBook
+from structlog import get_logger
+
+from utilities.api.gsheets_api import GsheetsHelper
+from utilities.api.todoist_api import TodoistHelper
+
+FILE_LOGGER = get_logger(__name__)
+
+Service = TypeVar("Service")
+
+# shared by all sessions, so each service is loaded at most once per process
+_SERVICE_CACHE: Dict[Tuple[str, str], Any] = {}
+
+
+def clear_service_cache():
+    _SERVICE_CACHE.clear()
+
+
+def get_config_hash(config: DictConfig) -> str:
+    config_yaml = OmegaConf.to_yaml(config, resolve=True)
+    return hashlib.sha256(config_yaml.encode()).hexdigest()
+
+
+@dataclass
+class ServiceSession:
+    config: DictConfig
+
+    def get_gsheets_helper(self) -> GsheetsHelper:
+        return self._get_service(
+            "gsheets_helper",
+            self.config.api.gsheets,
+            lambda: GsheetsHelper(self.config.api.gsheets),
+        )
+
+    def get_todoist_helper(self) -> TodoistHelper:
+        return self._get_service(
+            "todoist_helper",
+            self.config.api.todoist,
+            lambda: TodoistHelper(self.config.api.todoist),
+        )
+
+    def get_recipe_book(self) -> RecipeBook:
+        return self._get_service(
+            "recipe_book",
+            self.config.recipe_book,
+            lambda: RecipeBook(self.config.recipe_book),
+        )
+
+    def get_pantry_list(self) -> PantryList:
+        return self._get_service(
+            "pantry_list",
+            OmegaConf.create(
+                {
+                    "pantry_list": self.config.pantry_list,
+                    "gsheets": self.config.api.gsheets,
+                }
+            ),
+            lambda: PantryList(
+                self.config.pantry_list,
+                gsheets_helper=self.get_gsheets_helper(),
+            ),
+        )
+
+    def get_unit_formatter(self) -> UnitFormatter:
+        return self._get_service(
+            "unit_formatter", OmegaConf.create({}), UnitFormatter
+        )
+
+    def get_ingredient_formatter(self) -> IngredientFormatter:
+        formatter_config = self.config.formatter
+        return self._get_service(
+            "ingredient_formatter",
+            OmegaConf.create(
+                {
+                    "format_ingredient": formatter_config.format_ingredient,
+                    "pantry_list": self.config.pantry_list,
+                    "gsheets": self.config.api.gsheets,
+                }
+            ),
+            lambda: IngredientFormatter(
+                self.config.formatter.format_ingredient,
+                unit_formatter=self.get_unit_formatter(),
+                pantry_list=self.get_pantry_list(),
+            ),
+        )
+
+    def get_ingredient_field(self) -> IngredientField:
+        formatter_config = self.config.formatter
+        return self._get_service(
+            "ingredient_field",
+            OmegaConf.create(
+                {
+                    "get_ingredient_field": (
+                        formatter_config.get_ingredient_field
+                    ),
+                    "format_ingredient": formatter_config.format_ingredient,
+                    "pantry_list": self.config.pantry_list,
+                    "gsheets": self.config.api.gsheets,
+                    "recipe_book": self.config.recipe_book,
+                }
+            ),
+            lambda: IngredientField(
+                self.config.formatter.get_ingredient_field,
+                ingredient_formatter=self.get_ingredient_formatter(),
+                recipe_book=self.get_recipe_book(),
+            ),
+        )
+
+    @staticmethod
+    def _get_service(
+        name: str,
+        config: DictConfig,
+        create_service: Callable[[], Service],
+    ) -> Service:
+        key = (name, get_config_hash(config))
+        if key not in _SERVICE_CACHE:
+            FILE_LOGGER.info(
+                "[service session]",
+                action="create",
+                service=name,
+            )
+            _SERVICE_CACHE[key] = create_service()
+        return _SERVICE_CACHE[key]
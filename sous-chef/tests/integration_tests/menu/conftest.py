@@ -22,6 +22,7 @@ def fixed_menu_config():
 
     menu_config = config.menu.create_menu
     menu_config.final_menu.worksheet = "test-tmp-menu"
+    menu_config.final_menu.week_worksheet = "test-tmp-menu-{week_offset}"
     menu_config.fixed.workbook = "test-fixed_menus"
     menu_config.fixed.menu_number = 1
     menu_config.fixed.already_in_future_menus.active = False
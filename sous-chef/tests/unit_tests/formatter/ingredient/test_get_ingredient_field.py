@@ -1,5 +1,6 @@
 import pytest
 from hydra import compose, initialize
+from joblib import parallel_backend
 from omegaconf import OmegaConf
 from sous_chef.formatter.format_unit import unit_registry
 from sous_chef.formatter.ingredient.format_ingredient import Ingredient
@@ -7,6 +8,7 @@ from sous_chef.formatter.ingredient.get_ingredient_field import (
     IngredientField,
     ReferencedRecipeDimensionalityError,
 )
+from sous_chef.formatter.ingredient.ingredient_store import IngredientStore
 from structlog import get_logger
 from tests.unit_tests.formatter.util import create_ingredient_line
 from tests.unit_tests.util import create_recipe
@@ -158,7 +160,7 @@ class TestIngredientFieldFormatter:
             ("avocado", 2.0, unit_registry.dimensionless, False),
         ],
     )
-    def test__format_ingredient(
+    def test__parse_line(
         ingredient_field,
         mock_pantry_list,
         pantry_entry,
@@ -168,13 +170,17 @@ class TestIngredientFieldFormatter:
         is_in_optional_group,
     ):
         line_str = create_ingredient_line(item, quantity, pint_unit)
-        ingredient_field.ingredient_list = []
         mock_pantry_list.retrieve_match.return_value = pantry_entry
 
-        ingredient_field._format_ingredient(line_str, is_in_optional_group)
-        result = ingredient_field.ingredient_list
+        result = ingredient_field._parse_line(
+            line_index=0,
+            line=line_str,
+            is_in_optional_group=is_in_optional_group,
+        )
+        assert result.line == line_str
+        assert result.error is None
         assert_ingredient(
-            result,
+            [result.ingredient],
             pantry_entry,
             quantity,
             pint_unit,
@@ -184,7 +190,7 @@ class TestIngredientFieldFormatter:
         )
 
 
-class TestFormatReferencedRecipe:
+class TestGetReferencedRecipe:
     @staticmethod
     @pytest.mark.parametrize(
         "needed_factor,ref_pint_repr",
@@ -195,6 +201,7 @@ class TestFormatReferencedRecipe:
     )
     def test_with_dimensionless_works(
         ingredient_field,
+        ingredient_formatter,
         mock_recipe_book,
         needed_factor,
         ref_pint_repr,
@@ -204,19 +211,21 @@ class TestFormatReferencedRecipe:
             title=f"{ref_recipe_title}", pint_quantity=ref_pint_repr
         )
         # set up mocks
-        ingredient_field.referenced_recipe_list = []
         mock_recipe_book.get_recipe_by_title.return_value = ref_recipe.copy(
             deep=True
         )
         # create base recipe ingredient line
         line_str = f"# {needed_factor} {ref_recipe_title}"
 
-        ingredient_field._format_referenced_recipe(
-            source_recipe_title="dummy", line=line_str
+        needed_ref_recipe = ingredient_formatter.format_referenced_recipe(
+            line_str
+        )
+        result = ingredient_field._get_referenced_recipe(
+            source_recipe_title="dummy", needed_ref_recipe=needed_ref_recipe
         )
 
         assert_recipe(
-            result=ingredient_field.referenced_recipe_list[0],
+            result=result,
             ref_recipe=ref_recipe,
             factor=needed_factor,
             amount=line_str,
@@ -242,6 +251,7 @@ class TestFormatReferencedRecipe:
     )
     def test_with_same_dimensionality_works(
         ingredient_field,
+        ingredient_formatter,
         mock_recipe_book,
         needed_ref_pint_repr,
         ref_pint_repr,
@@ -252,19 +262,21 @@ class TestFormatReferencedRecipe:
             title=f"{ref_recipe_title}", pint_quantity=ref_pint_repr
         )
         # set up mocks
-        ingredient_field.referenced_recipe_list = []
         mock_recipe_book.get_recipe_by_title.return_value = ref_recipe.copy(
             deep=True
         )
         # create base recipe ingredient line
         line_str = f"# {needed_ref_pint_repr} {ref_recipe_title}"
 
-        ingredient_field._format_referenced_recipe(
-            source_recipe_title="dummy", line=line_str
+        needed_ref_recipe = ingredient_formatter.format_referenced_recipe(
+            line_str
+        )
+        result = ingredient_field._get_referenced_recipe(
+            source_recipe_title="dummy", needed_ref_recipe=needed_ref_recipe
         )
 
         assert_recipe(
-            result=ingredient_field.referenced_recipe_list[0],
+            result=result,
             ref_recipe=ref_recipe,
             factor=expected_factor,
             amount=line_str,
@@ -285,20 +297,150 @@ class TestFormatReferencedRecipe:
         ],
     )
     def test_with_different_dimensionality_raises_error(
-        ingredient_field, mock_recipe_book, needed_ref_pint_repr, ref_pint_repr
+        ingredient_field,
+        ingredient_formatter,
+        mock_recipe_book,
+        needed_ref_pint_repr,
+        ref_pint_repr,
     ):
         ref_recipe_title = "patatas bravas"
         ref_recipe = create_recipe(
             title=f"{ref_recipe_title}", pint_quantity=ref_pint_repr
         )
         # set up mocks
-        ingredient_field.referenced_recipe_list = []
         mock_recipe_book.get_recipe_by_title.return_value = ref_recipe.copy(
             deep=True
         )
+        needed_ref_recipe = ingredient_formatter.format_referenced_recipe(
+            f"# {needed_ref_pint_repr} {ref_recipe_title}"
+        )
 
         with pytest.raises(ReferencedRecipeDimensionalityError):
-            ingredient_field._format_referenced_recipe(
-                source_recipe_title="dummy",
-                line=f"# {needed_ref_pint_repr} {ref_recipe_title}",
+            ingredient_field._get_referenced_recipe(
+                source_recipe_title="dummy", needed_ref_recipe=needed_ref_recipe
+            )
+
+
+class TestIngredientStore:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "quantity,pint_unit,item", [(2.5, unit_registry.tablespoon, "sugar")]
+    )
+    def test_parse_ingredient_field_reuses_stored_lines(
+        ingredient_field,
+        mock_pantry_list,
+        pantry_entry,
+        tmp_path,
+        quantity,
+        pint_unit,
+        item,
+    ):
+        ingredient_field.ingredient_store = IngredientStore(cache_dir=tmp_path)
+        mock_pantry_list.version = "v1"
+        mock_pantry_list.retrieve_match.return_value = pantry_entry
+        recipe = create_recipe(
+            ingredients=create_ingredient_line(item, quantity, pint_unit)
+        )
+
+        for _ in range(2):
+            _, ingredient_list, _ = ingredient_field.parse_ingredient_field(
+                recipe
+            )
+            assert_ingredient(
+                ingredient_list,
+                pantry_entry,
+                quantity,
+                pint_unit,
+                item,
+                is_in_optional_group=False,
             )
+
+        mock_pantry_list.retrieve_match.assert_called_once()
+
+
+class TestParseIngredientFields:
+    @staticmethod
+    @pytest.mark.parametrize("item", ["sugar"])
+    def test_parses_each_distinct_line_once(
+        ingredient_field, mock_pantry_list, pantry_entry, item
+    ):
+        mock_pantry_list.retrieve_match.return_value = pantry_entry
+        line_str = create_ingredient_line(item, 2.0, unit_registry.cup)
+        recipe_list = [
+            create_recipe(title="first", ingredients=line_str),
+            create_recipe(title="second", ingredients=f"[garnish]\n{line_str}"),
+            create_recipe(
+                title="third", ingredients=f"1 tbsp {item}\n{line_str}"
+            ),
+        ]
+
+        result = ingredient_field.parse_ingredient_fields(recipe_list)
+
+        # one call per distinct line & optional group combination
+        assert mock_pantry_list.retrieve_match.call_count == 3
+        assert [len(ingredient_list) for _, ingredient_list, _ in result] == [
+            1,
+            1,
+            2,
+        ]
+        assert [
+            ingredient.is_optional for _, [ingredient, *_], _ in result
+        ] == [False, True, False]
+        assert result[2][1][1].quantity == 2.0
+
+    @staticmethod
+    @pytest.mark.parametrize("item", ["sugar"])
+    def test_scatters_errors_per_recipe(
+        ingredient_field, mock_pantry_list, mock_recipe_book, pantry_entry, item
+    ):
+        ingredient_field.tuple_log_exception = (
+            ReferencedRecipeDimensionalityError,
+            *ingredient_field.tuple_log_exception,
+        )
+        mock_pantry_list.retrieve_match.return_value = pantry_entry
+        mock_recipe_book.get_recipe_by_title.return_value = create_recipe(
+            title="aioli", pint_quantity=1 * unit_registry.g
+        )
+        recipe_list = [
+            create_recipe(title="first", ingredients=f"1 cup {item}"),
+            create_recipe(title="second", ingredients="# 1 cup aioli"),
+        ]
+
+        result = ingredient_field.parse_ingredient_fields(recipe_list)
+
+        assert result[0][2] == []
+        assert result[1][:2] == ([], [])
+        assert len(result[1][2]) == 1
+        assert result[1][2][0].startswith(
+            "[referenced recipe dimensionality does not match]"
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize("item", ["sugar"])
+    def test_parallel_parse_keeps_recipe_order(
+        ingredient_field, mock_pantry_list, pantry_entry, item
+    ):
+        mock_pantry_list.retrieve_match.return_value = pantry_entry
+        recipe_list = [
+            create_recipe(
+                title=f"recipe {quantity}",
+                ingredients=f"{quantity} cup {item}\n1 tbsp {item}",
+            )
+            for quantity in range(1, 6)
+        ]
+        expected_result = ingredient_field.parse_ingredient_fields(recipe_list)
+
+        ingredient_field.config.parallel.n_jobs = 2
+        ingredient_field.config.parallel.batch_size = 2
+        # threads, as the mocked pantry list cannot be sent to a process
+        with parallel_backend("threading"):
+            result = ingredient_field.parse_ingredient_fields(recipe_list)
+
+        assert result == expected_result
+        assert [ingredient.quantity for _, [ingredient, *_], _ in result] == [
+            1,
+            2,
+            3,
+            4,
+            5,
+        ]
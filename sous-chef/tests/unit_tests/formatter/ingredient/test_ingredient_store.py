@@ -0,0 +1,102 @@
+from unittest.mock import Mock
+
+import pytest
+from sous_chef.formatter.format_unit import unit_registry
+from sous_chef.formatter.ingredient.format_ingredient import Ingredient
+from sous_chef.formatter.ingredient.format_referenced_recipe import (
+    ReferencedRecipe,
+)
+from sous_chef.formatter.ingredient.ingredient_store import (
+    IngredientStore,
+    LineType,
+    ParsedLine,
+    convert_df_to_parsed_line_list,
+    convert_parsed_line_list_to_df,
+)
+
+PARSED_LINE_LIST = [
+    ParsedLine(
+        line_index=0,
+        line="2 cup sugar",
+        ingredient=Ingredient(
+            quantity=2.0,
+            pint_unit=unit_registry.cup,
+            item="sugar",
+            group="Baking",
+            item_plural="s",
+            store="grocery store",
+        ),
+    ),
+    ParsedLine(
+        line_index=2,
+        line="# 0.5 garlic aioli",
+        referenced_recipe=ReferencedRecipe(
+            quantity=0.5,
+            pint_unit=unit_registry.dimensionless,
+            title="garlic aioli",
+            amount="0.5 garlic aioli",
+        ),
+    ),
+    ParsedLine(line_index=3, line="2 cup unknown", error="[no match]"),
+]
+
+
+@pytest.fixture
+def ingredient_store(tmp_path):
+    return IngredientStore(cache_dir=tmp_path)
+
+
+def call_store(ingredient_store, parse_lines, ingredients, pantry_version):
+    return ingredient_store.get_parsed_line_list(
+        recipe_uuid="uuid-1",
+        ingredients=ingredients,
+        pantry_version=pantry_version,
+        parser_config={"errors": {}},
+        parse_lines=parse_lines,
+    )
+
+
+class TestParsedLine:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "parsed_line,expected_line_type",
+        [
+            (PARSED_LINE_LIST[0], LineType.ingredient),
+            (PARSED_LINE_LIST[1], LineType.referenced_recipe),
+            (PARSED_LINE_LIST[2], LineType.error),
+        ],
+    )
+    def test_line_type(parsed_line, expected_line_type):
+        assert parsed_line.line_type == expected_line_type
+
+
+def test_convert_parsed_line_list_round_trip():
+    parsed_line_df = convert_parsed_line_list_to_df(PARSED_LINE_LIST)
+    assert convert_df_to_parsed_line_list(parsed_line_df) == PARSED_LINE_LIST
+
+
+class TestIngredientStore:
+    @staticmethod
+    def test_get_parsed_line_list_parses_once_per_key(ingredient_store):
+        parse_lines = Mock(return_value=PARSED_LINE_LIST)
+
+        for _ in range(2):
+            result = call_store(ingredient_store, parse_lines, "text", "v1")
+            assert result == PARSED_LINE_LIST
+
+        parse_lines.assert_called_once_with("text")
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "ingredients,pantry_version",
+        [("changed text", "v1"), ("text", "v2")],
+    )
+    def test_get_parsed_line_list_reparses_when_changed(
+        ingredient_store, ingredients, pantry_version
+    ):
+        parse_lines = Mock(return_value=PARSED_LINE_LIST)
+
+        call_store(ingredient_store, parse_lines, "text", "v1")
+        call_store(ingredient_store, parse_lines, ingredients, pantry_version)
+
+        assert parse_lines.call_count == 2
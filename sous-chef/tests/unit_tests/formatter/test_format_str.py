@@ -1,5 +1,9 @@
+import pandas as pd
 import pytest
-from sous_chef.formatter.format_str import convert_number_to_str
+from sous_chef.formatter.format_str import (
+    convert_number_series_to_str,
+    convert_number_to_str,
+)
 
 
 @pytest.mark.parametrize(
@@ -8,3 +12,24 @@ from sous_chef.formatter.format_str import convert_number_to_str
 )
 def test_convert_float_to_str(number, precision, expected_result):
     assert convert_number_to_str(number, precision) == expected_result
+
+
+def test_convert_number_series_to_str():
+    number = pd.Series([1.124, 1124.23, 1.124], index=[2, 0, 1])
+    assert convert_number_series_to_str(number).to_dict() == {
+        2: "1.1",
+        0: "1100",
+        1: "1.1",
+    }
+
+
+def test_convert_number_series_to_str_keeps_integers():
+    number = pd.Series([1050, 3, 1050], dtype="int64")
+    assert convert_number_series_to_str(number).tolist() == (
+        number.apply(convert_number_to_str).tolist()
+    )
+    assert convert_number_series_to_str(number).tolist() == [
+        "1050",
+        "3",
+        "1050",
+    ]
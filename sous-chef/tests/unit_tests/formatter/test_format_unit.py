@@ -1,3 +1,4 @@
+import pandas as pd
 import pytest
 from sous_chef.formatter.format_unit import UnitExtractionError, unit_registry
 
@@ -24,6 +25,24 @@ class TestUnitFormatter:
             quantity, pint_unit, desired_pint_unit
         ) == (expected_quantity, desired_pint_unit)
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        "quantity,pint_unit,desired_pint_unit",
+        [
+            (3, unit_registry.tsp, unit_registry.tbsp),
+            (16, unit_registry.ounce, unit_registry.g),
+            (1.7, unit_registry.cup, unit_registry.cup),
+        ],
+    )
+    def test_get_conversion_factor(
+        unit_formatter, quantity, pint_unit, desired_pint_unit
+    ):
+        factor = unit_formatter.get_conversion_factor(
+            pint_unit, desired_pint_unit
+        )
+        converted_value = (quantity * pint_unit).to(desired_pint_unit)
+        assert quantity * factor == converted_value.magnitude
+
     @staticmethod
     @pytest.mark.parametrize(
         "text,expected_pint_unit",
@@ -76,6 +95,22 @@ class TestUnitFormatter:
             == expected_result
         )
 
+    @staticmethod
+    def test_get_unit_str_series(unit_formatter):
+        result = unit_formatter.get_unit_str_series(
+            quantity=pd.Series([1, 2, 2, 2, 3]),
+            pint_unit=pd.Series(
+                [
+                    unit_registry.cup,
+                    unit_registry.cup,
+                    unit_registry.tablespoon,
+                    unit_registry.dimensionless,
+                    None,
+                ]
+            ),
+        )
+        assert result.tolist() == ["cup", "cups", "tbsp", "", ""]
+
     @staticmethod
     def test_get_pint_unit_raise_error_for_not_unit(unit_formatter, log):
         with pytest.raises(UnitExtractionError) as error:
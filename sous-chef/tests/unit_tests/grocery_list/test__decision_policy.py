@@ -0,0 +1,133 @@
+import json
+
+import pytest
+from omegaconf import OmegaConf
+from sous_chef.grocery_list.generate_grocery_list._decision_policy import (
+    DecisionKey,
+    DecisionValueError,
+    ReferencedRecipeDecisionPolicy,
+)
+from tests.unit_tests.util import create_recipe
+
+
+@pytest.fixture
+def config_decision(config_grocery_list, tmp_path):
+    config = config_grocery_list.referenced_recipe_decision
+    config.file_path = str(tmp_path / "decision.json")
+    return config
+
+
+def fail_to_ask() -> str:
+    raise AssertionError("should not ask")
+
+
+class TestReferencedRecipeDecisionPolicy:
+    @staticmethod
+    def test_get_decision_records_to_json(config_decision):
+        policy = ReferencedRecipeDecisionPolicy(config_decision)
+        recipe = create_recipe(title="pesto")
+
+        assert policy.get_decision(recipe, DecisionKey.make, lambda: "w") == "w"
+
+        with open(policy.path, "r") as f:
+            assert json.load(f) == {"pesto": {"make": "w"}}
+        replay_policy = ReferencedRecipeDecisionPolicy(config_decision)
+        assert (
+            replay_policy.get_decision(recipe, DecisionKey.make, fail_to_ask)
+            == "w"
+        )
+
+    @staticmethod
+    def test_get_decision_does_not_record_when_not_interactive(
+        config_decision,
+    ):
+        policy = ReferencedRecipeDecisionPolicy(config_decision)
+        recipe = create_recipe(title="pesto")
+
+        policy.get_decision(
+            recipe, DecisionKey.make, lambda: "p", is_interactive=False
+        )
+
+        assert policy.decisions == {}
+        assert not policy.path.exists()
+
+    @staticmethod
+    def test_get_decision_converts_yaml_boolean(config_decision, tmp_path):
+        config_decision.file_path = str(tmp_path / "decision.yaml")
+        OmegaConf.save(
+            OmegaConf.create({"pesto": {"separately_schedule": True}}),
+            tmp_path / "decision.yaml",
+        )
+        policy = ReferencedRecipeDecisionPolicy(config_decision)
+
+        assert (
+            policy.get_decision(
+                create_recipe(title="pesto"),
+                DecisionKey.separately_schedule,
+                fail_to_ask,
+            )
+            == "y"
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "time_total_str,expected_decision",
+        [("90 minutes", "w"), ("10 minutes", "p"), ("nan", "s")],
+    )
+    def test_get_decision_from_rule(
+        config_decision, time_total_str, expected_decision
+    ):
+        config_decision.rules = [
+            {"min_time_total_minutes": 60, "decision": {"make": "w"}},
+            {"max_time_total_minutes": 60, "decision": {"make": "p"}},
+            {"title": "pesto", "decision": {"make": "s"}},
+        ]
+        policy = ReferencedRecipeDecisionPolicy(config_decision)
+        recipe = create_recipe(title="pesto", time_total_str=time_total_str)
+
+        assert (
+            policy.get_decision(recipe, DecisionKey.make, fail_to_ask)
+            == expected_decision
+        )
+        assert policy.decisions == {}
+
+    @staticmethod
+    def test_load_decisions_raises_for_invalid_decision(
+        config_decision, tmp_path
+    ):
+        config_decision.file_path = str(tmp_path / "decision.yaml")
+        OmegaConf.save(
+            OmegaConf.create(
+                {"pesto": {"make": "w"}, "hummus": {"make": "hole"}}
+            ),
+            tmp_path / "decision.yaml",
+        )
+
+        with pytest.raises(DecisionValueError) as error:
+            ReferencedRecipeDecisionPolicy(config_decision)
+
+        assert str(error.value) == (
+            "[decision value error]: make=hole for title=hummus in "
+            f"{tmp_path / 'decision.yaml'} not in ['p', 'w', 'd', 's']"
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "rule,title",
+        [
+            ({"title": "pesto", "decision": {"weekday": "mon"}}, "pesto"),
+            ({"decision": {"weekday": "mon"}}, "rules[1]"),
+        ],
+    )
+    def test_rule_raises_for_invalid_decision(config_decision, rule, title):
+        config_decision.rules = [
+            {"decision": {"weekday": "Monday", "meal_time": "dinner"}},
+            rule,
+        ]
+
+        with pytest.raises(DecisionValueError) as error:
+            ReferencedRecipeDecisionPolicy(config_decision)
+
+        assert error.value.title == title
+        assert error.value.key == "weekday"
+        assert "weekday=mon" in str(error.value)
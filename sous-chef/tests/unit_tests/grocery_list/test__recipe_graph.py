@@ -0,0 +1,107 @@
+from typing import Dict, List
+
+import pytest
+from sous_chef.grocery_list.generate_grocery_list._recipe_graph import (
+    RecipeGraph,
+    ReferencedRecipeCycleError,
+)
+from tests.unit_tests.util import create_recipe
+
+
+def set_parsed_ingredient_fields(
+    mock_ingredient_field, references: Dict[str, List[str]]
+):
+    def parse_ingredient_fields(recipe_list):
+        return [
+            (
+                [
+                    create_recipe(title=title)
+                    for title in references[recipe.title]
+                ],
+                [],
+                [],
+            )
+            for recipe in recipe_list
+        ]
+
+    mock_ingredient_field.parse_ingredient_fields.side_effect = (
+        parse_ingredient_fields
+    )
+
+
+@pytest.fixture
+def recipe_graph(mock_ingredient_field):
+    return RecipeGraph(ingredient_field=mock_ingredient_field)
+
+
+class TestRecipeGraph:
+    @staticmethod
+    def test_add_recipes_parses_shared_referenced_recipe_once(
+        recipe_graph, mock_ingredient_field
+    ):
+        set_parsed_ingredient_fields(
+            mock_ingredient_field,
+            {"pasta": ["sauce"], "lasagna": ["sauce"], "sauce": []},
+        )
+
+        recipe_graph.add_recipes(
+            [create_recipe(title="pasta"), create_recipe(title="lasagna")]
+        )
+
+        parsed_titles = [
+            recipe.title
+            for call in mock_ingredient_field.parse_ingredient_fields.mock_calls
+            for recipe in call.args[0]
+        ]
+        assert parsed_titles == ["pasta", "lasagna", "sauce"]
+        assert list(recipe_graph.nodes.keys()) == ["pasta", "lasagna", "sauce"]
+
+    @staticmethod
+    def test_get_parsed_ingredient_field_uses_parsed_node(
+        recipe_graph, mock_ingredient_field
+    ):
+        set_parsed_ingredient_fields(mock_ingredient_field, {"pasta": []})
+        recipe = create_recipe(title="pasta")
+        recipe_graph.add_recipes([recipe])
+
+        result = recipe_graph.get_parsed_ingredient_field(recipe)
+
+        assert result == ([], [], [])
+        assert mock_ingredient_field.parse_ingredient_fields.call_count == 1
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "references,expected_path",
+        [
+            ({"a": ["a"]}, ("a", "a")),
+            ({"a": ["b"], "b": ["c"], "c": ["a"]}, ("a", "b", "c", "a")),
+        ],
+    )
+    def test_add_recipes_drops_cycle(
+        recipe_graph, mock_ingredient_field, references, expected_path
+    ):
+        set_parsed_ingredient_fields(mock_ingredient_field, references)
+
+        recipe_graph.add_recipes([create_recipe(title="a")])
+
+        referenced_recipe_list, _, error_list = recipe_graph.nodes[
+            expected_path[-2]
+        ]
+        assert referenced_recipe_list == []
+        assert error_list == [
+            str(ReferencedRecipeCycleError(recipe_path=expected_path))
+        ]
+
+    @staticmethod
+    def test_add_recipes_keeps_diamond(recipe_graph, mock_ingredient_field):
+        set_parsed_ingredient_fields(
+            mock_ingredient_field,
+            {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []},
+        )
+
+        recipe_graph.add_recipes([create_recipe(title="a")])
+
+        assert all(
+            error_list == [] for _, _, error_list in recipe_graph.nodes.values()
+        )
+        assert [recipe.title for recipe in recipe_graph.nodes["c"][0]] == ["d"]
@@ -0,0 +1,155 @@
+from datetime import date
+
+import pytest
+from hydra import compose, initialize
+from sous_chef.grocery_list.generate_grocery_list._todoist_sync import (
+    GroceryTask,
+    TodoistGrocerySync,
+    get_sync_key,
+)
+
+from utilities.testing.todoist import DebugTodoistHelper, LocalTodoistConnection
+
+PROJECT = "Groceries"
+WEEK_LABEL = "app-week-1"
+
+
+@pytest.fixture
+def todoist_helper():
+    with initialize(version_base=None, config_path="../../../config/api"):
+        config = compose(config_name="todoist_api")
+    connection = LocalTodoistConnection()
+    project_id = connection.add_project(PROJECT)
+    connection.add_section(project_id=project_id, section_name="Produce")
+    connection.add_section(project_id=project_id, section_name="Specialty")
+
+    todoist_helper = DebugTodoistHelper(config)
+    todoist_helper.set_connection(connection)
+    return todoist_helper
+
+
+@pytest.fixture
+def todoist_sync(todoist_helper):
+    return TodoistGrocerySync(
+        todoist_helper=todoist_helper,
+        project_name=PROJECT,
+        week_label=WEEK_LABEL,
+    )
+
+
+def create_grocery_task(
+    todoist_helper,
+    item: str = "carrots",
+    task: str = "carrots, 3",
+    section: str = "Produce",
+    priority: int = 1,
+) -> GroceryTask:
+    project_id = todoist_helper.get_project_id(PROJECT)
+    return GroceryTask(
+        sync_key=f"{item}||2022-01-14",
+        task=task,
+        due_date=date(2022, 1, 14),
+        label_list=["Soup", WEEK_LABEL],
+        barcode="nan",
+        section=section,
+        section_id=todoist_helper.get_section_id(project_id, section),
+        priority=priority,
+    )
+
+
+def get_count(**kwargs) -> dict:
+    keys = ["added", "moved", "updated", "deleted", "unchanged"]
+    return {key: 0 for key in keys} | kwargs
+
+
+@pytest.mark.parametrize(
+    "description,expected_key",
+    [
+        (None, None),
+        ("", None),
+        ("nan", None),
+        ("nan\n[sync key] carrots||2022-01-14", "carrots||2022-01-14"),
+    ],
+)
+def test_get_sync_key(description, expected_key):
+    assert get_sync_key(description) == expected_key
+
+
+class TestTodoistGrocerySync:
+    @staticmethod
+    def test_sync_adds_missing_task(todoist_sync, todoist_helper):
+        grocery_task = create_grocery_task(todoist_helper)
+
+        count = todoist_sync.sync([grocery_task])
+
+        assert count == get_count(added=1)
+        (task,) = todoist_helper.get_tasks_in_project(PROJECT)
+        assert task.content == "carrots, 3"
+        assert get_sync_key(task.description) == grocery_task.sync_key
+
+    @staticmethod
+    def test_sync_only_sends_differences(todoist_sync, todoist_helper):
+        todoist_sync.sync(
+            [
+                create_grocery_task(todoist_helper, item="carrots"),
+                create_grocery_task(todoist_helper, item="leek", task="leek"),
+                create_grocery_task(todoist_helper, item="kale", task="kale"),
+            ]
+        )
+        task_id_map = {
+            task.content: task.id
+            for task in todoist_helper.get_tasks_in_project(PROJECT)
+        }
+
+        count = todoist_sync.sync(
+            [
+                create_grocery_task(todoist_helper, task="carrots, 5"),
+                create_grocery_task(todoist_helper, item="leek", task="leek"),
+                create_grocery_task(todoist_helper, item="lime", task="lime"),
+            ]
+        )
+
+        assert count == get_count(added=1, updated=1, deleted=1, unchanged=1)
+        task_list = todoist_helper.get_tasks_in_project(PROJECT)
+        assert sorted(task.content for task in task_list) == [
+            "carrots, 5",
+            "leek",
+            "lime",
+        ]
+        # updated & unchanged tasks are kept
+        assert {task.id for task in task_list} > {
+            task_id_map["carrots, 3"],
+            task_id_map["leek"],
+        }
+
+    @staticmethod
+    def test_sync_moves_task_to_new_section(todoist_sync, todoist_helper):
+        todoist_sync.sync([create_grocery_task(todoist_helper)])
+        (old_task,) = todoist_helper.get_tasks_in_project(PROJECT)
+
+        count = todoist_sync.sync(
+            [create_grocery_task(todoist_helper, section="Specialty")]
+        )
+
+        assert count == get_count(moved=1)
+        (task,) = todoist_helper.get_tasks_in_project(PROJECT)
+        assert task.id == old_task.id
+        assert (
+            task.section_id
+            == create_grocery_task(
+                todoist_helper, section="Specialty"
+            ).section_id
+        )
+
+    @staticmethod
+    def test_sync_ignores_tasks_of_other_week(todoist_sync, todoist_helper):
+        todoist_helper.add_task_to_project(
+            task="other week",
+            project=PROJECT,
+            label_list=["app-week-2"],
+        )
+
+        count = todoist_sync.sync([])
+
+        assert count == get_count()
+        assert len(todoist_helper.get_tasks_in_project(PROJECT)) == 1
@@ -1,18 +1,23 @@
 import builtins
 import datetime
+from dataclasses import replace
 from typing import Optional
 from unittest import mock
 from unittest.mock import patch
 
-import numpy as np
 import pandas as pd
 import pytest
 from pint import Unit
 from pytz import timezone
 from sous_chef.formatter.format_unit import unit_registry
 from sous_chef.formatter.ingredient.format_ingredient import Ingredient
+from sous_chef.grocery_list.generate_grocery_list._decision_policy import (
+    ReferencedRecipeDecisionPolicy,
+)
 from sous_chef.grocery_list.generate_grocery_list.generate_grocery_list import (
+    GROCERY_LIST_RAW_COLUMNS,
     GroceryListIncompleteError,
+    GroceryListRawAccumulator,
 )
 from sous_chef.menu.create_menu._output_for_grocery_list import MenuRecipe
 from sous_chef.recipe_book.recipe_util import RecipeSchema
@@ -142,38 +147,26 @@ class TestGroceryList:
     @pytest.mark.parametrize(
         "number_can_to_freeze, freeze_text", [(1, "1 can"), (2, "2 cans")]
     )
-    def test__format_bean_prep_task_str(
+    def test__format_bean_prep_task_str_column(
         grocery_list, number_can_to_freeze, freeze_text
     ):
-        row = pd.Series(
-            {
-                "quantity": 210,
-                "pint_unit": unit_registry.gram,
-                "item": "black beans",
-                "is_optional": False,
-                "item_plural": "black beans",
-            }
-        )
-        assert (
-            grocery_list._format_bean_prep_task_str(row, number_can_to_freeze)
-            == f"[BEAN PREP] black beans, 210 g (freeze: {freeze_text})"
-        )
+        ingredient_str = pd.Series(["black beans, 210 g", "chickpeas, 105 g"])
+        assert grocery_list._format_bean_prep_task_str_column(
+            ingredient_str, number_can_to_freeze
+        ).tolist() == [
+            f"[BEAN PREP] black beans, 210 g (freeze: {freeze_text})",
+            f"[BEAN PREP] chickpeas, 105 g (freeze: {freeze_text})",
+        ]
 
     @staticmethod
-    def test__format_bean_soak_task_str(grocery_list):
-        row = pd.Series(
-            {
-                "quantity": 210,
-                "pint_unit": unit_registry.gram,
-                "item": "black beans",
-                "is_optional": False,
-                "item_plural": "black beans",
-            }
-        )
-        assert (
-            grocery_list._format_bean_soak_task_str(row)
-            == "[BEAN SOAK] black beans, 210 g"
-        )
+    def test__format_bean_soak_task_str_column(grocery_list):
+        ingredient_str = pd.Series(["black beans, 210 g", "chickpeas, 105 g"])
+        assert grocery_list._format_bean_soak_task_str_column(
+            ingredient_str
+        ).tolist() == [
+            "[BEAN SOAK] black beans, 210 g",
+            "[BEAN SOAK] chickpeas, 105 g",
+        ]
 
     @staticmethod
     @pytest.mark.parametrize(
@@ -253,6 +246,28 @@ class TestGroceryList:
             grocery_list._format_ingredient_str(ingredient) == expected_result
         )
 
+    @staticmethod
+    def test__format_ingredient_str_column(grocery_list, config_grocery_list):
+        config_grocery_list.store_to_specialty_list = ["Lillehus"]
+        grocery_list_df = pd.DataFrame(
+            {
+                "quantity": [1.0, 2.0, 1.0, 0.5],
+                "pint_unit": [None, unit_registry.cup, unit_registry.cup, None],
+                "item": ["zucchini", "rice", "baguette", "lime"],
+                "is_optional": [False, False, True, False],
+                "item_plural": ["zucchinis", "rice", "baguettes", "limes"],
+                "aisle_group": ["Produce", "Grains", "Lillehus", "Produce"],
+            }
+        )
+        assert grocery_list._format_ingredient_str_column(
+            grocery_list_df
+        ).tolist() == [
+            "zucchini, 1",
+            "rice, 2 cups",
+            "[Lillehus] baguettes, 1 cup (optional)",
+            "lime, 0.5",
+        ]
+
     @staticmethod
     @pytest.mark.parametrize(
         "larger_pint_unit,second_pint_unit,expected_quantity",
@@ -261,19 +276,126 @@ class TestGroceryList:
             (unit_registry.kg, unit_registry.oz, [1.0, 0.03]),
         ],
     )
-    def test__get_group_in_same_pint_unit(
+    def test__get_grocery_list_raw_in_same_pint_unit(
         grocery_list, larger_pint_unit, second_pint_unit, expected_quantity
     ):
-        group = pd.DataFrame(
+        grocery_list_raw = pd.DataFrame(
             {
-                "quantity": [1.0, 1.0],
-                "pint_unit": [larger_pint_unit, second_pint_unit],
+                "quantity": [1.0, 1.0, 1.3333],
+                "pint_unit": [
+                    second_pint_unit,
+                    larger_pint_unit,
+                    second_pint_unit,
+                ],
+                "item": ["a", "a", "b"],
+                "shopping_date": [datetime.date(year=2022, month=1, day=20)]
+                * 3,
             }
         )
+        grocery_list_raw["dimension"] = grocery_list._get_dimension(
+            grocery_list_raw.pint_unit
+        )
 
-        result = grocery_list._get_group_in_same_pint_unit(group)
-        assert np.all(result.quantity.values == expected_quantity)
-        assert np.all(result.pint_unit.values == [larger_pint_unit] * 2)
+        result = grocery_list._get_grocery_list_raw_in_same_pint_unit(
+            grocery_list_raw
+        )
+        # only items with more than 1 unit are converted & rounded
+        assert result.quantity.tolist() == [*expected_quantity[::-1], 1.3333]
+        assert result.pint_unit.tolist() == [
+            larger_pint_unit,
+            larger_pint_unit,
+            second_pint_unit,
+        ]
+        assert grocery_list_raw.pint_unit.tolist()[0] == second_pint_unit
+
+    @staticmethod
+    def test__get_grocery_list_raw_in_same_pint_unit_tie_uses_first_unit(
+        grocery_list,
+    ):
+        grocery_list_raw = pd.DataFrame(
+            {
+                "quantity": [1.0, 2.0, 3.0],
+                "pint_unit": [
+                    unit_registry.jar,
+                    unit_registry.can,
+                    unit_registry.jar,
+                ],
+                "item": ["a", "a", "a"],
+                "shopping_date": [datetime.date(year=2022, month=1, day=20)]
+                * 3,
+            }
+        )
+        grocery_list_raw["dimension"] = grocery_list._get_dimension(
+            grocery_list_raw.pint_unit
+        )
+
+        result = grocery_list._get_grocery_list_raw_in_same_pint_unit(
+            grocery_list_raw
+        )
+        assert result.quantity.tolist() == [1.0, 2.0, 3.0]
+        assert result.pint_unit.tolist() == [unit_registry.jar] * 3
+
+    @staticmethod
+    def test__aggregate_grocery_list(grocery_list, config_grocery_list):
+        config_grocery_list.default_store = "grocery store"
+        for_day = datetime.datetime(
+            year=2022, month=1, day=20, tzinfo=timezone("UTC")
+        )
+        entry_list = [
+            ("flour", 1.0, unit_registry.cup, False, "recipe b"),
+            ("flour", 4.0, unit_registry.tbsp, False, "recipe a"),
+            ("flour", 1.0, unit_registry.gram, False, "recipe a"),
+            ("flour", 1.0, unit_registry.cup, True, "recipe c"),
+            ("apple", 2.0, unit_registry.dimensionless, False, "recipe b"),
+        ]
+        for item, quantity, pint_unit, is_optional, from_recipe in entry_list:
+            grocery_list._add_to_grocery_list_raw(
+                quantity=quantity,
+                pint_unit=pint_unit,
+                item=item,
+                is_optional=is_optional,
+                food_group="Baking",
+                item_plural=f"{item}s",
+                store="grocery store" if item == "flour" else "Asian store",
+                barcode="",
+                from_recipe=from_recipe,
+                for_day=for_day,
+            )
+
+        grocery_list._aggregate_grocery_list()
+
+        columns = [
+            "item",
+            "is_optional",
+            "quantity",
+            "pint_unit",
+            "from_recipe",
+            "aisle_group",
+        ]
+        assert grocery_list.grocery_list[columns].to_dict(orient="list") == {
+            "item": ["apple", "flour", "flour", "flour"],
+            "is_optional": [False, False, True, False],
+            "quantity": [2.0, 1.25, 1.0, 1.0],
+            "pint_unit": [
+                unit_registry.dimensionless,
+                unit_registry.cup,
+                unit_registry.cup,
+                unit_registry.gram,
+            ],
+            "from_recipe": [
+                ["recipe b"],
+                ["recipe a", "recipe b"],
+                ["recipe c"],
+                ["recipe a"],
+            ],
+            "aisle_group": [
+                "Asian store",
+                "Sweet carolina",
+                "Sweet carolina",
+                "Sweet carolina",
+            ],
+        }
+        assert grocery_list.grocery_list.for_day_str.tolist() == [["Thu"]] * 4
 
     @staticmethod
     @pytest.mark.parametrize(
@@ -309,7 +431,7 @@ class TestGroceryList:
             ),  # Thursday
         ],
     )
-    def test__get_on_second_shopping_day(
+    def test__get_shopping_date(
         grocery_list,
         for_day,
         food_group,
@@ -323,11 +445,15 @@ class TestGroceryList:
             year=2022, month=1, day=20
         )
         # only vegetable entries on Fri., Sat., Sun. should be true
-        assert (
-            # 2022-01-27
-            grocery_list._get_shopping_day(for_day, food_group)
-            == expected_result
+        result = grocery_list._get_shopping_date(
+            for_day=pd.Series([for_day, for_day]),
+            food_group=pd.Series([food_group, None]),
         )
+        # 2022-01-27; entries without food group are bought on primary day
+        assert result.tolist() == [
+            expected_result,
+            grocery_list.primary_shopping_date,
+        ]
 
     @staticmethod
     @pytest.mark.parametrize(
@@ -351,17 +477,31 @@ class TestGroceryList:
             plural_ending="",
         )
 
+        other_row = create_grocery_list_row(item="zucchini")
+
         assert config.g_per_can == 105
-        assert_equal_series(
-            grocery_list._override_can_to_dried_bean(row),
-            create_grocery_list_row(
-                quantity=(1 + 1) * 105,
-                item=f"dried {item}",
-                food_group="Beans",
-                pint_unit=unit_registry.g,
-                plural_ending="",
+        assert_equal_dataframe(
+            grocery_list._override_can_to_dried_bean(
+                pd.DataFrame([other_row, row])
+            ),
+            pd.DataFrame(
+                [
+                    other_row,
+                    create_grocery_list_row(
+                        quantity=(1 + 1) * 105,
+                        item=f"dried {item}",
+                        food_group="Beans",
+                        pint_unit=unit_registry.g,
+                        plural_ending="",
+                    ),
+                ]
             ),
         )
+        # soaking & cooking task for the bean
+        assert [task.task for task in grocery_list.preparation_task_list] == [
+            f"[BEAN SOAK] dried {item}, 210 g",
+            f"[BEAN PREP] dried {item}, 210 g (freeze: 1 can)",
+        ]
 
     @staticmethod
     @pytest.mark.parametrize(
@@ -375,8 +515,14 @@ class TestGroceryList:
     def test__override_can_to_dried_bean_skip_not_bean_can(
         grocery_list, item, unit, pint_unit
     ):
-        row = create_grocery_list_row(item=item, pint_unit=pint_unit)
-        assert_equal_series(grocery_list._override_can_to_dried_bean(row), row)
+        grocery_list_df = pd.DataFrame(
+            [create_grocery_list_row(item=item, pint_unit=pint_unit)]
+        )
+        assert_equal_dataframe(
+            grocery_list._override_can_to_dried_bean(grocery_list_df),
+            grocery_list_df,
+        )
+        assert grocery_list.queue_preparation is None
 
     @staticmethod
     @pytest.mark.parametrize(
@@ -386,31 +532,37 @@ class TestGroceryList:
             ("Vegetables", "Asian store", "Asian store"),
             ("Fruits", "grocery store", "Fruits"),
             ("Fruits", "Asian store", "Asian store"),
+            ("Fruits", "Grocery Store", "Fruits"),
         ],
     )
     def test__override_aisle_group_when_not_default_store(
         grocery_list, config_grocery_list, aisle_group, store, expected_value
     ):
         config_grocery_list.default_store = "grocery store"
-        row = create_grocery_list_row(aisle_group=aisle_group, store=store)
+        grocery_list_df = pd.DataFrame(
+            {
+                "aisle_group": [aisle_group] * 3,
+                "store": [store, "", None],
+            }
+        )
 
-        assert (
-            grocery_list._override_aisle_group_when_not_default_store(row)
-            == expected_value
+        result = grocery_list._override_aisle_group_when_not_default_store(
+            grocery_list_df
         )
+        # if pantry item not found, store not set
+        assert result.tolist() == [expected_value, aisle_group, aisle_group]
 
     @staticmethod
     def test__process_recipe_queue(grocery_list, mock_ingredient_field, log):
         menu_recipe = create_menu_recipe()
         ingredient, grocery_raw = create_ingredient_and_grocery_entry_raw()
         grocery_list.queue_menu_recipe = [menu_recipe]
-        mock_ingredient_field.parse_ingredient_field.return_value = (
-            [],
-            [ingredient],
-            [],
-        )
+        mock_ingredient_field.parse_ingredient_fields.return_value = [
+            ([], [ingredient], [])
+        ]
 
         grocery_list._process_recipe_queue()
+        grocery_list._materialize_grocery_list_raw()
         assert log.events[0] == {
             "event": "[grocery list]",
             "level": "info",
@@ -421,21 +573,38 @@ class TestGroceryList:
         assert_equal_dataframe(grocery_list.grocery_list_raw, grocery_raw)
 
     @staticmethod
-    def test__parse_ingredient_from_recipe(
+    def test__process_recipe_queue_stops_on_referenced_recipe_cycle(
         grocery_list, config_grocery_list, mock_ingredient_field
+    ):
+        config_grocery_list.run_mode.check_referenced_recipe = True
+        config_grocery_list.run_mode.with_todoist = False
+        menu_recipe = create_menu_recipe()
+        ingredient, _ = create_ingredient_and_grocery_entry_raw()
+        grocery_list.queue_menu_recipe = [menu_recipe]
+        mock_ingredient_field.parse_ingredient_fields.return_value = [
+            ([menu_recipe.recipe], [ingredient], [])
+        ]
+
+        grocery_list._process_recipe_queue()
+
+        assert grocery_list.has_errors
+        assert len(grocery_list.grocery_list_raw_accumulator) == 1
+        assert mock_ingredient_field.parse_ingredient_fields.call_count == 1
+
+    @staticmethod
+    def test__process_parsed_ingredient_field(
+        grocery_list, config_grocery_list
     ):
         menu_recipe = create_menu_recipe()
         ingredient, grocery_raw = create_ingredient_and_grocery_entry_raw()
         recipe = create_recipe(title="dummy recipe 2")
-        mock_ingredient_field.parse_ingredient_field.return_value = (
-            [recipe],
-            [ingredient],
-            [],
-        )
         config_grocery_list.run_mode.with_todoist = True
 
         with mock.patch.object(builtins, "input", lambda _: "P"):
-            grocery_list._parse_ingredient_from_recipe(menu_recipe)
+            grocery_list._process_parsed_ingredient_field(
+                menu_recipe, ([recipe], [ingredient], [])
+            )
+        grocery_list._materialize_grocery_list_raw()
 
         expected_menu_recipe = create_menu_recipe(
             recipe=recipe, from_recipe="dummy recipe 2_dummy recipe"
@@ -451,8 +620,128 @@ class TestGroceryList:
         )
 
         grocery_list._process_ingredient_list(menu_recipe, [ingredient])
+        grocery_list._materialize_grocery_list_raw()
         assert_equal_dataframe(grocery_list.grocery_list_raw, grocery_entry_raw)
 
+    @staticmethod
+    def test__materialize_grocery_list_raw_when_empty(grocery_list):
+        grocery_list._materialize_grocery_list_raw()
+        assert grocery_list.grocery_list_raw.empty
+        assert list(grocery_list.grocery_list_raw.columns) == [
+            *GROCERY_LIST_RAW_COLUMNS,
+            "for_day_str",
+            "shopping_date",
+        ]
+
+    @staticmethod
+    def test__materialize_grocery_list_raw_keeps_order(grocery_list):
+        menu_recipe = create_menu_recipe()
+        ingredient_list = [
+            create_ingredient_and_grocery_entry_raw(item=item)[0]
+            for item in ["zucchini", "carrot", "zucchini"]
+        ]
+
+        grocery_list._process_ingredient_list(menu_recipe, ingredient_list)
+        grocery_list._process_ingredient_list(menu_recipe, ingredient_list[:1])
+        grocery_list._materialize_grocery_list_raw()
+
+        assert grocery_list.grocery_list_raw.item.tolist() == [
+            "zucchini",
+            "carrot",
+            "zucchini",
+            "zucchini",
+        ]
+        assert grocery_list.grocery_list_raw.for_day_str.unique() == ["Thu"]
+
+    @staticmethod
+    def test_get_combined_grocery_list(grocery_list):
+        week_list = []
+        for week, quantity in enumerate([1.0, 2.0]):
+            week_grocery_list = replace(
+                grocery_list,
+                grocery_list_raw_accumulator=GroceryListRawAccumulator(),
+            )
+            ingredient, _ = create_ingredient_and_grocery_entry_raw(
+                quantity=quantity
+            )
+            week_grocery_list._process_ingredient_list(
+                create_menu_recipe(
+                    from_recipe=f"recipe {week}",
+                    for_day=datetime.datetime(
+                        year=2022, month=1, day=27, tzinfo=timezone("UTC")
+                    )
+                    + datetime.timedelta(days=7 * week),
+                ),
+                [ingredient],
+            )
+            week_list.append(week_grocery_list)
+        week_list[1].has_errors = True
+
+        result = grocery_list.get_combined_grocery_list(week_list)
+
+        assert result[["item", "quantity"]].to_dict(orient="records") == [
+            {"item": "zucchini", "quantity": 3.0}
+        ]
+        assert result.from_recipe.tolist() == [["recipe 0", "recipe 1"]]
+        assert grocery_list.has_errors
+        assert len(week_list[0].grocery_list_raw_accumulator) == 1
+
+    @staticmethod
+    def test_get_combined_grocery_list_sums_dried_bean_of_weeks(
+        grocery_list, config_grocery_list
+    ):
+        config = config_grocery_list.ingredient_replacement.can_to_dried_bean
+        config.is_active = True
+        week_list = []
+        for week in range(2):
+            week_grocery_list = replace(
+                grocery_list,
+                grocery_list_raw_accumulator=GroceryListRawAccumulator(),
+                preparation_task_list=[],
+            )
+            ingredient, _ = create_ingredient_and_grocery_entry_raw(
+                item="black beans",
+                pint_unit=unit_registry.can,
+                group="Canned",
+                plural_ending="",
+            )
+            week_grocery_list._process_ingredient_list(
+                create_menu_recipe(
+                    from_recipe=f"recipe {week}",
+                    for_day=datetime.datetime(
+                        year=2022, month=1, day=27, tzinfo=timezone("UTC")
+                    )
+                    + datetime.timedelta(days=7 * week),
+                ),
+                [ingredient],
+            )
+            week_grocery_list._aggregate_grocery_list()
+            week_list.append(week_grocery_list)
+
+        result = grocery_list.get_combined_grocery_list(week_list)
+
+        # each week cooks its can & one to freeze
+        assert [
+            week_grocery_list.grocery_list.quantity.tolist()
+            for week_grocery_list in week_list
+        ] == [[(1 + 1) * 105], [(1 + 1) * 105]]
+        assert result[["item", "quantity", "pint_unit"]].to_dict(
+            orient="records"
+        ) == [
+            {
+                "item": "dried black beans",
+                "quantity": 2 * (1 + 1) * 105,
+                "pint_unit": unit_registry.gram,
+            }
+        ]
+        assert result.from_recipe.tolist() == [["recipe 0", "recipe 1"]]
+        # only the weekly lists plan the soaking & cooking
+        assert grocery_list.preparation_task_list == []
+        assert [
+            len(week_grocery_list.preparation_task_list)
+            for week_grocery_list in week_list
+        ] == [2, 2]
+
     @staticmethod
     @pytest.mark.parametrize(
         "food_group,aisle_group",
@@ -466,19 +755,20 @@ class TestGroceryList:
         grocery_list, config_grocery_list, food_group, aisle_group
     ):
         config_grocery_list.food_group_to_aisle_map = {food_group: aisle_group}
-        assert (
-            grocery_list._transform_food_to_aisle_group(food_group)
-            == aisle_group
+        result = grocery_list._transform_food_to_aisle_group(
+            pd.Series([food_group, food_group.capitalize()])
         )
+        assert result.tolist() == [aisle_group, aisle_group]
 
     @staticmethod
     def test__transform_food_to_aisle_group_for_undefined_food_group(
         grocery_list, config_grocery_list
     ):
         config_grocery_list.food_group_to_aisle_map = {}
-        assert (
-            grocery_list._transform_food_to_aisle_group("asdfjl") == "Unknown"
+        result = grocery_list._transform_food_to_aisle_group(
+            pd.Series(["asdfjl", None])
         )
+        assert result.tolist() == ["Unknown", "Unknown"]
 
 
 class TestAddReferencedRecipeToQueue:
@@ -652,3 +942,57 @@ class TestAddReferencedRecipeToQueue:
 
         assert grocery_list.queue_menu_recipe is None
         assert grocery_list.queue_preparation is None
+
+    def test__make_partial_change_schedule_yes_from_decision_file(
+        self, grocery_list, config_grocery_list, tmp_path
+    ):
+        config_grocery_list.run_mode.with_todoist = True
+        config = config_grocery_list.referenced_recipe_decision
+        config.file_path = str(tmp_path / "decision.yaml")
+        with patch("builtins.input", side_effect=["p", "y", "1", "1"]):
+            grocery_list.decision_policy = ReferencedRecipeDecisionPolicy(
+                config
+            )
+            grocery_list._add_referenced_recipe_to_queue(
+                self.menu_recipe_base, [self.menu_recipe_ref]
+            )
+        expected_queue_preparation = grocery_list.queue_preparation
+
+        # replayed from the recorded file without asking
+        grocery_list.preparation_task_list = []
+        grocery_list.decision_policy = ReferencedRecipeDecisionPolicy(config)
+        with patch("builtins.input", side_effect=AssertionError):
+            grocery_list._add_referenced_recipe_to_queue(
+                self.menu_recipe_base, [self.menu_recipe_ref]
+            )
+
+        assert grocery_list.decision_policy.decisions == {
+            "referenced": {
+                "make": "p",
+                "separately_schedule": "y",
+                "weekday": "tuesday",
+                "meal_time": "lunch",
+            }
+        }
+        assert_equal_dataframe(
+            grocery_list.queue_preparation, expected_queue_preparation
+        )
+
+    def test__defrost_from_rule(self, grocery_list, config_grocery_list):
+        config_grocery_list.run_mode.with_todoist = True
+        config = config_grocery_list.referenced_recipe_decision
+        config.rules = [
+            {"max_time_total_minutes": 15, "decision": {"make": "w"}},
+            {"min_time_total_minutes": 15, "decision": {"make": "d"}},
+        ]
+        grocery_list.decision_policy = ReferencedRecipeDecisionPolicy(config)
+
+        with patch("builtins.input", side_effect=AssertionError):
+            grocery_list._add_referenced_recipe_to_queue(
+                self.menu_recipe_base, [self.menu_recipe_ref]
+            )
+
+        assert grocery_list.queue_menu_recipe is None
+        assert grocery_list.queue_preparation.task.tolist() == [
+            f"[DEFROST] {self.menu_recipe_ref.amount}"
+        ]
@@ -0,0 +1,153 @@
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+from hydra import compose, initialize
+from sous_chef.formatter.ingredient.format_ingredient import IngredientFormatter
+from sous_chef.formatter.ingredient.get_ingredient_field import IngredientField
+from sous_chef.formatter.ingredient.ingredient_store import IngredientStore
+from sous_chef.ingredient_table.create_ingredient_table import IngredientTable
+from sous_chef.pantry_list.read_pantry_list import PantryList
+
+PANTRY_ENTRY = pd.Series(
+    {
+        "true_ingredient": "sugar",
+        "ingredient": "sugar",
+        "group": "Baking",
+        "item_plural": "s",
+        "store": "grocery store",
+        "label": "basic_singular",
+        "replace_factor": 1,
+        "replace_unit": "",
+        "recipe_uuid": "",
+        "barcode": "",
+    }
+)
+
+
+@pytest.fixture
+def config():
+    with initialize(version_base=None, config_path="../../../config"):
+        config = compose(config_name="ingredient_table")
+    config.ingredient_table.n_jobs = 1
+    config.ingredient_table.batch_size = 1
+    return config
+
+
+@pytest.fixture
+def mock_pantry_list(config):
+    with patch.object(PantryList, "__init__", lambda x, y, z: None):
+        mock_pantry_list = Mock(PantryList(config.pantry_list, None))
+    mock_pantry_list.version = "v1"
+    mock_pantry_list.retrieve_match.return_value = PANTRY_ENTRY
+    return mock_pantry_list
+
+
+@pytest.fixture
+def ingredient_table(config, mock_pantry_list, unit_formatter, tmp_path):
+    config.ingredient_table.path = str(tmp_path / "table")
+    ingredient_formatter = IngredientFormatter(
+        config=config.formatter.format_ingredient,
+        pantry_list=mock_pantry_list,
+        unit_formatter=unit_formatter,
+    )
+    ingredient_field = IngredientField(
+        config=config.formatter.get_ingredient_field,
+        ingredient_formatter=ingredient_formatter,
+        recipe_book=None,
+        ingredient_store=IngredientStore(cache_dir=tmp_path / "store"),
+    )
+    return IngredientTable(
+        config.ingredient_table, ingredient_field=ingredient_field
+    )
+
+
+@pytest.fixture
+def recipe_book_df():
+    return pd.DataFrame(
+        {
+            "uuid": ["uuid-1", "uuid-2", "uuid-3"],
+            "title": ["cookies", "cake", "no ingredients"],
+            "ingredients": ["1 cup sugar\n2 tbsp sugar", "2 sugar", None],
+        }
+    )
+
+
+class TestIngredientTable:
+    @staticmethod
+    def test_create_ingredient_table(ingredient_table, recipe_book_df):
+        result = ingredient_table.create_ingredient_table(recipe_book_df)
+
+        columns = ["uuid", "title", "line_index", "item"]
+        assert result[columns].to_dict(orient="list") == {
+            "uuid": ["uuid-2", "uuid-1", "uuid-1"],
+            "title": ["cake", "cookies", "cookies"],
+            "line_index": [0, 0, 1],
+            "item": ["sugar", "sugar", "sugar"],
+        }
+        assert result.unit.tolist() == ["dimensionless", "cup", "tablespoon"]
+        assert result.group.tolist() == ["Baking"] * 3
+        assert result.error.isna().all()
+
+    @staticmethod
+    def test_create_ingredient_table_only_parses_new_recipes(
+        ingredient_table, mock_pantry_list, recipe_book_df
+    ):
+        ingredient_table.create_ingredient_table(recipe_book_df.iloc[:1])
+        assert mock_pantry_list.retrieve_match.call_count == 2
+
+        result = ingredient_table.create_ingredient_table(recipe_book_df)
+        assert mock_pantry_list.retrieve_match.call_count == 3
+        assert result.shape[0] == 3
+
+    @staticmethod
+    def test_get_error_report(ingredient_table, recipe_book_df):
+        ingredient_table_df = pd.DataFrame(
+            {
+                "uuid": ["uuid-1", "uuid-2"],
+                "title": ["cookies", "cake"],
+                "line_index": [0, 3],
+                "line": ["1 cup sugar", "1 cup unknown"],
+                "line_type": ["ingredient", "error"],
+                "error": [None, "[pantry search failed]"],
+            }
+        )
+
+        result = ingredient_table.get_error_report(ingredient_table_df)
+
+        assert result.to_dict(orient="records") == [
+            {
+                "uuid": "uuid-2",
+                "title": "cake",
+                "line_index": 3,
+                "line": "1 cup unknown",
+                "error": "[pantry search failed]",
+            }
+        ]
+
+    @staticmethod
+    def test_save_ingredient_table(ingredient_table, recipe_book_df):
+        table = ingredient_table.create_ingredient_table(recipe_book_df)
+
+        ingredient_table.save_ingredient_table(table)
+
+        config = ingredient_table.config
+        saved_table = pd.read_csv(
+            ingredient_table.path / config.file_ingredient_table
+        )
+        assert saved_table.shape == table.shape
+        assert (ingredient_table.path / config.file_error_report).exists()
+
+    @staticmethod
+    def test_save_fuzzy_match_report(ingredient_table):
+        report = pd.DataFrame(
+            {"query": ["berriess"], "best_match": ["berries"], "hits": [3]}
+        )
+
+        ingredient_table.save_fuzzy_match_report(report)
+
+        config = ingredient_table.config
+        saved_report = pd.read_csv(
+            ingredient_table.path / config.file_fuzzy_match_report
+        )
+        assert saved_report.equals(report)
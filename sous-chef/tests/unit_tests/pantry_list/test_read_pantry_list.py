@@ -1,8 +1,18 @@
-from unittest.mock import patch
+import pickle
+from unittest.mock import Mock, patch
 
+import pandas as pd
 import pytest
 from hydra import compose, initialize
-from sous_chef.pantry_list.read_pantry_list import InnerJoinError, PantryList
+from sous_chef.abstract.search_dataframe import FuzzySearchError
+from sous_chef.pantry_list.read_pantry_list import (
+    FuzzyMatch,
+    FuzzyMatchMemo,
+    InnerJoinError,
+    PantryEntry,
+    PantryList,
+    load_pantry_lookup,
+)
 
 
 @pytest.fixture
@@ -13,6 +23,46 @@ def pantry_list():
             return PantryList(config, None)
 
 
+@pytest.fixture
+def pantry_df():
+    return pd.DataFrame(
+        {
+            "ingredient": ["berry", "berries", "bery", "Berry ", "lard"],
+            "true_ingredient": ["berry", "berry", "berry", "berry", "lard"],
+            "label": [
+                "basic_singular",
+                "basic_plural",
+                "misspelled",
+                "replacement_singular",
+                "bad_ingredient",
+            ],
+            "group": ["Fruits", "Fruits", "Fruits", "Frozen", None],
+            "item_plural": ["berries"] * 4 + [None],
+            "store": ["grocery store"] * 4 + [None],
+            "barcode": [""] * 4 + [None],
+            "recipe_uuid": [""] * 4 + [None],
+            "replace_factor": [1, 1, 1, 2, None],
+            "replace_unit": ["", "", "", "g", None],
+            "plural_ending": ["ies", "ies", "ies", "ies", None],
+        }
+    )
+
+
+@pytest.fixture
+def pantry_list_with_lookup(pantry_list, pantry_df, tmp_path):
+    with initialize(version_base=None, config_path="../../../config"):
+        pantry_list.config = compose(config_name="pantry_list").pantry_list
+    pantry_list.dataframe = pantry_df
+    with patch("sous_chef.pantry_list.read_pantry_list.CACHE_DIR", tmp_path):
+        pantry_list.pantry_lookup = load_pantry_lookup(
+            version="v1", dataframe=pantry_df
+        )
+    pantry_list.fuzzy_match_memo = FuzzyMatchMemo(
+        version="v1", memo_path=tmp_path / "memo.pkl"
+    )
+    return pantry_list
+
+
 class TestPantryList:
     @staticmethod
     @pytest.mark.parametrize(
@@ -28,11 +78,91 @@ class TestPantryList:
     def test__get_pluralized_form(
         pantry_list, ingredient, plural_ending, expected_result
     ):
-        assert (
-            pantry_list._get_pluralized_form(plural_ending, ingredient)
-            == expected_result
+        result = pantry_list._get_pluralized_form(
+            pd.Series([plural_ending]), pd.Series([ingredient])
+        )
+        assert result.tolist() == [expected_result]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "search_term,expected_label,expected_true_ingredient",
+        [
+            ("berry", "basic_singular", "berry"),
+            (" BERRIES", "basic_plural", "berry"),
+            ("bery", "misspelled", "berry"),
+            ("lard", "bad_ingredient", "lard"),
+        ],
+    )
+    def test_retrieve_match_uses_lookup(
+        pantry_list_with_lookup,
+        search_term,
+        expected_label,
+        expected_true_ingredient,
+    ):
+        with patch.object(PantryList, "_get_fuzzy_best_match") as fuzzy:
+            result = pantry_list_with_lookup.retrieve_match(
+                "ingredient", search_term
+            )
+        fuzzy.assert_not_called()
+        assert isinstance(result, PantryEntry)
+        assert result.label == expected_label
+        assert result.true_ingredient == expected_true_ingredient
+
+    @staticmethod
+    def test_retrieve_match_falls_back_to_fuzzy_search(
+        pantry_list_with_lookup,
+    ):
+        pantry_list_with_lookup.config.fuzzy_match.min_thresh_to_accept = 90
+        result = pantry_list_with_lookup.retrieve_match(
+            "ingredient", "berriess"
+        )
+        assert result == PantryEntry(
+            ingredient="berries",
+            true_ingredient="berry",
+            label="basic_plural",
+            group="Fruits",
+            item_plural="berries",
+            store="grocery store",
+            barcode="",
+            recipe_uuid="",
+            replace_factor=1,
+            replace_unit="",
         )
 
+    @staticmethod
+    def test_retrieve_match_raises_error_when_unknown(
+        pantry_list_with_lookup,
+    ):
+        with pytest.raises(FuzzySearchError):
+            pantry_list_with_lookup.retrieve_match("ingredient", "carrot")
+
+    @staticmethod
+    def test_load_pantry_lookup_is_persisted_per_version(pantry_df, tmp_path):
+        with patch(
+            "sous_chef.pantry_list.read_pantry_list.CACHE_DIR", tmp_path
+        ):
+            pantry_lookup = load_pantry_lookup(
+                version="v1", dataframe=pantry_df
+            )
+            # only version is used as key, so same lookup returned
+            cached_lookup = load_pantry_lookup(
+                version="v1", dataframe=pantry_df.iloc[:1]
+            )
+            new_lookup = load_pantry_lookup(
+                version="v2", dataframe=pantry_df.iloc[:1]
+            )
+
+        assert list(pantry_lookup.keys()) == [
+            "berry",
+            "berries",
+            "bery",
+            "lard",
+        ]
+        # first entry is kept for duplicated search terms
+        assert pantry_lookup["berry"].label == "basic_singular"
+        assert cached_lookup.keys() == pantry_lookup.keys()
+        assert list(new_lookup.keys()) == ["berry"]
+
     @staticmethod
     @pytest.mark.parametrize(
         "df_name,old_shape,new_shape",
@@ -63,3 +193,132 @@ class TestPantryList:
         pantry_list, df_name, old_shape, new_shape
     ):
         pantry_list._check_join(df_name, old_shape, new_shape)
+
+    @staticmethod
+    def test_retrieve_match_memoizes_fuzzy_search(pantry_list_with_lookup):
+        pantry_list_with_lookup.config.fuzzy_match.min_thresh_to_accept = 90
+        with patch.object(
+            PantryList,
+            "_get_fuzzy_best_match",
+            return_value=("berries", 93),
+        ) as fuzzy:
+            for _ in range(2):
+                result = pantry_list_with_lookup.retrieve_match(
+                    "ingredient", "berriess"
+                )
+                assert result.label == "basic_plural"
+        fuzzy.assert_called_once()
+
+    @staticmethod
+    def test_retrieve_match_memoizes_failed_fuzzy_search(
+        pantry_list_with_lookup,
+    ):
+        with patch.object(
+            PantryList,
+            "_get_fuzzy_best_match",
+            return_value=("berry", 36),
+        ) as fuzzy:
+            for _ in range(2):
+                with pytest.raises(FuzzySearchError):
+                    pantry_list_with_lookup.retrieve_match(
+                        "ingredient", "carrot"
+                    )
+        fuzzy.assert_called_once()
+
+    @staticmethod
+    def test_get_fuzzy_match_report(pantry_list_with_lookup):
+        pantry_list_with_lookup.fuzzy_match_memo._write_memo(
+            {
+                "bery": FuzzyMatch(best_match="bery", quality=100, hits=1),
+                "berriess": FuzzyMatch(
+                    best_match="berries", quality=93, hits=3
+                ),
+            }
+        )
+
+        result = pantry_list_with_lookup.get_fuzzy_match_report()
+
+        assert result.to_dict(orient="records") == [
+            {
+                "query": "berriess",
+                "best_match": "berries",
+                "quality": 93,
+                "hits": 3,
+                "true_ingredient": "berry",
+                "is_accepted": False,
+            },
+            {
+                "query": "bery",
+                "best_match": "bery",
+                "quality": 100,
+                "hits": 1,
+                "true_ingredient": "berry",
+                "is_accepted": True,
+            },
+        ]
+
+    @staticmethod
+    def test_retrieve_match_of_other_field_is_pantry_entry(
+        pantry_list_with_lookup,
+    ):
+        result = pantry_list_with_lookup.retrieve_match(
+            "true_ingredient", "berry"
+        )
+
+        assert isinstance(result, PantryEntry)
+        assert result.true_ingredient == "berry"
+
+
+class TestFuzzyMatchMemo:
+    @staticmethod
+    def test_get_fuzzy_match_is_persisted(tmp_path):
+        memo_path = tmp_path / "memo.pkl"
+        find_best_match = Mock(return_value=("berries", 93))
+        fuzzy_match_memo = FuzzyMatchMemo(version="v1", memo_path=memo_path)
+        fuzzy_match_memo.get_fuzzy_match("berriess", find_best_match)
+        fuzzy_match_memo.save()
+
+        fuzzy_match_memo = FuzzyMatchMemo(version="v1", memo_path=memo_path)
+        result = fuzzy_match_memo.get_fuzzy_match("berriess", find_best_match)
+
+        find_best_match.assert_called_once()
+        assert result == FuzzyMatch(best_match="berries", quality=93, hits=2)
+
+    @staticmethod
+    def test_memo_is_invalidated_when_version_changes(tmp_path):
+        memo_path = tmp_path / "memo.pkl"
+        fuzzy_match_memo = FuzzyMatchMemo(version="v1", memo_path=memo_path)
+        fuzzy_match_memo.get_fuzzy_match("berriess", lambda: ("berries", 93))
+        fuzzy_match_memo.save()
+
+        assert FuzzyMatchMemo(version="v2", memo_path=memo_path).memo == {}
+
+    @staticmethod
+    def test_get_fuzzy_match_does_not_write(tmp_path):
+        memo_path = tmp_path / "memo.pkl"
+        fuzzy_match_memo = FuzzyMatchMemo(version="v1", memo_path=memo_path)
+
+        fuzzy_match_memo.get_fuzzy_match("berriess", lambda: ("berries", 93))
+
+        assert not memo_path.exists()
+
+    @staticmethod
+    def test_save_merges_copies_of_other_processes(tmp_path):
+        memo_path = tmp_path / "memo.pkl"
+        fuzzy_match_memo = FuzzyMatchMemo(version="v1", memo_path=memo_path)
+        fuzzy_match_memo.get_fuzzy_match("berriess", lambda: ("berries", 93))
+        worker_memo_list = [
+            pickle.loads(pickle.dumps(fuzzy_match_memo)) for _ in range(2)
+        ]
+        fuzzy_match_memo.save()
+
+        worker_memo_list[0].get_fuzzy_match("berriess", Mock())
+        worker_memo_list[1].get_fuzzy_match("bery", lambda: ("berry", 95))
+        for worker_memo in worker_memo_list:
+            worker_memo.save()
+
+        assert FuzzyMatchMemo(version="v1", memo_path=memo_path).memo == {
+            "berriess": FuzzyMatch(best_match="berries", quality=93, hits=2),
+            "bery": FuzzyMatch(best_match="berry", quality=95, hits=1),
+        }
+        assert list(tmp_path.glob("*.tmp")) == []
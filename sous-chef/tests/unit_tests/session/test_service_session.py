@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import pytest
+from hydra import compose, initialize
+from sous_chef.session.service_session import (
+    ServiceSession,
+    clear_service_cache,
+)
+
+
+@pytest.fixture
+def config():
+    with initialize(version_base=None, config_path="../../../config/"):
+        return compose(config_name="grocery_list")
+
+
+@pytest.fixture
+def session(config):
+    clear_service_cache()
+    yield ServiceSession(config)
+    clear_service_cache()
+
+
+class TestServiceSession:
+    @staticmethod
+    def test_get_recipe_book_loads_once_per_process(config, session):
+        with patch("sous_chef.session.service_session.RecipeBook") as mock:
+            recipe_book = session.get_recipe_book()
+
+            assert ServiceSession(config).get_recipe_book() is recipe_book
+            mock.assert_called_once_with(config.recipe_book)
+
+    @staticmethod
+    def test_get_recipe_book_reloads_for_changed_config(config, session):
+        with patch("sous_chef.session.service_session.RecipeBook") as mock:
+            session.get_recipe_book()
+            config.recipe_book.path = "other/path"
+            session.get_recipe_book()
+
+            assert mock.call_count == 2
+
+    @staticmethod
+    def test_get_ingredient_field_shares_services(session):
+        with (
+            patch(
+                "sous_chef.session.service_session.GsheetsHelper"
+            ) as mock_gsheets_helper,
+            patch(
+                "sous_chef.session.service_session.PantryList"
+            ) as mock_pantry_list,
+            patch("sous_chef.session.service_session.RecipeBook"),
+            patch("sous_chef.session.service_session.IngredientFormatter"),
+            patch(
+                "sous_chef.session.service_session.IngredientField"
+            ) as mock_ingredient_field,
+        ):
+            session.get_ingredient_field()
+            session.get_pantry_list()
+            session.get_ingredient_formatter()
+
+            mock_gsheets_helper.assert_called_once()
+            mock_pantry_list.assert_called_once()
+            assert (
+                mock_ingredient_field.call_args.kwargs["recipe_book"]
+                is session.get_recipe_book()
+            )
@@ -10,6 +10,7 @@ from utilities.api.base_classes.todoist import (
     TodoistKeyError,
     get_due_datetime_str,
 )
+from utilities.api.todoist_batch import TodoistBatch
 from utilities.validate_choice import YesNoChoices
 
 
@@ -285,6 +286,63 @@ class TestTodoistHelper:
             == 1
         )
 
+    def test_get_tasks_in_project_only_with_label(
+        self, implementation, pytest_area_project_id
+    ):
+        implementation.connection.add_task(
+            content="has_relevant_label",
+            project_id=pytest_area_project_id,
+            labels=["relevant-label"],
+        )
+        implementation.connection.add_task(
+            content="not_relevant_label",
+            project_id=pytest_area_project_id,
+            labels=["not-relevant-label"],
+        )
+
+        task_list = implementation.get_tasks_in_project(
+            project=DEFAULT_PROJECT, only_with_label="relevant-label"
+        )
+
+        assert [task.content for task in task_list] == ["has_relevant_label"]
+
+    @staticmethod
+    def test_batch_add_task_keeps_order(implementation):
+        with TodoistBatch(implementation) as todoist_batch:
+            for number in range(6):
+                todoist_batch.add_task(
+                    task=f"bulk task {number}", project=DEFAULT_PROJECT
+                )
+
+        task_list = sorted(
+            implementation.get_tasks_in_project(DEFAULT_PROJECT),
+            key=lambda task: task.order,
+        )
+        assert [task.content for task in task_list] == [
+            f"bulk task {number}" for number in range(6)
+        ]
+
+    @staticmethod
+    def test_update_task(implementation):
+        task = implementation.add_task_to_project(
+            task="task to update",
+            project=DEFAULT_PROJECT,
+            description="old description",
+        )
+
+        implementation.update_task(
+            task_id=task.id,
+            task="updated task",
+            label_list=["dummy label"],
+            priority=2,
+        )
+
+        updated_task = implementation._get_task(task_id=task.id)
+        assert updated_task.content == "updated task"
+        assert updated_task.description == "old description"
+        assert sorted(updated_task.labels) == ["app", "dummy_label"]
+        assert updated_task.priority == 2
+
     @staticmethod
     @pytest.mark.parametrize(
         "project_name",
@@ -1,7 +1,10 @@
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+import pandas as pd
 import pytest
+from hydra import compose, initialize
 
+from utilities.api.gsheets_api import GsheetsHelper
 from utilities.api.todoist_api import TodoistHelper
 
 
@@ -9,3 +12,40 @@ from utilities.api.todoist_api import TodoistHelper
 def mock_todoist_helper(todoist_config):
     with patch.object(TodoistHelper, TodoistHelper.__post_init__.__name__):
         return TodoistHelper(todoist_config)
+
+
+WORKSHEET_VALUES = [["item", "quantity"], ["apple", "1"], ["bean", "2"]]
+WORKSHEET_DF = pd.DataFrame({"item": ["apple", "bean"], "quantity": [1, 2]})
+
+
+def get_drive_file(name: str, modified_time: str) -> dict:
+    return {"id": f"id-{name}", "name": name, "modifiedTime": modified_time}
+
+
+@pytest.fixture
+def gsheets_helper(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    with initialize(version_base=None, config_path="../../../config/api"):
+        config = compose(config_name="gsheets_api").gsheets
+
+    def create(offline: bool = False, ttl_minutes: int = 0):
+        config.worksheet_cache.offline = offline
+        config.worksheet_cache.ttl_minutes = ttl_minutes
+        with patch("utilities.api.gsheets_api.get_shared_client"):
+            gsheets_helper = GsheetsHelper(config)
+        gsheets_helper.connection = Mock()
+        gsheets_helper.connection.open.side_effect = lambda name: Mock(
+            id=f"id-{name}", title=name
+        )
+        gsheets_helper.connection.drive.list.return_value = [
+            get_drive_file("menu", "2026-01-01T00:00:00Z"),
+            get_drive_file("pantry", "2026-01-01T00:00:00Z"),
+        ]
+        gsheets_helper.connection.sheet.values_batch_get.side_effect = (
+            lambda workbook_id, range_list: [
+                {"values": WORKSHEET_VALUES} for _ in range_list
+            ]
+        )
+        return gsheets_helper
+
+    return create
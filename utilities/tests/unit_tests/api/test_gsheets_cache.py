@@ -0,0 +1,226 @@
+from unittest.mock import patch
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from tests.unit_tests.api.conftest import WORKSHEET_DF, WORKSHEET_VALUES
+
+from utilities.api import gsheets_api, gsheets_cache
+from utilities.api.gsheets_api import GsheetsHelper
+from utilities.api.gsheets_cache import (
+    GsheetsOfflineError,
+    WorkbookFile,
+    WorkbookIdMap,
+    WorksheetCache,
+)
+from utilities.testing.pandas_util import assert_equal_dataframe
+
+
+def read_worksheets(gsheets_helper: GsheetsHelper):
+    for workbook_name in ["menu", "pantry"]:
+        workbook = gsheets_helper.get_workbook(workbook_name)
+        assert_equal_dataframe(
+            workbook.get_worksheet("sheet", numerize=True), WORKSHEET_DF
+        )
+
+
+class TestWorksheetCache:
+    @staticmethod
+    def test_update_workbooks_drops_worksheets_of_changed_workbook(tmp_path):
+        cache = WorksheetCache(dir_path=tmp_path)
+        cache.update_workbooks(["menu"], [WorkbookFile("1", "menu", "v1")])
+        cache.save("menu", "sheet", WORKSHEET_VALUES)
+
+        cache = WorksheetCache(dir_path=tmp_path)
+        assert cache.load("menu", "sheet") == WORKSHEET_VALUES
+        cache.update_workbooks(["menu"], [WorkbookFile("1", "menu", "v2")])
+
+        assert cache.load("menu", "sheet") is None
+
+    @staticmethod
+    def test_update_workbooks_removes_missing_workbook(tmp_path):
+        cache = WorksheetCache(dir_path=tmp_path)
+        cache.update_workbooks(["menu"], [WorkbookFile("1", "menu", "v1")])
+
+        cache.update_workbooks(["menu"], [])
+
+        assert cache.workbook_map == {}
+
+    @staticmethod
+    def test_is_fresh_within_ttl_or_once_checked(tmp_path):
+        cache = WorksheetCache(dir_path=tmp_path, ttl_seconds=60)
+        assert not cache.is_fresh("menu")
+        cache.update_workbooks(["menu"], [WorkbookFile("1", "menu", "v1")])
+        assert cache.is_fresh("menu")
+
+        cache.invalidate("menu")
+
+        assert not cache.is_fresh("menu")
+        assert cache.get_stale_workbook_names() == ["menu"]
+
+
+class TestGsheetsHelperWithCache:
+    @staticmethod
+    def test_run_checks_all_known_workbooks_in_one_request(gsheets_helper):
+        gsheets_helper().get_workbook("pantry").get_worksheet("sheet", True)
+
+        helper = gsheets_helper()
+        read_worksheets(helper)
+
+        assert helper.connection.drive.list.call_count == 1
+        assert "name='menu' or name='pantry'" in (
+            helper.connection.drive.list.call_args.kwargs["q"]
+        )
+        helper.connection.sheet.values_batch_get.assert_called_once_with(
+            "id-menu", ["'sheet'"]
+        )
+        helper.connection.open.assert_not_called()
+
+    @staticmethod
+    def test_warm_run_makes_only_freshness_check(gsheets_helper):
+        read_worksheets(gsheets_helper())
+
+        helper = gsheets_helper()
+        read_worksheets(helper)
+
+        assert helper.connection.drive.list.call_count == 1
+        helper.connection.sheet.values_batch_get.assert_not_called()
+
+    @staticmethod
+    def test_warm_run_within_ttl_makes_no_request(gsheets_helper):
+        read_worksheets(gsheets_helper())
+
+        helper = gsheets_helper(ttl_minutes=60)
+        read_worksheets(helper)
+
+        assert helper.connection.method_calls == []
+
+    @staticmethod
+    def test_offline_reads_cache_only(gsheets_helper):
+        read_worksheets(gsheets_helper())
+
+        helper = gsheets_helper(offline=True)
+        read_worksheets(helper)
+
+        assert helper.connection.method_calls == []
+        with pytest.raises(GsheetsOfflineError):
+            helper.get_workbook("menu").get_worksheet("other")
+
+    @staticmethod
+    def test_get_worksheets_reads_uncached_in_one_request(gsheets_helper):
+        helper = gsheets_helper()
+        workbook = helper.get_workbook("menu")
+        workbook.get_worksheet("cached")
+
+        worksheet_map = workbook.get_worksheets(
+            ["cached", "it's new", "other"], numerize={"other": True}
+        )
+
+        helper.connection.sheet.values_batch_get.assert_called_with(
+            "id-menu", ["'it''s new'", "'other'"]
+        )
+        assert helper.connection.sheet.values_batch_get.call_count == 2
+        assert list(worksheet_map) == ["cached", "it's new", "other"]
+        assert worksheet_map["cached"].quantity.tolist() == ["1", "2"]
+        assert_equal_dataframe(worksheet_map["other"], WORKSHEET_DF)
+
+    @staticmethod
+    def test_get_worksheets_without_cache_looks_up_workbook_once(
+        gsheets_helper,
+    ):
+        helper = gsheets_helper()
+        helper.worksheet_cache = None
+        workbook = helper.get_workbook("menu")
+
+        workbook.get_worksheets(["a", "b"])
+        workbook.get_worksheet("c")
+
+        helper.connection.open.assert_called_once_with("menu")
+        assert helper.connection.sheet.values_batch_get.call_count == 2
+
+
+class TestWorkbookIdMap:
+    @staticmethod
+    def test_set_is_persisted(tmp_path):
+        file_path = tmp_path / "workbook_ids.json"
+        WorkbookIdMap(file_path=file_path).set("menu", "1")
+
+        assert WorkbookIdMap(file_path=file_path).get("menu") == "1"
+
+    @staticmethod
+    def test_discard_only_given_id(tmp_path):
+        workbook_id_map = WorkbookIdMap(file_path=tmp_path / "ids.json")
+        workbook_id_map.set("menu", "2")
+
+        assert not workbook_id_map.discard("menu", "1")
+        assert workbook_id_map.discard("menu", "2")
+        assert workbook_id_map.get("menu") is None
+
+
+class TestGsheetsHelperWithWorkbookIds:
+    @staticmethod
+    @pytest.fixture
+    def gsheets_helper_without_cache(gsheets_helper, monkeypatch):
+        def create():
+            # as if in a new process
+            monkeypatch.setattr(gsheets_cache, "_WORKBOOK_ID_MAP_REGISTRY", {})
+            helper = gsheets_helper()
+            helper.worksheet_cache = None
+            return helper
+
+        return create
+
+    @staticmethod
+    def test_later_run_opens_by_stored_id(gsheets_helper_without_cache):
+        gsheets_helper_without_cache().get_worksheet("menu", "sheet")
+
+        helper = gsheets_helper_without_cache()
+        helper.get_worksheet("menu", "sheet")
+        helper.write_worksheet(WORKSHEET_DF, "menu", "sheet")
+
+        helper.connection.open.assert_not_called()
+        helper.connection.sheet.values_batch_get.assert_called_once_with(
+            "id-menu", ["'sheet'"]
+        )
+        helper.connection.open_by_key.assert_called_once_with("id-menu")
+
+    @staticmethod
+    def test_stale_id_is_looked_up_again(gsheets_helper_without_cache):
+        gsheets_helper_without_cache().workbook_id_map.set("menu", "deleted")
+        helper = gsheets_helper_without_cache()
+        helper.connection.open_by_key.side_effect = [
+            HttpError(resp=httplib2.Response({"status": 404}), content=b""),
+            helper.connection.open_by_key.return_value,
+        ]
+
+        helper.write_worksheet(WORKSHEET_DF, "menu", "sheet")
+
+        helper.connection.open.assert_called_once_with("menu")
+        assert helper.connection.open_by_key.call_args.args == ("id-menu",)
+        assert helper.workbook_id_map.get("menu") == "id-menu"
+
+    @staticmethod
+    def test_stale_id_of_worksheet_cache_is_looked_up_again(gsheets_helper):
+        helper = gsheets_helper(ttl_minutes=60)
+        helper.get_worksheet("menu", "sheet")
+        helper.connection.sheet.values_batch_get.side_effect = [
+            HttpError(resp=httplib2.Response({"status": 404}), content=b""),
+            [{"values": WORKSHEET_VALUES}],
+        ]
+
+        helper.get_worksheet("menu", "other")
+
+        helper.connection.open.assert_called_once_with("menu")
+        assert helper.worksheet_cache.get_file_id("menu") is None
+        assert helper.workbook_id_map.get("menu") == "id-menu"
+
+
+def test_helpers_share_client_per_token_file(gsheets_helper, monkeypatch):
+    monkeypatch.setattr(gsheets_api, "_CLIENT_REGISTRY", {})
+    config = gsheets_helper().config
+
+    with patch("pygsheets.authorize") as authorize:
+        helper_list = [GsheetsHelper(config) for _ in range(2)]
+
+    authorize.assert_called_once()
+    assert helper_list[0].connection is helper_list[1].connection
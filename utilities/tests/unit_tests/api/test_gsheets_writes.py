@@ -0,0 +1,130 @@
+import pandas as pd
+import pytest
+
+from utilities.api.gsheets_api import (
+    WorksheetHeaderError,
+    get_changed_ranges,
+    get_sheet_range,
+    get_values,
+    is_same_cell,
+)
+
+WRITE_DF = pd.DataFrame({"item": ["apple", "bean"], "quantity": [1.0, 2.0]})
+
+
+def get_batch_update_data(gsheets_helper) -> list:
+    batch_update = (
+        gsheets_helper.connection.sheet.service.spreadsheets()
+        .values()
+        .batchUpdate
+    )
+    return batch_update.call_args.kwargs["body"]["data"]
+
+
+@pytest.mark.parametrize(
+    "old_value,new_value,expected",
+    [("a", "a", True), ("1", "1.0", True), ("1", "2", False), ("", "0", False)],
+)
+def test_is_same_cell(old_value, new_value, expected):
+    assert is_same_cell(old_value, new_value) == expected
+
+
+def test_get_values_as_set_dataframe():
+    df = pd.DataFrame(
+        {"a": pd.array([1, None], dtype="Int64"), "b": ["x", None]}
+    )
+    assert get_values(df) == [["a", "b"], ["1", "x"], ["NaN", "NaN"]]
+
+
+def test_get_changed_ranges():
+    old_values = [["a", "b", "c"], ["1", "2", "3"], ["4", "5"], ["7"]]
+    new_values = [["a", "b", "c"], ["x", "2", "y"], ["4", "z", "w"]]
+
+    assert get_changed_ranges(old_values, new_values) == [
+        (1, 0, ["x"]),
+        (1, 2, ["y"]),
+        (2, 1, ["z", "w"]),
+        (3, 0, [""]),
+    ]
+
+
+def test_get_sheet_range():
+    assert get_sheet_range("it's", start=(2, 27)) == "'it''s'!AB3"
+
+
+class TestWriteDiff:
+    @staticmethod
+    def test_sends_only_changed_cells_and_new_rows(gsheets_helper):
+        helper = gsheets_helper()
+        df = pd.DataFrame(
+            {"item": ["apple", "berry", "cherry"], "quantity": [1.0, 2, 3]}
+        )
+
+        helper.write_diff(df, "menu", "sheet")
+
+        assert get_batch_update_data(helper) == [
+            {"range": "'sheet'!A3", "values": [["berry"]]}
+        ]
+        helper.connection.sheet.values_append.assert_called_once_with(
+            "id-menu",
+            [["cherry", "3.0"]],
+            "ROWS",
+            "'sheet'!A1",
+            insertDataOption="INSERT_ROWS",
+        )
+        assert not helper.worksheet_cache.is_fresh("menu")
+
+    @staticmethod
+    def test_unchanged_sends_nothing(gsheets_helper):
+        helper = gsheets_helper()
+
+        helper.write_diff(WRITE_DF, "menu", "sheet")
+
+        helper.connection.sheet.service.spreadsheets.assert_not_called()
+        helper.connection.sheet.values_append.assert_not_called()
+
+    @staticmethod
+    def test_new_column_writes_whole_worksheet(gsheets_helper):
+        helper = gsheets_helper()
+        df = WRITE_DF.assign(unit="g")
+
+        helper.write_diff(df, "menu", "sheet")
+
+        worksheet = (
+            helper.connection.open_by_key.return_value.worksheet_by_title
+        )
+        worksheet.return_value.set_dataframe.assert_called_once()
+        helper.connection.sheet.values_append.assert_not_called()
+
+
+class TestAppendRows:
+    @staticmethod
+    def test_appends_rows_without_header(gsheets_helper):
+        helper = gsheets_helper()
+
+        helper.append_rows(WRITE_DF, "menu", "sheet")
+
+        assert helper.connection.sheet.values_append.call_args.args[1] == (
+            [["apple", "1.0"], ["bean", "2.0"]]
+        )
+
+    @staticmethod
+    def test_raises_error_for_other_columns(gsheets_helper):
+        helper = gsheets_helper()
+
+        with pytest.raises(WorksheetHeaderError):
+            helper.append_rows(WRITE_DF[["quantity"]], "menu", "sheet")
+
+    @staticmethod
+    def test_empty_worksheet_is_written_with_header(gsheets_helper):
+        helper = gsheets_helper()
+        helper.connection.sheet.values_batch_get.side_effect = None
+        helper.connection.sheet.values_batch_get.return_value = [{}]
+
+        helper.append_rows(WRITE_DF, "menu", "sheet")
+
+        helper.connection.sheet.values_append.assert_not_called()
+        worksheet = (
+            helper.connection.open_by_key.return_value.worksheet_by_title
+        )
+        worksheet.return_value.set_dataframe.assert_called_once()
@@ -0,0 +1,85 @@
+from unittest.mock import Mock
+
+import pytest
+import tenacity
+from requests import HTTPError, Response
+
+from utilities.api.rate_limit import (
+    TokenBucket,
+    get_retry_after_seconds,
+    wait_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleep_list = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleep_list.append(seconds)
+        self.now += seconds
+
+
+def create_http_error(status_code: int, retry_after: str = None) -> HTTPError:
+    response = Response()
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return HTTPError(response=response)
+
+
+class TestTokenBucket:
+    @staticmethod
+    def test_acquire_waits_for_refill_after_burst():
+        clock = FakeClock()
+        token_bucket = TokenBucket(
+            capacity=2, refill_per_second=0.5, clock=clock, sleep=clock.sleep
+        )
+
+        waited_list = [token_bucket.acquire() for _ in range(3)]
+
+        assert waited_list == [0, 0, 2]
+        assert clock.sleep_list == [2]
+
+    @staticmethod
+    def test_acquire_does_not_exceed_capacity():
+        clock = FakeClock()
+        token_bucket = TokenBucket(
+            capacity=1, refill_per_second=1, clock=clock, sleep=clock.sleep
+        )
+        token_bucket.acquire()
+        clock.now += 100
+
+        token_bucket.acquire()
+
+        assert token_bucket.tokens == 0
+
+
+@pytest.mark.parametrize(
+    "error,expected_seconds",
+    [
+        (create_http_error(429, "7"), 7.0),
+        (create_http_error(429), None),
+        (create_http_error(500, "7"), None),
+        (ValueError("not http"), None),
+    ],
+)
+def test_get_retry_after_seconds(error, expected_seconds):
+    assert get_retry_after_seconds(error) == expected_seconds
+
+
+@pytest.mark.parametrize(
+    "error,expected_wait",
+    [(create_http_error(429, "30"), 30), (create_http_error(503), 1)],
+)
+def test_wait_retry_after(error, expected_wait):
+    retry_state = Mock(tenacity.RetryCallState)
+    retry_state.outcome = tenacity.Future.construct(1, error, True)
+
+    wait = wait_retry_after(fallback=tenacity.wait_fixed(1))
+
+    assert wait(retry_state) == expected_wait
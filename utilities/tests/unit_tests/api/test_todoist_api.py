@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 import pytest
 
@@ -58,6 +58,29 @@ class TestTodoistHelper:
         with pytest.raises(AttributeError):
             implementation._get_due_datetime_str(due_date)
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        "kwargs,expected_query",
+        [
+            ({}, "#Groceries & !recurring"),
+            (
+                {
+                    "skip_recurring": False,
+                    "only_with_label": "app-week-3",
+                    "only_delete_after_date": date(2022, 1, 2),
+                },
+                "#Groceries & @app-week-3 & due after: 2022-01-02",
+            ),
+            (
+                {"project": "Food & drinks", "skip_recurring": False},
+                "#Food \\& drinks",
+            ),
+        ],
+    )
+    def test__get_filter_query(implementation, kwargs, expected_query):
+        kwargs = {"project": "Groceries"} | kwargs
+        assert implementation._get_filter_query(**kwargs) == expected_query
+
     @staticmethod
     def test_get_project_id_if_not_exists(implementation):
         implementation.projects = {}
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import pytest
+from tests.conftest import DEFAULT_PROJECT, DEFAULT_SECTION
+
+from utilities.api.todoist_batch import TodoistBatch, TodoistBatchError
+
+
+@pytest.fixture
+def todoist_helper(debug_todoist_helper, local_todoist_project_id):
+    debug_todoist_helper.connection.tasks = []
+    yield debug_todoist_helper
+    debug_todoist_helper.connection.tasks = []
+
+
+def get_task_list(todoist_helper):
+    return todoist_helper.get_tasks_in_project(DEFAULT_PROJECT)
+
+
+class TestTodoistBatch:
+    @staticmethod
+    def test_flush_sends_commands_in_chunks(todoist_helper):
+        todoist_batch = TodoistBatch(todoist_helper, command_limit=2)
+        for number in range(5):
+            todoist_batch.add_task(
+                task=f"task {number}", project=DEFAULT_PROJECT
+            )
+
+        with patch.object(
+            todoist_helper,
+            "post_sync_commands",
+            wraps=todoist_helper.post_sync_commands,
+        ) as post_sync_commands:
+            temp_id_mapping = todoist_batch.flush()
+
+        assert post_sync_commands.call_count == 3
+        assert len(temp_id_mapping) == 5
+        assert len(todoist_batch) == 0
+        assert [task.content for task in get_task_list(todoist_helper)] == [
+            f"task {number}" for number in range(5)
+        ]
+
+    @staticmethod
+    def test_flush_resolves_temp_id_of_earlier_chunk(todoist_helper):
+        with TodoistBatch(todoist_helper, command_limit=1) as todoist_batch:
+            parent_id = todoist_batch.add_task(
+                task="parent", project=DEFAULT_PROJECT, section=DEFAULT_SECTION
+            )
+            todoist_batch.add_task(
+                task="child", project=DEFAULT_PROJECT, parent_id=parent_id
+            )
+            todoist_batch.update_task(task_id=parent_id, priority=3)
+
+        parent, child = get_task_list(todoist_helper)
+        assert parent.id == todoist_batch.temp_id_mapping[parent_id]
+        assert parent.priority == 3
+        assert child.parent_id == parent.id
+
+    @staticmethod
+    def test_flush_deletes_task(todoist_helper):
+        task = todoist_helper.add_task_to_project(
+            task="to delete", project=DEFAULT_PROJECT
+        )
+
+        with TodoistBatch(todoist_helper) as todoist_batch:
+            todoist_batch.delete_task(task_id=task.id)
+
+        assert get_task_list(todoist_helper) == []
+
+    @staticmethod
+    def test_flush_moves_task_to_section(todoist_helper):
+        task = todoist_helper.add_task_to_project(
+            task="to move", project=DEFAULT_PROJECT
+        )
+
+        with TodoistBatch(todoist_helper) as todoist_batch:
+            todoist_batch.move_task(task_id=task.id, section_id="section")
+
+        (moved_task,) = get_task_list(todoist_helper)
+        assert (moved_task.id, moved_task.section_id) == (task.id, "section")
+
+    @staticmethod
+    def test_flush_raises_error_for_failed_command(todoist_helper):
+        todoist_batch = TodoistBatch(todoist_helper)
+        todoist_batch.add_task(task="failing", project=DEFAULT_PROJECT)
+        error = {"error": "invalid", "error_code": 20}
+
+        with patch.object(
+            todoist_helper,
+            "post_sync_commands",
+            side_effect=lambda command_list: {
+                "sync_status": {command_list[0]["uuid"]: error}
+            },
+        ):
+            with pytest.raises(TodoistBatchError) as error_info:
+                todoist_batch.flush()
+
+        assert list(error_info.value.error_map.values()) == [error]
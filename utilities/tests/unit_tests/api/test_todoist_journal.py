@@ -0,0 +1,170 @@
+from unittest.mock import patch
+
+import pytest
+from tests.conftest import DEFAULT_PROJECT
+
+from utilities.api.todoist_batch import TodoistBatch
+from utilities.api.todoist_journal import UploadJournal
+from utilities.validate_choice import YesNoChoices
+
+
+@pytest.fixture
+def todoist_helper(debug_todoist_helper, local_todoist_project_id):
+    debug_todoist_helper.connection.tasks = []
+    yield debug_todoist_helper
+    debug_todoist_helper.connection.tasks = []
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / "upload.jsonl"
+
+
+def get_task_list(todoist_helper):
+    return todoist_helper.get_tasks_in_project(DEFAULT_PROJECT)
+
+
+def queue_tasks(todoist_batch: TodoistBatch):
+    parent_id = todoist_batch.add_task(task="parent", project=DEFAULT_PROJECT)
+    for _ in range(2):
+        todoist_batch.add_task(
+            task="child", project=DEFAULT_PROJECT, parent_id=parent_id
+        )
+    todoist_batch.add_task(task="other", project=DEFAULT_PROJECT)
+
+
+def interrupt_after(
+    todoist_helper, number_calls: int, is_applied: bool = False
+):
+    post_sync_commands = todoist_helper.post_sync_commands
+
+    def side_effect(command_list):
+        if side_effect.call_count == number_calls:
+            # e.g. the response is lost, after todoist applied the commands
+            if is_applied:
+                post_sync_commands(command_list)
+            raise ConnectionError("interrupted")
+        side_effect.call_count += 1
+        return post_sync_commands(command_list)
+
+    side_effect.call_count = 0
+    return patch.object(
+        todoist_helper, "post_sync_commands", side_effect=side_effect
+    )
+
+
+class TestUploadJournal:
+    @staticmethod
+    def test_get_key_differs_for_repeated_operation(journal_path):
+        journal = UploadJournal(file_path=journal_path)
+        key_list = [journal.get_key("item_add", {"content": "a"}) for _ in "ab"]
+
+        assert len(set(key_list)) == 2
+        resumed_journal = UploadJournal(file_path=journal_path)
+        assert resumed_journal.get_key("item_add", {"content": "a"}) == (
+            key_list[0]
+        )
+
+    @staticmethod
+    def test_init_loads_done_operations_and_skips_cut_off_line(journal_path):
+        journal = UploadJournal(file_path=journal_path)
+        journal.record_intent([{"key": "a", "command": {}}])
+        journal.record_done({"a": "task-1"})
+        with open(journal_path, "a") as f:
+            f.write('{"status": "do')
+
+        resumed_journal = UploadJournal(file_path=journal_path)
+
+        assert resumed_journal.done_map == {"a": "task-1"}
+        assert resumed_journal.created_id_set == {"task-1"}
+
+    @staticmethod
+    def test_get_uuid_differs_after_finished_upload(journal_path):
+        journal = UploadJournal(file_path=journal_path)
+        uuid = journal.get_uuid("key", purpose="uuid")
+        assert UploadJournal(file_path=journal_path).get_uuid(
+            "key", "uuid"
+        ) == (uuid)
+
+        journal.finish()
+
+        assert UploadJournal(file_path=journal_path).get_uuid(
+            "key", "uuid"
+        ) != (uuid)
+
+    @staticmethod
+    def test_finish_removes_file(journal_path):
+        journal = UploadJournal(file_path=journal_path)
+        journal.record_done({"a": None})
+
+        journal.finish()
+
+        assert not journal_path.exists()
+
+
+class TestTodoistBatchWithJournal:
+    @staticmethod
+    def test_resumed_upload_only_replays_unfinished(
+        todoist_helper, journal_path
+    ):
+        todoist_batch = TodoistBatch(
+            todoist_helper,
+            command_limit=2,
+            journal=UploadJournal(file_path=journal_path),
+        )
+        queue_tasks(todoist_batch)
+        with interrupt_after(todoist_helper, number_calls=1):
+            with pytest.raises(ConnectionError):
+                todoist_batch.flush()
+        assert len(get_task_list(todoist_helper)) == 2
+
+        todoist_batch = TodoistBatch(
+            todoist_helper,
+            command_limit=2,
+            journal=UploadJournal(file_path=journal_path),
+        )
+        queue_tasks(todoist_batch)
+        assert len(todoist_batch) == 2
+        todoist_batch.flush()
+
+        parent, *child_list, other = get_task_list(todoist_helper)
+        assert [task.content for task in child_list] == ["child", "child"]
+        assert [task.parent_id for task in child_list] == [parent.id] * 2
+        assert other.content == "other"
+
+    @staticmethod
+    @pytest.mark.parametrize("is_applied", [False, True])
+    def test_resumable_upload_keeps_tasks_of_interrupted_run(
+        todoist_helper, tmp_path, monkeypatch, is_applied
+    ):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        todoist_helper.add_task_to_project(
+            task="last week", project=DEFAULT_PROJECT
+        )
+
+        def upload():
+            with todoist_helper.resumable_upload(f"{DEFAULT_PROJECT}-week"):
+                with patch(
+                    "builtins.input", side_effect=[YesNoChoices.yes.value]
+                ):
+                    todoist_helper.delete_all_items_in_project(DEFAULT_PROJECT)
+                with TodoistBatch(todoist_helper, command_limit=2) as batch:
+                    queue_tasks(batch)
+
+        with interrupt_after(
+            todoist_helper, number_calls=2, is_applied=is_applied
+        ):
+            with pytest.raises(ConnectionError):
+                upload()
+        assert len(list(tmp_path.rglob("*.jsonl"))) == 1
+
+        upload()
+
+        assert [task.content for task in get_task_list(todoist_helper)] == [
+            "parent",
+            "child",
+            "child",
+            "other",
+        ]
+        assert list(tmp_path.rglob("*.jsonl")) == []
+        assert todoist_helper.upload_journal is None
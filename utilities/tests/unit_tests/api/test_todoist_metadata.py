@@ -0,0 +1,96 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+from tests.conftest import DEFAULT_PROJECT
+from todoist_api_python.models import Label
+
+from utilities.api.base_classes.todoist import TodoistKeyError
+from utilities.api.todoist_metadata import TodoistMetadataCache
+
+
+def create_label(name: str) -> Label:
+    return Label(
+        id=f"id-{name}", name=name, color="teal", order=1, is_favorite=False
+    )
+
+
+@pytest.fixture
+def fetch_labels():
+    return Mock(return_value={"prep": create_label("prep")})
+
+
+class TestTodoistMetadataCache:
+    @staticmethod
+    def test_get_labels_fetches_once(fetch_labels):
+        metadata_cache = TodoistMetadataCache()
+
+        metadata_cache.get_labels(fetch_labels)
+        labels = metadata_cache.get_labels(fetch_labels)
+
+        assert labels["prep"].id == "id-prep"
+        fetch_labels.assert_called_once()
+
+    @staticmethod
+    def test_invalidate_fetches_again(fetch_labels):
+        metadata_cache = TodoistMetadataCache()
+        metadata_cache.get_labels(fetch_labels)
+
+        metadata_cache.invalidate(labels=True)
+        metadata_cache.get_labels(fetch_labels)
+
+        assert fetch_labels.call_count == 2
+
+    @staticmethod
+    def test_get_labels_from_file(tmp_path, fetch_labels):
+        file_path = tmp_path / "todoist_metadata.json"
+        TodoistMetadataCache(file_path=file_path).get_labels(fetch_labels)
+
+        labels = TodoistMetadataCache(file_path=file_path).get_labels(
+            fetch_labels
+        )
+
+        assert labels == fetch_labels.return_value
+        fetch_labels.assert_called_once()
+
+    @staticmethod
+    def test_get_labels_from_expired_file(tmp_path, fetch_labels):
+        file_path = tmp_path / "todoist_metadata.json"
+        TodoistMetadataCache(file_path=file_path).get_labels(fetch_labels)
+        with open(file_path, "r") as f:
+            cached = json.load(f)
+        cached["saved_at"] -= 2 * 60 * 60
+        with open(file_path, "w") as f:
+            json.dump(cached, f)
+
+        TodoistMetadataCache(
+            file_path=file_path, ttl_seconds=60 * 60
+        ).get_labels(fetch_labels)
+
+        assert fetch_labels.call_count == 2
+
+
+class TestTodoistHelperWithMetadataCache:
+    @staticmethod
+    @pytest.fixture
+    def todoist_helper(debug_todoist_helper):
+        debug_todoist_helper.metadata_cache = TodoistMetadataCache()
+        yield debug_todoist_helper
+        debug_todoist_helper.metadata_cache = None
+
+    @staticmethod
+    def test_get_section_id_fetches_new_section(
+        todoist_helper, local_todoist_project_id
+    ):
+        project_id = todoist_helper.get_project_id(DEFAULT_PROJECT)
+        with pytest.raises(TodoistKeyError):
+            todoist_helper.get_section_id(project_id, "new-section")
+
+        todoist_helper.connection.add_section(
+            project_id=local_todoist_project_id, section_name="new-section"
+        )
+
+        assert todoist_helper.get_section_id(project_id, "new-section")
+        assert (
+            "new-section" in todoist_helper.metadata_cache.sections[project_id]
+        )
@@ -0,0 +1,139 @@
+from unittest.mock import Mock
+
+import pytest
+import requests
+from tests.conftest import DEFAULT_PROJECT
+
+from utilities.api.rate_limit import get_retry_after_seconds
+from utilities.api.todoist_batch import TodoistBatch
+from utilities.testing.todoist import DebugTodoistHelper, LocalTodoistConnection
+
+
+@pytest.fixture
+def connection():
+    connection = LocalTodoistConnection()
+    connection.add_project(DEFAULT_PROJECT, project_id="1")
+    connection.add_project("other", project_id="2")
+    return connection
+
+
+class TestLocalTodoistConnection:
+    @staticmethod
+    def test_state_is_per_instance(connection):
+        connection.add_task(project_id="1", content="task")
+
+        assert LocalTodoistConnection().tasks == []
+
+    @staticmethod
+    def test_get_tasks_returns_tasks_of_project_in_pages(connection):
+        for number in range(5):
+            connection.add_task(project_id="1", content=f"task {number}")
+        connection.add_task(project_id="2", content="other task")
+        connection.reset_counters()
+
+        page_list = connection.get_tasks(project_id="1", limit=2)
+
+        assert [[task.content for task in page] for page in page_list] == [
+            ["task 0", "task 1"],
+            ["task 2", "task 3"],
+            ["task 4"],
+        ]
+        assert connection.request_count["get_tasks"] == 3
+
+    @staticmethod
+    def test_filter_tasks_by_project_and_label(connection):
+        connection.add_task(project_id="1", content="a", labels=["week"])
+        connection.add_task(project_id="1", content="b", labels=["other"])
+        connection.add_task(project_id="2", content="c", labels=["week"])
+
+        (task_list,) = connection.filter_tasks(
+            query=f"#{DEFAULT_PROJECT} & @week"
+        )
+
+        assert [task.content for task in task_list] == ["a"]
+
+    @staticmethod
+    def test_update_task_keeps_order_and_indices(connection):
+        first = connection.add_task(project_id="1", content="a")
+        connection.add_task(project_id="1", content="b")
+
+        connection.update_task(task_id=first.id, labels=["week"])
+
+        (task_list,) = connection.get_tasks(project_id="1")
+        assert [task.content for task in task_list] == ["a", "b"]
+        (task_list,) = connection.filter_tasks(query="@week")
+        assert [task.id for task in task_list] == [first.id]
+
+    @staticmethod
+    def test_delete_task_removes_from_indices(connection):
+        task = connection.add_task(project_id="1", content="a", labels=["x"])
+
+        connection.delete_task(task_id=task.id)
+
+        assert connection.get_task(task_id=task.id) is None
+        assert connection.filter_tasks(query="@x") == [[]]
+
+    @staticmethod
+    def test_sync_applies_command_once_per_uuid(connection):
+        command = {
+            "type": "item_add",
+            "uuid": "uuid",
+            "temp_id": "temp",
+            "args": {"content": "a", "project_id": "1"},
+        }
+
+        first = connection.sync([command])
+        second = connection.sync([command])
+
+        assert len(connection.tasks) == 1
+        assert first["temp_id_mapping"] == second["temp_id_mapping"]
+
+    @staticmethod
+    def test_injected_rate_limit_has_retry_after(connection):
+        connection.rate_limit_rate = 1.0
+        connection.retry_after_seconds = 7
+
+        with pytest.raises(requests.HTTPError) as error_info:
+            connection.get_projects()
+
+        assert get_retry_after_seconds(error_info.value) == 7
+        assert connection.failure_count == {429: 1}
+
+    @staticmethod
+    def test_injected_error(connection):
+        connection.error_rate = 1.0
+
+        with pytest.raises(requests.HTTPError) as error_info:
+            connection.add_task(project_id="1", content="a")
+
+        assert error_info.value.response.status_code == 503
+        assert connection.tasks == []
+
+    @staticmethod
+    def test_injected_latency(connection):
+        connection.sleep = Mock()
+        connection.latency_seconds = 0.5
+
+        connection.get_labels()
+
+        connection.sleep.assert_called_once_with(0.5)
+
+
+class TestUploadThroughput:
+    @staticmethod
+    def test_bulk_upload_with_rate_limits(todoist_config):
+        connection = LocalTodoistConnection(seed=1)
+        connection.add_project(DEFAULT_PROJECT, project_id="1")
+        todoist_helper = DebugTodoistHelper(config=todoist_config)
+        todoist_helper.set_connection(connection)
+        connection.rate_limit_rate = 0.2
+        connection.reset_counters()
+
+        with TodoistBatch(todoist_helper) as todoist_batch:
+            for number in range(2000):
+                todoist_batch.add_task(task=f"task {number}", project_id="1")
+
+        assert len(connection.tasks) == 2000
+        assert connection.request_count["sync"] == (
+            20 + connection.failure_count[429]
+        )
@@ -1,16 +1,21 @@
 import re
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Optional, Union
 
 import pandas as pd
 from omegaconf import DictConfig
 from structlog import get_logger
 from todoist_api_python.api import TodoistAPI
-from todoist_api_python.models import Project, Section, Task
+from todoist_api_python.models import Label, Project, Section, Task
 
+from utilities.api.rate_limit import TokenBucket
+from utilities.api.todoist_batch import TodoistBatch
+from utilities.api.todoist_journal import UploadJournal
+from utilities.api.todoist_metadata import TodoistMetadataCache
 from utilities.validate_choice import YesNoChoices
 
 ABS_FILE_PATH = Path(__file__).absolute().parent
@@ -54,11 +59,47 @@ class AbstractTodoistHelper(ABC):
     config: DictConfig
     connection: TodoistAPI = field(init=False)
     projects: Dict[str, Project] = field(init=False)
+    # shared limiter of all requests; unset for local connections
+    token_bucket: Optional[TokenBucket] = field(init=False, default=None)
+    # projects, sections & labels; unset for local connections
+    metadata_cache: Optional[TodoistMetadataCache] = field(
+        init=False, default=None
+    )
+    # set during a resumable upload & used by its batches
+    upload_journal: Optional[UploadJournal] = field(init=False, default=None)
 
     @abstractmethod
     def __post_init__(self):
         raise NotImplementedError
 
+    def _acquire_request(self):
+        if self.token_bucket is not None:
+            self.token_bucket.acquire()
+
+    @contextmanager
+    def resumable_upload(self, name: str) -> Iterator[Optional[UploadJournal]]:
+        """
+        Journals the batches of an upload, so that re-running an interrupted
+        upload only sends its unfinished operations.
+        :param name: identifies the upload, e.g. project & week
+        """
+        config_journal = self.config.get("upload_journal")
+        if config_journal is None or config_journal.dir_path is None:
+            yield None
+            return
+
+        file_name = re.sub(r"[^\w-]+", "_", name).strip("_")
+        self.upload_journal = UploadJournal(
+            file_path=Path.home()
+            / config_journal.dir_path
+            / f"{file_name}.jsonl"
+        )
+        try:
+            yield self.upload_journal
+            self.upload_journal.finish()
+        finally:
+            self.upload_journal = None
+
     @staticmethod
     def _clean_label(label: str) -> str:
         cleaned = re.sub(r"\s&\s", " and ", label).strip()
@@ -86,11 +127,9 @@ class AbstractTodoistHelper(ABC):
         parent_id: str = None,
         priority: int = 1,
     ) -> Task:
-        due_date_str = due_string
-        if isinstance(due_date, datetime):
-            due_date_str = get_due_datetime_str(due_date)
-        elif isinstance(due_date, date):
-            due_date_str = self._get_due_date_str(due_date)
+        due_date_str = self.get_due_string(
+            due_string=due_string, due_date=due_date
+        )
 
         FILE_LOGGER.info(
             "[todoist add]",
@@ -110,29 +149,96 @@ class AbstractTodoistHelper(ABC):
             if section_id is None and section is not None:
                 section_id = self.get_section_id(project_id, section)
 
-        if label_list is None:
-            label_list = ["app"]
-        else:
-            label_list = [self._clean_label(label) for label in label_list]
-            label_list += ["app"]
-
         new_task = self._add_task(
             content=task,
             due_string=due_date_str,
             description=description,
             project_id=project_id,
             section_id=section_id,
-            labels=label_list,
+            labels=self.get_label_list(label_list),
             priority=priority,
             parent_id=parent_id,
         )
 
         return self._get_task(task_id=new_task.id)
 
+    def get_due_string(
+        self, due_string: str = None, due_date: Union[date, datetime] = None
+    ) -> str:
+        if isinstance(due_date, datetime):
+            return get_due_datetime_str(due_date)
+        elif isinstance(due_date, date):
+            return self._get_due_date_str(due_date)
+        return due_string
+
+    def post_sync_commands(self, command_list: List[dict]) -> dict:
+        # several writes in one request; see utilities.api.todoist_batch
+        return self._post_sync_commands(command_list=command_list)
+
+    def update_task(
+        self,
+        task_id: str,
+        task: str = None,
+        label_list: list[str] = None,
+        description: str = None,
+        priority: int = None,
+    ):
+        FILE_LOGGER.info(
+            "[todoist update]",
+            task_id=task_id,
+            task=task,
+            labels=label_list,
+            description=description,
+            priority=priority,
+        )
+
+        kwargs = {
+            "content": task,
+            "description": description,
+            "priority": priority,
+        }
+        if label_list is not None:
+            kwargs["labels"] = self.get_label_list(label_list)
+        self._update_task(
+            task_id=task_id,
+            **{
+                key: value for key, value in kwargs.items() if value is not None
+            },
+        )
+
+    def delete_task(self, task_id: str):
+        FILE_LOGGER.info("[todoist delete]", task_id=task_id)
+        self._delete_task(task_id=task_id)
+
+    def get_label_list(self, label_list: list[str] = None) -> list[str]:
+        # labels as stored by todoist for tasks added by this app
+        if label_list is None:
+            return ["app"]
+        return [self._clean_label(label) for label in label_list] + ["app"]
+
+    def get_tasks_in_project(
+        self, project: str, only_with_label: str = None
+    ) -> List[Task]:
+        project_id = self.get_project_id(project)
+        return [
+            task
+            for task in self._get_tasks(project_id)
+            if not task.is_completed
+            and (only_with_label is None or only_with_label in task.labels)
+        ]
+
     @abstractmethod
     def _add_task(self, **kwargs):
         raise NotImplementedError
 
+    @abstractmethod
+    def _update_task(self, task_id: str, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _post_sync_commands(self, command_list: List[dict]) -> dict:
+        raise NotImplementedError
+
     @abstractmethod
     def _get_task(self, task_id: str) -> Task:
         raise NotImplementedError
@@ -152,12 +258,36 @@ class AbstractTodoistHelper(ABC):
         only_delete_after_date: date = None,
         only_with_label: str = None,
     ) -> int:
-        # TODO look into using the API query to reduce subsequent loops
-        # manually filtering tasks to decide what gets deleted or not
+        # narrowed by the API, then checked as the filter may be approximate
+        query = self._get_filter_query(
+            project=project,
+            skip_recurring=skip_recurring,
+            only_delete_after_date=only_delete_after_date,
+            only_with_label=only_with_label,
+        )
+        # a resumed upload does not delete again, as tasks added by its
+        # interrupted run may not have been journaled as done
+        journal_key = None
+        if self.upload_journal is not None:
+            journal_key = self.upload_journal.get_key(
+                "delete_all_items_in_project", {"query": query}
+            )
+            if self.upload_journal.is_done(journal_key):
+                FILE_LOGGER.info(
+                    "[todoist delete]",
+                    action="Skip, as done by interrupted upload",
+                    project=project,
+                )
+                return 0
+
         tasks_to_be_deleted = []
         project_id = self.get_project_id(project)
-        for task in self._get_tasks(project_id):
-            if task.is_completed:
+        # added by the interrupted run of a resumed upload
+        journaled_id_set = set()
+        if self.upload_journal is not None:
+            journaled_id_set = self.upload_journal.created_id_set
+        for task in self._filter_tasks(query=query):
+            if task.is_completed or task.project_id != project_id:
                 continue
             if only_delete_after_date and task.due is None:
                 continue
@@ -172,6 +302,8 @@ class AbstractTodoistHelper(ABC):
                         continue
             if only_with_label and only_with_label not in task.labels:
                 continue
+            if task.id in journaled_id_set:
+                continue
             tasks_to_be_deleted.append(task)
 
         # checking if deletion desired & performing it
@@ -191,15 +323,50 @@ class AbstractTodoistHelper(ABC):
                     number_tasks_to_be_deleted=number_tasks_to_be_deleted
                 )
 
-            for task in tasks_to_be_deleted:
-                self._delete_task(task_id=task.id)
+            with TodoistBatch(todoist_helper=self) as todoist_batch:
+                for task in tasks_to_be_deleted:
+                    todoist_batch.delete_task(task_id=task.id)
             FILE_LOGGER.info("[todoist delete]", action="Deleted tasks!")
 
+        if journal_key is not None:
+            self.upload_journal.record_done({journal_key: None})
         return number_tasks_to_be_deleted
 
+    @staticmethod
+    def _escape_filter_value(value: str) -> str:
+        # characters with a meaning in todoist filter queries
+        return re.sub(r"([\\&|!(),#@])", r"\\\1", value)
+
+    def _get_filter_query(
+        self,
+        project: str,
+        skip_recurring: bool = True,
+        only_delete_after_date: date = None,
+        only_with_label: str = None,
+    ) -> str:
+        query_list = [f"#{self._escape_filter_value(project)}"]
+        if only_with_label:
+            query_list.append(f"@{self._escape_filter_value(only_with_label)}")
+        if only_delete_after_date:
+            query_list.append(
+                f"due after: {only_delete_after_date.strftime('%Y-%m-%d')}"
+            )
+        if skip_recurring:
+            query_list.append("!recurring")
+        return " & ".join(query_list)
+
+    @abstractmethod
+    def _filter_tasks(self, query: str) -> List[Task]:
+        raise NotImplementedError
+
     def get_project_id(self, project_name: str) -> str:
         project_name = project_name.casefold()
         project = self.projects.get(project_name)
+        if project is None and self.metadata_cache is not None:
+            # may have been created or renamed since cached
+            self.metadata_cache.invalidate(projects=True)
+            self.projects = self.metadata_cache.get_projects(self._get_projects)
+            project = self.projects.get(project_name)
         if project is None:
             raise TodoistKeyError(tag="project_id", value=project_name)
         return project.id
@@ -209,10 +376,28 @@ class AbstractTodoistHelper(ABC):
         raise NotImplementedError
 
     def get_section_id(self, project_id: str, section_name: str) -> str:
-        # TODO could we save time by loading all sections
-        #  & putting in list with key for project_id?
-        sections = self._get_sections(project_id=project_id)
         section_name = section_name.casefold()
+        sections = self._get_cached_sections(project_id=project_id)
+        if (
+            section_name not in sections.keys()
+            and self.metadata_cache is not None
+        ):
+            self.metadata_cache.invalidate(section_project_id=project_id)
+            sections = self._get_cached_sections(project_id=project_id)
         if section_name in sections.keys():
             return sections[section_name].id
         raise TodoistKeyError(tag="section_id", value=section_name)
+
+    def _get_cached_sections(self, project_id: str) -> Dict[str, Section]:
+        if self.metadata_cache is None:
+            return self._get_sections(project_id=project_id)
+        return self.metadata_cache.get_sections(project_id, self._get_sections)
+
+    @abstractmethod
+    def _get_labels(self) -> Dict[str, Label]:
+        raise NotImplementedError
+
+    def get_labels(self) -> Dict[str, Label]:
+        if self.metadata_cache is None:
+            return self._get_labels()
+        return self.metadata_cache.get_labels(self._get_labels)
@@ -1,31 +1,143 @@
-import hashlib
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 import pandas as pd
 import pygsheets
-from joblib import Memory
+from googleapiclient.errors import HttpError
 from omegaconf import DictConfig
-from pygsheets import Spreadsheet
+from pygsheets.utils import format_addr, numericise_all
 from structlog import get_logger
 
+from utilities.api.gsheets_cache import (
+    GsheetsOfflineError,
+    WorkbookFile,
+    WorkbookIdMap,
+    WorksheetCache,
+    get_workbook_id_map,
+)
+
 ABS_FILE_PATH = Path(__file__).absolute().parent
 
 FILE_LOGGER = get_logger(__name__)
 
-# initialize disk cache
-CACHE_DIR = ABS_FILE_PATH / "diskcache"
+Response = TypeVar("Response")
+
+# shared by all helpers of a process, so each token file is authorized once
+_CLIENT_REGISTRY: Dict[str, pygsheets.client.Client] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_shared_client(token_file: Path) -> pygsheets.client.Client:
+    key = str(token_file.resolve())
+    with _REGISTRY_LOCK:
+        if key not in _CLIENT_REGISTRY:
+            FILE_LOGGER.info("[gsheets client]", action="authorize")
+            _CLIENT_REGISTRY[key] = pygsheets.authorize(
+                service_account_file=token_file, retries=3
+            )
+        return _CLIENT_REGISTRY[key]
+
+
+def get_dataframe(values: List[list], numerize: bool) -> pd.DataFrame:
+    # as worksheet.get_as_df, with the first row as header
+    if values in ([], [[""]]):
+        values = [[]]
+    max_row = max(len(row) for row in values)
+    values = [row + [""] * (max_row - len(row)) for row in values]
+    if numerize:
+        values = [numericise_all(row, "") for row in values]
+    return pd.DataFrame(values[1:], columns=values[0])
+
+
+def get_values(df: pd.DataFrame, with_header: bool = True) -> List[list]:
+    # as worksheet.set_dataframe, so that all write modes look alike
+    df = df.copy()
+    for column in df.select_dtypes("Int64"):
+        df[column] = df[column].astype("unicode").replace("<NA>", "NaN")
+    values = df.fillna("NaN").astype("unicode").values.tolist()
+    if with_header:
+        values.insert(0, df.columns.tolist())
+    return values
+
+
+def is_same_cell(old_value: str, new_value: str) -> bool:
+    # sheets may show numbers differently than they were written, e.g. 1.0
+    if old_value == new_value:
+        return True
+    old_number, new_number = numericise_all([old_value, new_value], "")
+    return not isinstance(old_number, str) and old_number == new_number
+
+
+def get_changed_ranges(
+    old_values: List[list], new_values: List[list]
+) -> List[Tuple[int, int, list]]:
+    """
+    Finds the cells of existing rows that differ, e.g. to only write those.
+    :return: runs of changed cells as (row index, column index, new values)
+    """
+    width = max((len(row) for row in old_values + new_values), default=0)
+    changed_range_list = []
+    for row_index, old_row in enumerate(old_values):
+        new_row = []
+        if row_index < len(new_values):
+            new_row = list(new_values[row_index])
+        # removed rows & cells are cleared
+        old_row = old_row + [""] * (width - len(old_row))
+        new_row = new_row + [""] * (width - len(new_row))
+
+        start = None
+        for column_index in range(width + 1):
+            is_changed = column_index < width and not is_same_cell(
+                old_row[column_index], new_row[column_index]
+            )
+            if is_changed and start is None:
+                start = column_index
+            elif not is_changed and start is not None:
+                changed_range_list.append(
+                    (row_index, start, new_row[start:column_index])
+                )
+                start = None
+    return changed_range_list
+
+
+def get_sheet_range(worksheet_name: str, start: Tuple[int, int] = None):
+    # whole sheet or from start (0-indexed row & column), in A1 notation
+    sheet_range = "'{}'".format(worksheet_name.replace("'", "''"))
+    if start is None:
+        return sheet_range
+    return f"{sheet_range}!{format_addr((start[0] + 1, start[1] + 1), 'label')}"
 
 
 class MimeType(Enum):
     folder = "application/vnd.google-apps.folder"
+    spreadsheet = "application/vnd.google-apps.spreadsheet"
+
+
+@dataclass
+class WorksheetHeaderError(Exception):
+    worksheet_name: str
+    header: list
+    columns: list
+    message: str = "[worksheet header error]"
+
+    def __post_init__(self):
+        super().__init__(self.message)
+
+    def __str__(self):
+        return (
+            f"{self.message}: worksheet={self.worksheet_name} has "
+            f"header={self.header}, but columns={self.columns} were given"
+        )
 
 
 @dataclass
 class WorkBook:
-    data: Spreadsheet
+    # opened only if a worksheet is not cached
+    name: str
+    gsheets_helper: "GsheetsHelper"
 
     def get_worksheet(
         self, worksheet_name: str, numerize: bool = False
@@ -35,28 +147,165 @@ class WorkBook:
             worksheet_name=worksheet_name,
         )
         # TODO catch & raise specific exception here when resource not found
-        return get_worksheet(
-            self.data, worksheet_name=worksheet_name, numerize=numerize
+        return self.gsheets_helper.get_worksheet(
+            workbook_name=self.name,
+            worksheet_name=worksheet_name,
+            numerize=numerize,
+        )
+
+    def get_worksheets(
+        self,
+        worksheet_name_list: List[str],
+        numerize: Union[bool, Dict[str, bool]] = False,
+    ) -> Dict[str, pd.DataFrame]:
+        FILE_LOGGER.info(
+            "[get_worksheets]",
+            worksheet_name_list=worksheet_name_list,
+        )
+        return self.gsheets_helper.get_worksheets(
+            workbook_name=self.name,
+            worksheet_name_list=worksheet_name_list,
+            numerize=numerize,
         )
 
 
 @dataclass
 class GsheetsHelper:
     config: DictConfig
+    worksheet_cache: Optional[WorksheetCache] = field(init=False, default=None)
+    # looked up by name, if not known from the cache
+    workbook_id_map: WorkbookIdMap = field(init=False, default=None)
 
     def __post_init__(self):
-        token_file = Path(ABS_FILE_PATH, self.config.token_file_path)
-        self.connection = pygsheets.authorize(
-            service_account_file=token_file, retries=3
+        self.worksheet_cache = self._get_worksheet_cache()
+        self.workbook_id_map = self._get_workbook_id_map()
+        # offline, worksheets are only read from the cache
+        self.connection = None
+        if self.worksheet_cache is None or not self.worksheet_cache.offline:
+            self.connection = get_shared_client(
+                Path(ABS_FILE_PATH, self.config.token_file_path)
+            )
+
+    def _get_worksheet_cache(self) -> Optional[WorksheetCache]:
+        config_cache = self.config.get("worksheet_cache")
+        if config_cache is None or config_cache.dir_path is None:
+            return None
+        return WorksheetCache(
+            dir_path=Path.home() / config_cache.dir_path,
+            ttl_seconds=config_cache.ttl_minutes * 60,
+            offline=config_cache.offline,
         )
 
+    def _get_workbook_id_map(self) -> WorkbookIdMap:
+        file_path = self.config.get("workbook_id_file_path")
+        if file_path is None:
+            return get_workbook_id_map(key="")
+        file_path = Path.home() / file_path
+        return get_workbook_id_map(key=str(file_path), file_path=file_path)
+
     def get_workbook(self, workbook_name: str) -> WorkBook:
         FILE_LOGGER.info(
             "[get_workbook]",
             workbook_name=workbook_name,
         )
-        workbook = self.connection.open(workbook_name)
-        return WorkBook(data=workbook)
+        return WorkBook(name=workbook_name, gsheets_helper=self)
+
+    def get_worksheet(
+        self, workbook_name: str, worksheet_name: str, numerize: bool = False
+    ) -> pd.DataFrame:
+        return self.get_worksheets(
+            workbook_name, [worksheet_name], numerize=numerize
+        )[worksheet_name]
+
+    def get_worksheets(
+        self,
+        workbook_name: str,
+        worksheet_name_list: List[str],
+        numerize: Union[bool, Dict[str, bool]] = False,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Reads worksheets of a workbook, with uncached ones in one request.
+        :param numerize: for all worksheets, or per worksheet name
+        """
+        values_map = self._get_values_map(workbook_name, worksheet_name_list)
+        return {
+            worksheet_name: get_dataframe(
+                values_map[worksheet_name],
+                numerize=(
+                    numerize.get(worksheet_name, False)
+                    if isinstance(numerize, dict)
+                    else numerize
+                ),
+            )
+            for worksheet_name in worksheet_name_list
+        }
+
+    def append_rows(
+        self,
+        df: pd.DataFrame,
+        workbook_name: str,
+        worksheet_name: str,
+        folder: Optional[str] = None,
+    ):
+        """
+        Writes only the rows of df after the last row of the worksheet.
+        Its columns must match the worksheet's header.
+        """
+        file_name = self._get_file_name(workbook_name, folder)
+        old_values = self._try_get_values(file_name, worksheet_name)
+        if not old_values:
+            self.write_worksheet(df, workbook_name, worksheet_name, folder)
+            return
+
+        header = old_values[0]
+        if header != df.columns.tolist():
+            raise WorksheetHeaderError(
+                worksheet_name=worksheet_name,
+                header=header,
+                columns=df.columns.tolist(),
+            )
+        self._append_values(
+            file_name, worksheet_name, get_values(df, with_header=False)
+        )
+        self._invalidate_worksheet_cache(file_name)
+
+    def write_diff(
+        self,
+        df: pd.DataFrame,
+        workbook_name: str,
+        worksheet_name: str,
+        folder: Optional[str] = None,
+    ):
+        """
+        Writes df over the worksheet, but only sends the cells changed
+        compared to its (cached) values: in one batch update & by appending
+        new rows. Without a comparable worksheet, it is fully written.
+        """
+        file_name = self._get_file_name(workbook_name, folder)
+        old_values = self._try_get_values(file_name, worksheet_name)
+        new_values = get_values(df)
+        old_width = max((len(row) for row in old_values or []), default=0)
+        # new columns may not fit in the worksheet's grid
+        if not old_values or len(new_values[0]) > old_width:
+            self.write_worksheet(df, workbook_name, worksheet_name, folder)
+            return
+
+        changed_range_list = get_changed_ranges(old_values, new_values)
+        number_old_rows = len(old_values)
+        append_values = new_values[number_old_rows:]
+        FILE_LOGGER.info(
+            "[write_diff]",
+            workbook_name=file_name,
+            worksheet_name=worksheet_name,
+            number_changed_ranges=len(changed_range_list),
+            number_appended_rows=len(append_values),
+        )
+        if changed_range_list:
+            self._update_ranges(file_name, worksheet_name, changed_range_list)
+        if append_values:
+            self._append_values(file_name, worksheet_name, append_values)
+        if changed_range_list or append_values:
+            self._invalidate_worksheet_cache(file_name)
 
     def write_worksheet(
         self,
@@ -81,6 +330,85 @@ class GsheetsHelper:
             fit=True,
             copy_index=False,
         )
+        self._invalidate_worksheet_cache(workbook.title)
+
+    def _invalidate_worksheet_cache(self, workbook_name: str):
+        if self.worksheet_cache is not None:
+            self.worksheet_cache.invalidate(workbook_name)
+
+    @staticmethod
+    def _get_file_name(workbook_name: str, folder: Optional[str]) -> str:
+        if folder:
+            return f"{folder}_" + workbook_name
+        return workbook_name
+
+    def _try_get_values(
+        self, workbook_name: str, worksheet_name: str
+    ) -> Optional[List[list]]:
+        try:
+            return self._get_values_map(workbook_name, [worksheet_name])[
+                worksheet_name
+            ]
+        except pygsheets.SpreadsheetNotFound:
+            return None
+        except HttpError as error:
+            # range of a missing worksheet cannot be parsed
+            if error.resp.status == 400:
+                return None
+            raise
+
+    def _append_values(
+        self, workbook_name: str, worksheet_name: str, values: List[list]
+    ):
+        # inserted rows extend the grid, as needed
+        self.connection.sheet.values_append(
+            self._get_workbook_id(workbook_name),
+            values,
+            "ROWS",
+            get_sheet_range(worksheet_name, start=(0, 0)),
+            insertDataOption="INSERT_ROWS",
+        )
+
+    def _update_ranges(
+        self,
+        workbook_name: str,
+        worksheet_name: str,
+        changed_range_list: List[Tuple[int, int, list]],
+    ):
+        # one request for all ranges
+        request = (
+            self.connection.sheet.service.spreadsheets()
+            .values()
+            .batchUpdate(
+                spreadsheetId=self._get_workbook_id(workbook_name),
+                body={
+                    "valueInputOption": "USER_ENTERED",
+                    "data": [
+                        {
+                            "range": get_sheet_range(
+                                worksheet_name, start=(row_index, column_index)
+                            ),
+                            "values": [values],
+                        }
+                        for row_index, column_index, values in (
+                            changed_range_list
+                        )
+                    ],
+                },
+            )
+        )
+        request.execute(num_retries=3)
+
+    def _check_workbooks(self, workbook_name: str):
+        worksheet_cache = self.worksheet_cache
+        if worksheet_cache.is_fresh(workbook_name):
+            return
+        workbook_name_list = sorted(
+            {workbook_name, *worksheet_cache.get_stale_workbook_names()}
+        )
+        worksheet_cache.update_workbooks(
+            workbook_name_list, self._list_workbook_files(workbook_name_list)
+        )
 
     def _delete_item(self, item_id: str):
         self.connection.drive.delete(item_id)
@@ -105,14 +433,11 @@ class GsheetsHelper:
     def _get_workbook(
         self, workbook_name: str, folder_name: Optional[str] = None
     ):
-        file_name = workbook_name
-        kwargs = {}
-        if folder_name:
-            file_name = f"{folder_name}_" + file_name
-            kwargs["folder"] = self._get_folder_id(folder_name)
-
+        file_name = self._get_file_name(workbook_name, folder_name)
         try:
-            workbook = self.connection.open(file_name)
+            return self._request_workbook(
+                file_name, self.connection.open_by_key
+            )
         except pygsheets.SpreadsheetNotFound:
             FILE_LOGGER.warning(
                 "[get_workbook]",
@@ -120,37 +445,130 @@ class GsheetsHelper:
                 workbook_name=workbook_name,
                 action="Attempt to create one",
             )
-            workbook = self.connection.create(file_name, **kwargs)
-        return workbook
 
-    def _perform_query(self, mimetype_name: str, file_name: str) -> list[dict]:
-        query = f"name='{file_name}'"
-        query += f" and mimeType='{MimeType[mimetype_name].value}'"
-        return self.connection.drive.list(q=query)
+        kwargs = {}
+        if folder_name:
+            kwargs["folder"] = self._get_folder_id(folder_name)
+        workbook = self.connection.create(file_name, **kwargs)
+        self.workbook_id_map.set(file_name, workbook.id)
+        return workbook
 
+    def _list_workbook_files(
+        self, workbook_name_list: List[str]
+    ) -> List[WorkbookFile]:
+        # one request checks all workbooks for changes
+        name_query = " or ".join(
+            f"name='{self._escape_query_value(workbook_name)}'"
+            for workbook_name in workbook_name_list
+        )
+        query = (
+            f"mimeType='{MimeType.spreadsheet.value}' and trashed=false"
+            f" and ({name_query})"
+        )
+        file_list = self.connection.drive.list(
+            q=query, fields="files(id, name, modifiedTime), nextPageToken"
+        )
+        return [
+            WorkbookFile(
+                id=file["id"],
+                name=file["name"],
+                modified_time=file["modifiedTime"],
+            )
+            for file in file_list
+        ]
 
-def get_worksheet(
-    workbook: Spreadsheet, worksheet_name: str, numerize: bool
-) -> pd.DataFrame:
-    encoded_source_path = str(workbook.title + worksheet_name).encode()
-    hash_obj = hashlib.sha256(encoded_source_path)
-    hex_dig = hash_obj.hexdigest()
+    def _get_values_map(
+        self, workbook_name: str, worksheet_name_list: List[str]
+    ) -> Dict[str, List[list]]:
+        worksheet_cache = self.worksheet_cache
+        values_map = {}
+        if worksheet_cache is not None:
+            self._check_workbooks(workbook_name)
+            for worksheet_name in worksheet_name_list:
+                values = worksheet_cache.load(workbook_name, worksheet_name)
+                if values is not None:
+                    values_map[worksheet_name] = values
 
-    cache = Memory(CACHE_DIR / hex_dig, mmap_mode="r")
+        missing_name_list = [
+            worksheet_name
+            for worksheet_name in dict.fromkeys(worksheet_name_list)
+            if worksheet_name not in values_map
+        ]
+        if not missing_name_list:
+            return values_map
+        if worksheet_cache is not None and worksheet_cache.offline:
+            raise GsheetsOfflineError(
+                workbook_name=workbook_name,
+                worksheet_name=missing_name_list[0],
+            )
 
-    def is_cache_valid(metadata) -> bool:
-        time_cache = metadata["time"]
+        read_values_map = self._read_values(workbook_name, missing_name_list)
+        if worksheet_cache is not None:
+            for worksheet_name, values in read_values_map.items():
+                worksheet_cache.save(workbook_name, worksheet_name, values)
+        return values_map | read_values_map
 
-        time_workbook = pd.to_datetime(workbook.updated).timestamp()
+    def _get_workbook_id(self, workbook_name: str) -> str:
+        if self.worksheet_cache is not None:
+            # known from the check, so the name is not looked up in drive
+            if file_id := self.worksheet_cache.get_file_id(workbook_name):
+                return file_id
+        if workbook_id := self.workbook_id_map.get(workbook_name):
+            return workbook_id
+        workbook = self.connection.open(workbook_name)
+        self.workbook_id_map.set(workbook_name, workbook.id)
+        return workbook.id
 
-        if time_workbook > time_cache:
-            return False
+    def _request_workbook(
+        self, workbook_name: str, request: Callable[[str], Response]
+    ) -> Response:
+        workbook_id = self._get_workbook_id(workbook_name)
+        try:
+            return request(workbook_id)
+        except HttpError as error:
+            if error.resp.status != 404:
+                raise
+            # a stored id is stale, once its workbook was deleted
+            is_stale = self.workbook_id_map.discard(workbook_name, workbook_id)
+            if self.worksheet_cache is not None:
+                is_stale |= self.worksheet_cache.discard(
+                    workbook_name, workbook_id
+                )
+            if not is_stale:
+                raise
+        return request(self._get_workbook_id(workbook_name))
 
-        return True
+    def _read_values(
+        self, workbook_name: str, worksheet_name_list: List[str]
+    ) -> Dict[str, List[list]]:
+        FILE_LOGGER.info(
+            "[read_values]",
+            workbook_name=workbook_name,
+            worksheet_name_list=worksheet_name_list,
+        )
+        # one request for all worksheets, each being a whole-sheet range
+        range_list = [
+            get_sheet_range(worksheet_name)
+            for worksheet_name in worksheet_name_list
+        ]
+        value_range_list = self._request_workbook(
+            workbook_name,
+            lambda workbook_id: self.connection.sheet.values_batch_get(
+                workbook_id, range_list
+            ),
+        )
+        return {
+            worksheet_name: value_range.get("values", [])
+            for worksheet_name, value_range in zip(
+                worksheet_name_list, value_range_list
+            )
+        }
 
-    @cache.cache(cache_validation_callback=is_cache_valid)
-    def _get_worksheet() -> pd.DataFrame:
-        worksheet = workbook.worksheet_by_title(worksheet_name)
-        return worksheet.get_as_df(numerize=numerize)
+    @staticmethod
+    def _escape_query_value(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("'", "\\'")
 
-    return _get_worksheet()
+    def _perform_query(self, mimetype_name: str, file_name: str) -> list[dict]:
+        query = f"name='{file_name}'"
+        query += f" and mimeType='{MimeType[mimetype_name].value}'"
+        return self.connection.drive.list(q=query)
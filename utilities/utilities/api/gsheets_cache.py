@@ -0,0 +1,232 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import joblib
+from structlog import get_logger
+
+FILE_LOGGER = get_logger(__name__)
+
+# shared by all helpers of a process, so workbook names are looked up once
+_WORKBOOK_ID_MAP_REGISTRY: Dict[str, "WorkbookIdMap"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+@dataclass
+class GsheetsOfflineError(Exception):
+    workbook_name: str
+    worksheet_name: str
+    message: str = "[gsheets offline error]"
+
+    def __post_init__(self):
+        super().__init__(self.message)
+
+    def __str__(self):
+        return (
+            f"{self.message}: no cached worksheet={self.worksheet_name} "
+            f"for workbook={self.workbook_name}"
+        )
+
+
+@dataclass
+class WorkbookFile:
+    id: str
+    name: str
+    modified_time: str
+
+
+@dataclass
+class WorksheetCache:
+    """
+    Worksheet values kept on disk per workbook version (its modifiedTime).
+    Workbooks are checked for changes at most once per run & not at all
+    within the ttl or when offline.
+    """
+
+    dir_path: Path
+    ttl_seconds: float = 0
+    offline: bool = False
+    # workbook name -> file id, modified time & time of last check
+    workbook_map: Dict[str, dict] = field(default_factory=dict)
+    _checked_set: Set[str] = field(default_factory=set, repr=False)
+
+    def __post_init__(self):
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                self.workbook_map = json.load(f)
+
+    @property
+    def index_path(self) -> Path:
+        return self.dir_path / "index.json"
+
+    def is_fresh(self, workbook_name: str) -> bool:
+        if self.offline or workbook_name in self._checked_set:
+            return True
+        if (entry := self.workbook_map.get(workbook_name)) is None:
+            return False
+        return time.time() - entry["checked_at"] < self.ttl_seconds
+
+    def get_stale_workbook_names(self) -> List[str]:
+        # workbooks of earlier runs are likely needed again in this one
+        return [name for name in self.workbook_map if not self.is_fresh(name)]
+
+    def get_file_id(self, workbook_name: str) -> Optional[str]:
+        if (entry := self.workbook_map.get(workbook_name)) is not None:
+            return entry["id"]
+        return None
+
+    def update_workbooks(
+        self, workbook_name_list: List[str], file_list: List[WorkbookFile]
+    ):
+        checked_at = time.time()
+        # like opening by name, the first of equally named files is used
+        file_map = {}
+        for file in file_list:
+            file_map.setdefault(file.name, file)
+        for workbook_name in workbook_name_list:
+            self._checked_set.add(workbook_name)
+            if (file := file_map.get(workbook_name)) is None:
+                self.workbook_map.pop(workbook_name, None)
+                continue
+
+            entry = self.workbook_map.get(workbook_name, {})
+            if entry.get("modified_time") != file.modified_time:
+                FILE_LOGGER.info(
+                    "[worksheet cache]",
+                    action="workbook changed",
+                    workbook_name=workbook_name,
+                )
+                entry = {"worksheet_map": {}}
+            self.workbook_map[workbook_name] = entry | {
+                "id": file.id,
+                "modified_time": file.modified_time,
+                "checked_at": checked_at,
+            }
+        self._save_index()
+
+    def invalidate(self, workbook_name: str):
+        # e.g. after writing, which changes the workbook
+        self._checked_set.discard(workbook_name)
+        if (entry := self.workbook_map.get(workbook_name)) is not None:
+            entry["checked_at"] = 0
+            self._save_index()
+
+    def discard(self, workbook_name: str, file_id: str) -> bool:
+        # e.g. the workbook was deleted within the ttl
+        entry = self.workbook_map.get(workbook_name)
+        if entry is None or entry["id"] != file_id:
+            return False
+        FILE_LOGGER.info(
+            "[worksheet cache]",
+            action="discard stale workbook",
+            workbook_name=workbook_name,
+        )
+        del self.workbook_map[workbook_name]
+        self._checked_set.discard(workbook_name)
+        self._save_index()
+        return True
+
+    def load(
+        self, workbook_name: str, worksheet_name: str
+    ) -> Optional[List[list]]:
+        if (entry := self.workbook_map.get(workbook_name)) is None:
+            return None
+        key = self._get_key(workbook_name, worksheet_name)
+        if key not in entry["worksheet_map"]:
+            return None
+        return joblib.load(self.dir_path / f"{key}.pkl")
+
+    def save(
+        self,
+        workbook_name: str,
+        worksheet_name: str,
+        values: List[list],
+    ):
+        # only versions known from a check are cached
+        if (entry := self.workbook_map.get(workbook_name)) is None:
+            return
+        key = self._get_key(workbook_name, worksheet_name)
+        self.dir_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.dir_path / f"{key}.tmp"
+        joblib.dump(values, tmp_path)
+        tmp_path.replace(self.dir_path / f"{key}.pkl")
+        entry["worksheet_map"][key] = worksheet_name
+        self._save_index()
+
+    @staticmethod
+    def _get_key(workbook_name: str, worksheet_name: str) -> str:
+        return hashlib.sha256(
+            f"{workbook_name}|{worksheet_name}".encode()
+        ).hexdigest()
+
+    def _save_index(self):
+        self.dir_path.mkdir(parents=True, exist_ok=True)
+        # replace whole file, so parallel runs never read a partial index
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.workbook_map, f)
+        tmp_path.replace(self.index_path)
+
+
+@dataclass
+class WorkbookIdMap:
+    """
+    Workbook name -> spreadsheet id, so a workbook is opened by its id
+    instead of searching drive for its name. Persisted to disk if given.
+    """
+
+    file_path: Optional[Path] = None
+    id_map: Dict[str, str] = field(default_factory=dict)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def __post_init__(self):
+        if self.file_path is not None and self.file_path.exists():
+            with open(self.file_path, "r") as f:
+                self.id_map = json.load(f)
+
+    def get(self, workbook_name: str) -> Optional[str]:
+        with self._lock:
+            return self.id_map.get(workbook_name)
+
+    def set(self, workbook_name: str, workbook_id: str):
+        with self._lock:
+            if self.id_map.get(workbook_name) == workbook_id:
+                return
+            self.id_map[workbook_name] = workbook_id
+            self._save()
+
+    def discard(self, workbook_name: str, workbook_id: str) -> bool:
+        # e.g. the workbook was deleted, so its name is looked up again
+        with self._lock:
+            if self.id_map.get(workbook_name) != workbook_id:
+                return False
+            FILE_LOGGER.info(
+                "[workbook id map]",
+                action="discard stale id",
+                workbook_name=workbook_name,
+            )
+            del self.id_map[workbook_name]
+            self._save()
+            return True
+
+    def _save(self):
+        if self.file_path is None:
+            return
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.id_map, f)
+        tmp_path.replace(self.file_path)
+
+
+def get_workbook_id_map(
+    key: str, file_path: Optional[Path] = None
+) -> WorkbookIdMap:
+    with _REGISTRY_LOCK:
+        if key not in _WORKBOOK_ID_MAP_REGISTRY:
+            _WORKBOOK_ID_MAP_REGISTRY[key] = WorkbookIdMap(file_path=file_path)
+        return _WORKBOOK_ID_MAP_REGISTRY[key]
@@ -0,0 +1,99 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+import tenacity
+from structlog import get_logger
+
+FILE_LOGGER = get_logger(__name__)
+
+# shared by all helpers of a process, as limits are per user and not client
+_TOKEN_BUCKET_REGISTRY: Dict[str, "TokenBucket"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+@dataclass
+class TokenBucket:
+    capacity: float
+    refill_per_second: float
+    clock: Callable[[], float] = time.monotonic
+    sleep: Callable[[float], None] = time.sleep
+    tokens: float = field(init=False)
+    last_refill: float = field(init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+        self.last_refill = self.clock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Blocks until the tokens are available & takes them.
+        :param tokens: number of tokens (e.g. requests) to take
+        :return: seconds waited
+        """
+        waited_seconds = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited_seconds
+                wait_seconds = (tokens - self.tokens) / self.refill_per_second
+            self.sleep(wait_seconds)
+            waited_seconds += wait_seconds
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.last_refill) * self.refill_per_second,
+        )
+        self.last_refill = now
+
+
+def get_shared_token_bucket(
+    key: str, max_requests: int, period_seconds: float, burst: int
+) -> TokenBucket:
+    with _REGISTRY_LOCK:
+        if key not in _TOKEN_BUCKET_REGISTRY:
+            _TOKEN_BUCKET_REGISTRY[key] = TokenBucket(
+                capacity=burst,
+                refill_per_second=max_requests / period_seconds,
+            )
+        return _TOKEN_BUCKET_REGISTRY[key]
+
+
+def get_retry_after_seconds(exception: BaseException) -> Optional[float]:
+    response = getattr(exception, "response", None)
+    if response is None or response.status_code != 429:
+        return None
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class wait_retry_after(tenacity.wait.wait_base):
+    """
+    Waits as long as a rate-limited (429) response asks for via Retry-After;
+    other failures are waited for with the fallback strategy.
+    """
+
+    def __init__(
+        self, fallback: tenacity.wait.wait_base, max_wait: float = 900
+    ):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: tenacity.RetryCallState) -> float:
+        outcome = retry_state.outcome
+        if outcome is not None and outcome.failed:
+            retry_after = get_retry_after_seconds(outcome.exception())
+            if retry_after is not None:
+                FILE_LOGGER.warning(
+                    "[rate limit]", action="wait", retry_after=retry_after
+                )
+                return min(retry_after, self.max_wait)
+        return self.fallback(retry_state)
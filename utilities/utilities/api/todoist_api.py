@@ -1,16 +1,33 @@
+import json
 import logging
 from pathlib import Path
 from typing import Dict, List
 
+import requests
 import tenacity
 from structlog import get_logger
 from todoist_api_python.api import TodoistAPI
-from todoist_api_python.models import Project, Section, Task
+from todoist_api_python.models import Label, Project, Section, Task
 
 from utilities.api.base_classes.todoist import AbstractTodoistHelper
+from utilities.api.rate_limit import get_shared_token_bucket, wait_retry_after
+from utilities.api.todoist_metadata import (
+    TodoistMetadataCache,
+    get_metadata_cache,
+)
 
 ABS_FILE_PATH = Path(__file__).absolute().parent
 FILE_LOGGER = get_logger(__name__)
+SYNC_URL = "https://api.todoist.com/api/v1/sync"
+
+retry_todoist = tenacity.retry(
+    stop=tenacity.stop_after_attempt(5),
+    # rate-limited responses say how long to wait
+    wait=wait_retry_after(
+        fallback=tenacity.wait_exponential(multiplier=1, min=1, max=20)
+    ),
+    before_sleep=tenacity.before_sleep_log(FILE_LOGGER, logging.DEBUG),
+)
 
 
 class TodoistHelper(AbstractTodoistHelper):
@@ -18,50 +35,102 @@ class TodoistHelper(AbstractTodoistHelper):
         with open(Path(ABS_FILE_PATH, self.config.token_file_path), "r") as f:
             token = f.read().strip()
         self.connection = TodoistAPI(token)
-        self.projects = self._get_projects()
+        self.token = token
+        rate_limit = self.config.rate_limit
+        self.token_bucket = get_shared_token_bucket(
+            key=self.config.token_file_path,
+            max_requests=rate_limit.max_requests,
+            period_seconds=rate_limit.period_seconds,
+            burst=rate_limit.burst,
+        )
+        self.metadata_cache = self._get_metadata_cache()
+        self.projects = self.metadata_cache.get_projects(self._get_projects)
+
+    def _get_metadata_cache(self) -> TodoistMetadataCache:
+        config_cache = self.config.metadata_cache
+        file_path = None
+        if config_cache.file_path is not None:
+            file_path = Path.home() / config_cache.file_path
+        return get_metadata_cache(
+            key=self.config.token_file_path,
+            file_path=file_path,
+            ttl_seconds=config_cache.ttl_hours * 60 * 60,
+        )
+
+    def _get_labels(self) -> Dict[str, Label]:
+        result: Dict[str, Label] = {}
+        self._acquire_request()
+        all_labels = self.connection.get_labels(limit=None)
+        for label_list in all_labels:
+            for label in label_list:
+                result[label.name.casefold()] = label
+        return result
 
     def _get_projects(self) -> Dict[str, Project]:
         result: Dict[str, Project] = {}
+        self._acquire_request()
         all_projects = self.connection.get_projects(limit=None)
         for project_list in all_projects:
             for project in project_list:
                 result[project.name.casefold()] = project
         return result
 
-    @tenacity.retry(
-        stop=tenacity.stop_after_attempt(5),
-        wait=tenacity.wait_exponential(multiplier=1, min=1, max=20),
-        before_sleep=tenacity.before_sleep_log(FILE_LOGGER, logging.DEBUG),
-    )
+    @retry_todoist
     def _add_task(self, **kwargs):
+        self._acquire_request()
         return self.connection.add_task(**kwargs)
 
-    @tenacity.retry(
-        stop=tenacity.stop_after_attempt(5),
-        wait=tenacity.wait_exponential(multiplier=1, min=1, max=20),
-        before_sleep=tenacity.before_sleep_log(FILE_LOGGER, logging.DEBUG),
-    )
+    @retry_todoist
+    def _update_task(self, task_id: str, **kwargs):
+        self._acquire_request()
+        return self.connection.update_task(task_id=task_id, **kwargs)
+
+    @retry_todoist
     def _get_task(self, task_id: str) -> Task:
+        self._acquire_request()
         return self.connection.get_task(task_id=task_id)
 
+    @retry_todoist
+    def _post_sync_commands(self, command_list: List[dict]) -> dict:
+        # commands are only applied once per uuid, so retrying is safe
+        self._acquire_request()
+        response = requests.post(
+            SYNC_URL,
+            headers={"Authorization": f"Bearer {self.token}"},
+            data={"commands": json.dumps(command_list)},
+            timeout=(10, 60),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @retry_todoist
     def _get_tasks(self, project_id: str) -> List[Task]:
         result: List[Task] = []
+        self._acquire_request()
         all_tasks = self.connection.get_tasks(project_id=project_id, limit=None)
         for task_list in all_tasks:
             for task in task_list:
                 result.append(task)
         return result
 
-    @tenacity.retry(
-        stop=tenacity.stop_after_attempt(5),
-        wait=tenacity.wait_exponential(multiplier=1, min=1, max=20),
-        before_sleep=tenacity.before_sleep_log(FILE_LOGGER, logging.DEBUG),
-    )
+    @retry_todoist
+    def _filter_tasks(self, query: str) -> List[Task]:
+        result: List[Task] = []
+        self._acquire_request()
+        all_tasks = self.connection.filter_tasks(query=query, limit=200)
+        for task_list in all_tasks:
+            for task in task_list:
+                result.append(task)
+        return result
+
+    @retry_todoist
     def _delete_task(self, task_id: str):
+        self._acquire_request()
         self.connection.delete_task(task_id=task_id)
 
     def _get_sections(self, project_id: str) -> Dict[str, Section]:
         result: Dict[str, Section] = {}
+        self._acquire_request()
         all_sections = self.connection.get_sections(
             project_id=project_id, limit=None
         )
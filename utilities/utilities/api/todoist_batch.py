@@ -0,0 +1,261 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from uuid import uuid4
+
+from structlog import get_logger
+
+from utilities.api.todoist_journal import UploadJournal
+
+if TYPE_CHECKING:
+    # the helper itself queues deletes in a batch
+    from utilities.api.base_classes.todoist import AbstractTodoistHelper
+
+FILE_LOGGER = get_logger(__name__)
+
+# maximum number of commands todoist accepts per sync request
+SYNC_COMMAND_LIMIT = 100
+
+
+@dataclass
+class TodoistBatchError(Exception):
+    error_map: Dict[str, dict]
+    message: str = "[todoist batch error]"
+
+    def __post_init__(self):
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.message}: failed commands={self.error_map}"
+
+
+@dataclass
+class TodoistCommand:
+    type: str
+    args: dict
+    uuid: str = field(default_factory=lambda: str(uuid4()))
+    temp_id: Optional[str] = None
+    # idempotency key, if the batch is journaled
+    key: Optional[str] = None
+
+    def to_payload(self, temp_id_mapping: Dict[str, str]) -> dict:
+        # ids of tasks created by an earlier request are no longer temporary
+        args = {
+            key: (
+                temp_id_mapping.get(value, value)
+                if key in ("id", "parent_id")
+                else value
+            )
+            for key, value in self.args.items()
+        }
+        payload = {"type": self.type, "uuid": self.uuid, "args": args}
+        if self.temp_id is not None:
+            payload["temp_id"] = self.temp_id
+        return payload
+
+
+@dataclass
+class TodoistBatch:
+    todoist_helper: "AbstractTodoistHelper"
+    command_limit: int = SYNC_COMMAND_LIMIT
+    command_list: List[TodoistCommand] = field(default_factory=list)
+    # temporary id of queued task -> id given by todoist
+    temp_id_mapping: Dict[str, str] = field(default_factory=dict)
+    # defaults to the journal of a resumable upload of the helper
+    journal: Optional[UploadJournal] = None
+
+    def __post_init__(self):
+        if self.journal is None:
+            self.journal = self.todoist_helper.upload_journal
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self):
+        return len(self.command_list)
+
+    def add_task(
+        self,
+        task: str,
+        due_string: str = None,
+        due_date: Union[date, datetime] = None,
+        project: str = None,
+        project_id: str = None,
+        section: str = None,
+        section_id: str = None,
+        label_list: list[str] = None,
+        description: str = None,
+        parent_id: str = None,
+        priority: int = 1,
+    ) -> str:
+        """
+        Queues a task to be added & returns its temporary id, which may be
+        used as parent_id of other queued tasks or as task_id of updates.
+        """
+        due_date_str = self.todoist_helper.get_due_string(
+            due_string=due_string, due_date=due_date
+        )
+        FILE_LOGGER.info(
+            "[todoist add]",
+            task=task,
+            due_string=due_date_str,
+            due_date=due_date,
+            project=project,
+            section=section,
+            priority=priority,
+            labels=label_list,
+            description=description,
+            parent_id=parent_id,
+        )
+
+        if project_id is None and project is not None:
+            project_id = self.todoist_helper.get_project_id(project)
+            if section_id is None and section is not None:
+                section_id = self.todoist_helper.get_section_id(
+                    project_id, section
+                )
+
+        args = {
+            "content": task,
+            "description": description,
+            "project_id": project_id,
+            "section_id": section_id,
+            "parent_id": parent_id,
+            "labels": self.todoist_helper.get_label_list(label_list),
+            "priority": priority,
+        }
+        if due_date_str is not None:
+            args["due"] = {"string": due_date_str}
+
+        command = TodoistCommand(
+            type="item_add",
+            args={
+                key: value for key, value in args.items() if value is not None
+            },
+            temp_id=str(uuid4()),
+        )
+        self._queue(command)
+        return command.temp_id
+
+    def update_task(
+        self,
+        task_id: str,
+        task: str = None,
+        label_list: list[str] = None,
+        description: str = None,
+        priority: int = None,
+    ):
+        FILE_LOGGER.info(
+            "[todoist update]",
+            task_id=task_id,
+            task=task,
+            labels=label_list,
+            description=description,
+            priority=priority,
+        )
+        args = {
+            "id": task_id,
+            "content": task,
+            "description": description,
+            "priority": priority,
+        }
+        if label_list is not None:
+            args["labels"] = self.todoist_helper.get_label_list(label_list)
+        self._queue(
+            TodoistCommand(
+                type="item_update",
+                args={
+                    key: value
+                    for key, value in args.items()
+                    if value is not None
+                },
+            )
+        )
+
+    def move_task(self, task_id: str, section_id: str):
+        # unlike deleting & re-adding, the task keeps its id & history
+        FILE_LOGGER.info(
+            "[todoist move]", task_id=task_id, section_id=section_id
+        )
+        self._queue(
+            TodoistCommand(
+                type="item_move",
+                args={"id": task_id, "section_id": section_id},
+            )
+        )
+
+    def delete_task(self, task_id: str):
+        FILE_LOGGER.info("[todoist delete]", task_id=task_id)
+        self._queue(TodoistCommand(type="item_delete", args={"id": task_id}))
+
+    def _queue(self, command: TodoistCommand):
+        if self.journal is None:
+            self.command_list.append(command)
+            return
+
+        # temporary ids are derived from keys, so keys of children are stable
+        command.key = self.journal.get_key(command.type, command.args)
+        command.uuid = self.journal.get_uuid(command.key, purpose="uuid")
+        if command.temp_id is not None:
+            command.temp_id = self.journal.get_uuid(command.key, "temp_id")
+
+        if not self.journal.is_done(command.key):
+            self.command_list.append(command)
+        elif command.temp_id is not None:
+            self.temp_id_mapping[command.temp_id] = self.journal.get_created_id(
+                command.key
+            )
+
+    def flush(self) -> Dict[str, str]:
+        """
+        Sends queued commands in as few requests as allowed.
+        :return: temporary ids of added tasks mapped to their todoist ids
+        """
+        while self.command_list:
+            limit = self.command_limit
+            command_chunk = self.command_list[:limit]
+            self.command_list = self.command_list[limit:]
+
+            payload_list = [
+                command.to_payload(self.temp_id_mapping)
+                for command in command_chunk
+            ]
+            if self.journal is not None:
+                self.journal.record_intent(
+                    [
+                        {"key": command.key, "command": payload}
+                        for command, payload in zip(command_chunk, payload_list)
+                    ]
+                )
+
+            # replayed commands keep their uuid, which todoist deduplicates
+            response = self.todoist_helper.post_sync_commands(payload_list)
+            self.temp_id_mapping.update(response.get("temp_id_mapping", {}))
+
+            sync_status = response.get("sync_status", {})
+            error_map = {
+                command.uuid: sync_status.get(command.uuid)
+                for command in command_chunk
+                if sync_status.get(command.uuid) != "ok"
+            }
+            if self.journal is not None:
+                self.journal.record_done(
+                    {
+                        command.key: self.temp_id_mapping.get(command.temp_id)
+                        for command in command_chunk
+                        if command.uuid not in error_map
+                    }
+                )
+            FILE_LOGGER.info(
+                "[todoist batch]",
+                action="flush",
+                number_commands=len(command_chunk),
+                number_failed=len(error_map),
+            )
+            if error_map:
+                raise TodoistBatchError(error_map=error_map)
+        return self.temp_id_mapping
@@ -0,0 +1,99 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from uuid import UUID, uuid4, uuid5
+
+from structlog import get_logger
+
+FILE_LOGGER = get_logger(__name__)
+
+JOURNAL_NAMESPACE = UUID("5b0c6a5e-2f5e-4a8e-9c1d-6f0a7d3e4b21")
+
+
+@dataclass
+class UploadJournal:
+    """
+    Append-only log of the operations of an upload. The same operations get
+    the same keys in a re-run, so an interrupted upload only replays the
+    operations without a completion mark.
+    """
+
+    file_path: Path
+    # differs per upload, so a finished upload may be repeated
+    run_id: Optional[str] = None
+    # idempotency key -> id of created task (None if nothing created)
+    done_map: Dict[str, Optional[str]] = field(default_factory=dict)
+    _key_count: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if not self.file_path.exists():
+            self.run_id = str(uuid4())
+            self._append([{"status": "start", "run_id": self.run_id}])
+            return
+        with open(self.file_path, "r") as f:
+            for line in f:
+                # a line may be cut off, when the upload was interrupted
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry["status"] == "start":
+                    self.run_id = entry["run_id"]
+                elif entry["status"] == "done":
+                    self.done_map[entry["key"]] = entry.get("id")
+        FILE_LOGGER.info(
+            "[upload journal]",
+            action="resume",
+            path=self.file_path,
+            number_done=len(self.done_map),
+        )
+
+    @property
+    def created_id_set(self) -> Set[str]:
+        return {task_id for task_id in self.done_map.values() if task_id}
+
+    def get_key(self, command_type: str, args: dict) -> str:
+        # repeated identical operations are told apart by their occurrence
+        base_key = hashlib.sha256(
+            json.dumps([command_type, args], sort_keys=True).encode()
+        ).hexdigest()
+        occurrence = self._key_count.get(base_key, 0)
+        self._key_count[base_key] = occurrence + 1
+        return f"{base_key}-{occurrence}"
+
+    def get_uuid(self, key: str, purpose: str) -> str:
+        return str(uuid5(JOURNAL_NAMESPACE, f"{self.run_id}:{purpose}:{key}"))
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done_map
+
+    def get_created_id(self, key: str) -> Optional[str]:
+        return self.done_map.get(key)
+
+    def record_intent(self, entry_list: List[dict]):
+        self._append([{"status": "intent", **entry} for entry in entry_list])
+
+    def record_done(self, key_to_id: Dict[str, Optional[str]]):
+        self.done_map.update(key_to_id)
+        self._append(
+            [
+                {"status": "done", "key": key, "id": task_id}
+                for key, task_id in key_to_id.items()
+            ]
+        )
+
+    def finish(self):
+        # a finished upload is not resumed, so a later re-run starts anew
+        self.file_path.unlink(missing_ok=True)
+        FILE_LOGGER.info(
+            "[upload journal]", action="finish", path=self.file_path
+        )
+
+    def _append(self, entry_list: List[dict]):
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, "a") as f:
+            for entry in entry_list:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
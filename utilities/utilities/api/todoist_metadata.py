@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from structlog import get_logger
+from todoist_api_python.models import Label, Project, Section
+
+FILE_LOGGER = get_logger(__name__)
+
+# shared by all helpers of a process, so metadata is only fetched once
+_METADATA_CACHE_REGISTRY: Dict[str, "TodoistMetadataCache"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+@dataclass
+class TodoistMetadataCache:
+    # persisted to disk if given, and reused until the ttl has passed
+    file_path: Optional[Path] = None
+    ttl_seconds: float = 24 * 60 * 60
+    projects: Optional[Dict[str, Project]] = None
+    # per project id
+    sections: Dict[str, Dict[str, Section]] = field(default_factory=dict)
+    labels: Optional[Dict[str, Label]] = None
+    saved_at: Optional[float] = None
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def __post_init__(self):
+        if self.file_path is not None and self.file_path.exists():
+            self._load()
+
+    def get_projects(
+        self, fetch_projects: Callable[[], Dict[str, Project]]
+    ) -> Dict[str, Project]:
+        with self._lock:
+            if self.projects is None:
+                self.projects = fetch_projects()
+                self._save()
+            return self.projects
+
+    def get_sections(
+        self,
+        project_id: str,
+        fetch_sections: Callable[[str], Dict[str, Section]],
+    ) -> Dict[str, Section]:
+        with self._lock:
+            if project_id not in self.sections:
+                self.sections[project_id] = fetch_sections(project_id)
+                self._save()
+            return self.sections[project_id]
+
+    def get_labels(
+        self, fetch_labels: Callable[[], Dict[str, Label]]
+    ) -> Dict[str, Label]:
+        with self._lock:
+            if self.labels is None:
+                self.labels = fetch_labels()
+                self._save()
+            return self.labels
+
+    def invalidate(
+        self,
+        projects: bool = False,
+        section_project_id: str = None,
+        labels: bool = False,
+    ):
+        # e.g. after creating or renaming in todoist
+        with self._lock:
+            if projects:
+                self.projects = None
+            if section_project_id is not None:
+                self.sections.pop(section_project_id, None)
+            if labels:
+                self.labels = None
+            self._save()
+
+    def _load(self):
+        with open(self.file_path, "r") as f:
+            cached = json.load(f)
+        if time.time() - cached["saved_at"] > self.ttl_seconds:
+            FILE_LOGGER.info(
+                "[todoist metadata]", action="expired", path=self.file_path
+            )
+            return
+
+        self.saved_at = cached["saved_at"]
+        if cached["projects"] is not None:
+            self.projects = {
+                name: Project.from_dict(project)
+                for name, project in cached["projects"].items()
+            }
+        self.sections = {
+            project_id: {
+                name: Section.from_dict(section)
+                for name, section in section_map.items()
+            }
+            for project_id, section_map in cached["sections"].items()
+        }
+        if cached["labels"] is not None:
+            self.labels = {
+                name: Label.from_dict(label)
+                for name, label in cached["labels"].items()
+            }
+
+    def _save(self):
+        if self.file_path is None:
+            return
+
+        def to_dict(entry_map: Optional[Dict]) -> Optional[Dict]:
+            if entry_map is None:
+                return None
+            return {name: entry.to_dict() for name, entry in entry_map.items()}
+
+        # expiry counts from the first fetch, so entries are not kept forever
+        if self.saved_at is None:
+            self.saved_at = time.time()
+        cached = {
+            "saved_at": self.saved_at,
+            "projects": to_dict(self.projects),
+            "sections": {
+                project_id: to_dict(section_map)
+                for project_id, section_map in self.sections.items()
+            },
+            "labels": to_dict(self.labels),
+        }
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(cached, f)
+        tmp_path.replace(self.file_path)
+
+
+def get_metadata_cache(
+    key: str, file_path: Optional[Path] = None, ttl_seconds: float = None
+) -> TodoistMetadataCache:
+    with _REGISTRY_LOCK:
+        if key not in _METADATA_CACHE_REGISTRY:
+            kwargs = {"file_path": file_path}
+            if ttl_seconds is not None:
+                kwargs["ttl_seconds"] = ttl_seconds
+            _METADATA_CACHE_REGISTRY[key] = TodoistMetadataCache(**kwargs)
+        return _METADATA_CACHE_REGISTRY[key]
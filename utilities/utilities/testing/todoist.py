@@ -1,40 +1,191 @@
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
-from typing import List, Optional
+from itertools import chain
+from typing import Callable, Dict, List, Optional, TypeVar
 from uuid import uuid4
 
-from todoist_api_python.models import Due, Project, Section, Task
+import requests
+from todoist_api_python.models import Due, Label, Project, Section, Task
 
-from utilities.api.todoist_api import TodoistHelper
+from utilities.api.todoist_api import TodoistHelper, retry_todoist
+
+T = TypeVar("T")
 
 DEFAULT_SECTION = "section"
 
 
+@dataclass
 class LocalTodoistConnection:
-    tasks: List[Task] = []
-    projects: List[Project] = []
-    sections: list[Section] = []
+    """
+    Indexed in-memory stand-in for the todoist API. Latency, errors &
+    rate-limited (429) responses may be injected, e.g. for load testing.
+    """
+
+    # seconds slept per request
+    latency_seconds: float = 0.0
+    # fraction of requests failing with a server error or a 429
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: int = 0
+    seed: Optional[int] = None
+    sleep: Callable[[float], None] = time.sleep
+    labels: List[Label] = field(default_factory=list)
+    # requests (per method) & injected failures (per status code)
+    request_count: Counter = field(default_factory=Counter)
+    failure_count: Counter = field(default_factory=Counter)
+    _task_map: Dict[str, Task] = field(default_factory=dict, repr=False)
+    # insertion-ordered task ids per project & per label
+    _project_index: Dict[str, Dict[str, None]] = field(
+        default_factory=lambda: defaultdict(dict), repr=False
+    )
+    _label_index: Dict[str, Dict[str, None]] = field(
+        default_factory=lambda: defaultdict(dict), repr=False
+    )
+    _project_map: Dict[str, Project] = field(default_factory=dict, repr=False)
+    _section_map: Dict[str, List[Section]] = field(
+        default_factory=lambda: defaultdict(list), repr=False
+    )
+    # sync commands are applied once per uuid, as by todoist
+    _sync_result_map: Dict[str, dict] = field(default_factory=dict, repr=False)
+    # helpers may send requests concurrently
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    @property
+    def tasks(self) -> List[Task]:
+        return list(self._task_map.values())
+
+    @tasks.setter
+    def tasks(self, task_list: List[Task]):
+        with self._lock:
+            self._task_map.clear()
+            self._project_index.clear()
+            self._label_index.clear()
+            for task in task_list:
+                self._index_task(task)
+
+    @property
+    def projects(self) -> List[Project]:
+        return list(self._project_map.values())
+
+    @property
+    def sections(self) -> List[Section]:
+        return list(chain.from_iterable(self._section_map.values()))
+
+    def reset_counters(self):
+        self.request_count.clear()
+        self.failure_count.clear()
+
+    def _request(self, method: str):
+        with self._lock:
+            self.request_count[method] += 1
+            draw = self._random.random()
+        if self.latency_seconds > 0:
+            self.sleep(self.latency_seconds)
+        if draw < self.rate_limit_rate:
+            self._fail(
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+        if draw < self.rate_limit_rate + self.error_rate:
+            self._fail(status_code=503)
+
+    def _fail(self, status_code: int, headers: dict = None):
+        with self._lock:
+            self.failure_count[status_code] += 1
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers or {})
+        raise requests.HTTPError(
+            f"[local todoist] injected {status_code}", response=response
+        )
+
+    def _paginate(self, method: str, item_list: List[T], limit: int = None):
+        # each page is a separate request, as with the paginated api
+        if not limit:
+            self._request(method)
+            return [item_list]
+        page_list = []
+        for start in range(0, max(len(item_list), 1), limit):
+            self._request(method)
+            end = start + limit
+            page_list.append(item_list[start:end])
+        return page_list
+
+    def _index_task(self, task: Task):
+        self._task_map[task.id] = task
+        self._project_index[task.project_id][task.id] = None
+        for label in task.labels:
+            self._label_index[label][task.id] = None
+
+    def _unindex_task(self, task: Task):
+        self._task_map.pop(task.id, None)
+        self._project_index[task.project_id].pop(task.id, None)
+        for label in task.labels:
+            self._label_index[label].pop(task.id, None)
 
-    def get_task(self, task_id: str) -> Task:
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
+    def get_task(self, task_id: str) -> Optional[Task]:
+        self._request("get_task")
+        return self._task_map.get(task_id)
 
     def get_tasks(self, project_id: str, limit: int = None) -> List[List[Task]]:
-        return [[task for task in self.tasks if task.project_id == project_id]]
+        with self._lock:
+            task_list = [
+                self._task_map[task_id]
+                for task_id in self._project_index.get(project_id, {})
+            ]
+        return self._paginate("get_tasks", task_list, limit)
+
+    def filter_tasks(self, query: str, limit: int = None) -> List[List[Task]]:
+        # only project & label filters, as dates are checked by the helper
+        with self._lock:
+            id_set_list = []
+            for term in query.split(" & "):
+                value = re.sub(r"\\(.)", r"\1", term[1:])
+                if term.startswith("#"):
+                    id_set_list.append(
+                        {
+                            task_id
+                            for project in self._project_map.values()
+                            if project.name.casefold() == value.casefold()
+                            for task_id in self._project_index.get(
+                                project.id, {}
+                            )
+                        }
+                    )
+                elif term.startswith("@"):
+                    id_set_list.append(set(self._label_index.get(value, {})))
+
+            if not id_set_list:
+                task_list = list(self._task_map.values())
+            else:
+                id_set = set.intersection(*id_set_list)
+                task_list = [
+                    task
+                    for task_id, task in self._task_map.items()
+                    if task_id in id_set
+                ]
+        return self._paginate("filter_tasks", task_list, limit)
 
     def get_projects(self, limit: int = None) -> List[List[Project]]:
-        return [self.projects]
+        return self._paginate("get_projects", self.projects, limit)
+
+    def get_labels(self, limit: int = None) -> List[List[Label]]:
+        return self._paginate("get_labels", self.labels, limit)
 
     def get_sections(
         self, project_id: str, limit: int = None
     ) -> List[List[Section]]:
-        return [
-            [
-                section
-                for section in self.sections
-                if section.project_id == project_id
-            ]
-        ]
+        return self._paginate(
+            "get_sections", list(self._section_map.get(project_id, [])), limit
+        )
 
     def add_project(
         self, project_name: str, project_id: Optional[str] = None
@@ -59,7 +210,7 @@ class LocalTodoistConnection:
             created_at=now_iso,
             updated_at=now_iso,
         )
-        self.projects.append(project)
+        self._project_map[project.id] = project
         return project.id
 
     def add_section(self, project_id: str, section_name: str):
@@ -70,7 +221,7 @@ class LocalTodoistConnection:
             is_collapsed=False,
             order=1,
         )
-        self.sections.append(section)
+        self._section_map[project_id].append(section)
 
     @staticmethod
     def get_due(due_string: str) -> Due:
@@ -89,7 +240,15 @@ class LocalTodoistConnection:
 
     def add_task(
         self, project_id: str, section_id: Optional[str] = None, **kwargs
-    ):
+    ) -> Task:
+        self._request("add_task")
+        return self._add_task(
+            project_id=project_id, section_id=section_id, **kwargs
+        )
+
+    def _add_task(
+        self, project_id: str, section_id: Optional[str] = None, **kwargs
+    ) -> Task:
         time_now = datetime.now().strftime("%Y-%m-%d %H:%M:%s")
         default_task_kwargs = dict(
             id=str(uuid4()),
@@ -125,11 +284,77 @@ class LocalTodoistConnection:
             task_values.pop("due_string")
 
         task = Task(**task_values)
-        self.tasks.append(task)
+        with self._lock:
+            self._index_task(task)
         return task
 
+    def update_task(self, task_id: str, **kwargs) -> Optional[Task]:
+        self._request("update_task")
+        return self._update_task(task_id=task_id, **kwargs)
+
+    def _update_task(self, task_id: str, **kwargs) -> Optional[Task]:
+        if "labels" in kwargs:
+            kwargs["labels"] = sorted(kwargs["labels"])
+        with self._lock:
+            if (task := self._task_map.get(task_id)) is None:
+                return None
+            # replaced in place, so tasks stay in the order added
+            updated_task = replace(task, **kwargs)
+            self._task_map[task_id] = updated_task
+            if updated_task.project_id != task.project_id:
+                self._project_index[task.project_id].pop(task_id, None)
+                self._project_index[updated_task.project_id][task_id] = None
+            for label in set(task.labels) - set(updated_task.labels):
+                self._label_index[label].pop(task_id, None)
+            for label in set(updated_task.labels) - set(task.labels):
+                self._label_index[label][task_id] = None
+            return updated_task
+
     def delete_task(self, task_id: str):
-        self.tasks = [task for task in self.tasks if task.id != task_id]
+        self._request("delete_task")
+        self._delete_task(task_id=task_id)
+
+    def _delete_task(self, task_id: str):
+        with self._lock:
+            if (task := self._task_map.get(task_id)) is not None:
+                self._unindex_task(task)
+
+    def sync(self, commands: List[dict]) -> dict:
+        self._request("sync")
+        sync_status = {}
+        temp_id_mapping = {}
+        with self._lock:
+            for command in commands:
+                # a replayed command returns its earlier result
+                if (
+                    result := self._sync_result_map.get(command["uuid"])
+                ) is None:
+                    result = self._apply_command(command, temp_id_mapping)
+                    self._sync_result_map[command["uuid"]] = result
+                sync_status[command["uuid"]] = "ok"
+                if "temp_id" in command:
+                    temp_id_mapping[command["temp_id"]] = result["id"]
+        return {"sync_status": sync_status, "temp_id_mapping": temp_id_mapping}
+
+    def _apply_command(self, command: dict, temp_id_mapping: dict) -> dict:
+        args = {
+            key: (
+                temp_id_mapping.get(value, value)
+                if key in ("id", "parent_id")
+                else value
+            )
+            for key, value in command["args"].items()
+        }
+        if command["type"] == "item_add":
+            if (due := args.pop("due", None)) is not None:
+                args["due_string"] = due["string"]
+            return {"id": self._add_task(**args).id}
+        task_id = args.pop("id")
+        if command["type"] in ("item_update", "item_move"):
+            self._update_task(task_id=task_id, **args)
+        elif command["type"] == "item_delete":
+            self._delete_task(task_id=task_id)
+        return {"id": task_id}
 
 
 class DebugTodoistHelper(TodoistHelper):
@@ -138,6 +363,10 @@ class DebugTodoistHelper(TodoistHelper):
     def __post_init__(self):
         pass
 
+    @retry_todoist
+    def _post_sync_commands(self, command_list: List[dict]) -> dict:
+        return self.connection.sync(command_list)
+
     def set_connection(self, connection: LocalTodoistConnection):
         self.connection = connection
         self.projects = self._get_projects()